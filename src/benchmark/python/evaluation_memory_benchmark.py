@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Measure the memory used by a large number of evaluations.
+
+    PYTHONPATH=src/main/python python src/benchmark/python/evaluation_memory_benchmark.py [count]
+"""
+import sys
+
+from awslambdahelper import NonCompliantEvaluation
+
+
+class DictEvaluation(object):
+    """
+    An evaluation which keeps its attributes in a per-instance __dict__, as AWSConfigEvaluation used to.
+    """
+
+    def __init__(self, Annotation, ResourceType=None, ResourceId=None, OrderingTimestamp=None):
+        self.OrderingTimestamp = OrderingTimestamp
+        self.ComplianceResourceType = ResourceType
+        self.ComplianceResourceId = ResourceId
+        self.ComplianceType = 'NON_COMPLIANT'
+        self.Annotation = Annotation
+
+
+def object_size(obj):
+    """
+    Size of an object, including its __dict__ if it has one. The attribute values are shared between every
+    evaluation, and so are not counted.
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def build(evaluation_class, count):
+    # Resource types decoded from JSON are separate string objects, even when they are equal.
+    return [
+        evaluation_class(
+            Annotation="Volume is not encrypted.",
+            ResourceType="".join(["AWS::EC2::", "Volume"]),
+            ResourceId="vol-%08d" % i
+        )
+        for i in range(count)
+    ]
+
+
+def distinct_resource_types(evaluations):
+    return len(set(id(evaluation.ComplianceResourceType) for evaluation in evaluations))
+
+
+def main(count):
+    for label, evaluation_class in (("__dict__", DictEvaluation), ("__slots__", NonCompliantEvaluation)):
+        evaluations = build(evaluation_class, count)
+        per_object = object_size(evaluations[0])
+        print("{label:>10}: {per_object:4d} bytes per evaluation, {total:6.1f} MB for {count} evaluations, "
+              "{types} resource type string(s)".format(
+                  label=label,
+                  per_object=per_object,
+                  total=per_object * count / 1024.0 / 1024.0,
+                  count=count,
+                  types=distinct_resource_types(evaluations)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the time taken by each installed JSON parser to decode `invokingEvent` strings.
+
+    PYTHONPATH=src/main/python python src/benchmark/python/json_decode_benchmark.py [event.json ...]
+
+Each file should hold a Lambda event captured from AWS Config. Without any files, an event for an IAM policy with
+a large policy document is generated.
+"""
+import json
+import sys
+import timeit
+
+from awslambdahelper.jsondecode import available_backends, get_decoder
+
+REPEAT = 5
+
+
+def generated_event(statements=4000):
+    """
+    Build an event for an IAM policy about as large as AWS Config will deliver.
+    """
+    document = {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Sid": "Statement%d" % i,
+                "Effect": "Allow",
+                "Action": ["s3:GetObject", "s3:PutObject", "s3:ListBucket"],
+                "Resource": ["arn:aws:s3:::bucket-%d" % i, "arn:aws:s3:::bucket-%d/*" % i],
+                "Condition": {"StringEquals": {"aws:PrincipalOrgID": "o-abcdefghij"}}
+            }
+            for i in range(statements)
+        ]
+    }
+    configuration_item = {
+        "configurationItemVersion": "1.2",
+        "configurationItemCaptureTime": "2016-07-13T21:50:00.373Z",
+        "configurationStateId": 1,
+        "resourceType": "AWS::IAM::Policy",
+        "resourceId": "ANPAEXAMPLE",
+        "resourceName": "large-policy",
+        "configuration": {
+            "policyName": "large-policy",
+            "policyVersionList": [{"document": json.dumps(document), "versionId": "v1", "isDefaultVersion": True}]
+        },
+        "relationships": [],
+        "tags": {}
+    }
+    return {
+        "invokingEvent": json.dumps({
+            "configurationItem": configuration_item,
+            "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+            "messageType": "ConfigurationItemChangeNotification"
+        }),
+        "resultToken": "myResultToken"
+    }
+
+
+def main(paths):
+    if paths:
+        events = []
+        for path in paths:
+            with open(path) as f:
+                events.append(json.load(f))
+    else:
+        events = [generated_event()]
+
+    for event in events:
+        invoking_event = event["invokingEvent"]
+        print("invokingEvent of %d bytes" % len(invoking_event))
+        for name in available_backends():
+            loads = get_decoder(name)
+            seconds = min(timeit.repeat(lambda: loads(invoking_event), number=1, repeat=REPEAT))
+            print("  %-12s %8.2f ms" % (name, seconds * 1000))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
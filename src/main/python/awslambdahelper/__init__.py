@@ -1,12 +1,82 @@
 import json
+import logging
+import threading
+from collections import OrderedDict, deque
 
 import backoff
-import boto3
 import botocore.exceptions
+from concurrent.futures import Future, ThreadPoolExecutor
 
-from awslambdahelper.evaluation import AWSConfigEvaluation
+from awslambdahelper.batch import batch_records, batch_response, decode_record
+from awslambdahelper.cache import LRUCache
+from awslambdahelper.clients import ASSUMED_ROLE_SESSIONS, AssumedRoleSessionCache, get_client
+from awslambdahelper.coalesce import DEFAULT_PRECEDENCE, EvaluationCoalescer
+from awslambdahelper.concurrency import imap_unordered
+from awslambdahelper.configitem import CONFIGURATION_ITEM_CACHE, ConfigurationItem, configuration_item_cache_key, \
+    convert_api_configuration_item
+from awslambdahelper.deadline import CONTINUATION_CURSOR_KEY, Deadline, LambdaReinvoker, LocalReinvoker
+from awslambdahelper.dispatch import RuleDispatcher, UnknownRuleError
+from awslambdahelper.evaluation import AWSConfigEvaluation, EvaluationBatch
+from awslambdahelper.inventory import PrefetchingIterator, paginate
+from awslambdahelper.jsondecode import get_decoder, register_decoder
+from awslambdahelper.metrics import METRICS_NAMESPACE, NULL_METRICS, Metrics, StdoutSink
+from awslambdahelper.resourcetypes import DEFAULT_HANDLER, ResourceTypeTable
+from awslambdahelper.resultcache import EVALUATION_CACHE, EvaluationResultCache, SQLiteResultStore
+from awslambdahelper.statestore import STATE_REFRESH_SECONDS, DeltaFilter, MemoryStateStore, SQLiteStateStore
+from awslambdahelper.submission import MAX_EVALUATIONS_PER_REQUEST, EvaluationSubmitter, \
+    EvaluationSubmissionError, FailedEvaluationsError, is_throttling_error
+from awslambdahelper.validation import EvaluationValidator
 
-MAX_BACKOFF_TRIES = 100
+#: Number of attempts made by :py:meth:`~awslambdahelper.AWSConfigRule._aws_call` while throttled.
+MAX_BACKOFF_TRIES = 10
+#: Longest wait, in seconds, between two attempts of a throttled call.
+MAX_BACKOFF_SECONDS = 10
+#: Stop retrying a throttled call once this many seconds have passed since its first attempt.
+MAX_BACKOFF_TIME_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+#: Parsed rule parameters, keyed by the raw `ruleParameters` JSON string from the event.
+RULE_PARAMETERS_CACHE = LRUCache(maxsize=32)
+
+#: Rule instances created by :py:meth:`~awslambdahelper.AWSConfigRule.handler`, keyed by rule class, so they are
+#: reused across warm invocations.
+_RULE_INSTANCES = {}
+
+#: Idle rule instances used by :py:meth:`~awslambdahelper.AWSConfigRule.batch_handler`, keyed by rule class. Each
+#: event in a batch needs an instance of its own while it is evaluated.
+_BATCH_RULE_INSTANCES = {}
+
+# Marks a rule which has not run its setup hook yet.
+_NOT_SET_UP = object()
+
+
+def _is_lazy(evaluation_responses):
+    """
+    Whether the rule produces its evaluations as they are read, as generators do. Lists and batches have already
+    been built while `evaluate_compliance` ran.
+    """
+    return not isinstance(evaluation_responses, (list, tuple, EvaluationBatch))
+
+
+def _timed_responses(metrics, evaluation_responses):
+    """
+    Time the work done by generator rules as they are consumed. Batches must stay batches for their fast path.
+    """
+    if not _is_lazy(evaluation_responses):
+        return evaluation_responses
+    return metrics.timed("Evaluate", evaluation_responses)
+
+
+class _EventRun(object):
+    """
+    The filters applied to the evaluations of one event, which are consulted once they have been sent.
+    """
+
+    def __init__(self):
+        self.validator = None
+        self.deadline = None
+        self.delta_filter = None
 
 
 class AWSConfigRule(object):
@@ -15,15 +85,75 @@ class AWSConfigRule(object):
     """
     #: Specifies an AWS Config Rule which is triggered by a resource configuration
     CALL_TYPE_CONFIGURATION_CHANGE = 'ConfigurationItemChangeNotification'
+    #: Specifies an AWS Config Rule which is triggered by a resource configuration too large to include in the event
+    CALL_TYPE_OVERSIZED_CONFIGURATION_CHANGE = 'OversizedConfigurationItemChangeNotification'
     #: Specifies an AWS Config Rule which is triggered on a scheduled basis
     CALL_TYPE_SCHEDULED = 'ScheduledNotification'
-    #: List of resources which this rule can evaluate. Only application for ConfigurationChange rules.
+    #: List of resources which this rule can evaluate. Only application for ConfigurationChange rules. May contain
+    #: wildcard patterns such as :code:`AWS::EC2::*`. See :py:mod:`awslambdahelper.resourcetypes`.
     APPLICABLE_RESOURCES = []
+    #: Maximum number of put_evaluations requests to run at once. Chunks are sent one after another when this is 1.
+    MAX_CONCURRENT_SUBMISSIONS = 1
+    #: Maximum number of evaluations in each put_evaluations request.
+    MAX_EVALUATIONS_PER_REQUEST = MAX_EVALUATIONS_PER_REQUEST
+    #: Maximum estimated size, in bytes, of each put_evaluations request body. Not checked when None, which is the
+    #: default, as measuring means serialising every evaluation and validated ASCII evaluations always fit at the
+    #: default chunk size. Set to :py:data:`~awslambdahelper.submission.MAX_REQUEST_BYTES` when raising
+    #: :py:attr:`MAX_EVALUATIONS_PER_REQUEST`, turning off :py:attr:`VALIDATE_EVALUATIONS`, or sending long
+    #: non-ASCII annotations.
+    MAX_REQUEST_BYTES = None
+    #: Stop pulling evaluations from a generator rule once fewer than this many milliseconds are left before the
+    #: Lambda timeout, and continue in a follow-up invocation. Evaluations returned as a list are always sent in
+    #: full. Disabled when None. See :py:mod:`awslambdahelper.deadline`.
+    DEADLINE_SAFETY_MARGIN_MS = None
+    #: Called with the continuation event and the Lambda context when the deadline is reached.
+    REINVOKER = LambdaReinvoker()
+    #: Maximum number of shards evaluated at once by sharded scheduled rules.
+    #: See :py:meth:`~awslambdahelper.AWSConfigRule.shards_scheduled`.
+    MAX_SHARD_WORKERS = 4
+    #: Number of pages fetched in the background by :py:meth:`~awslambdahelper.AWSConfigRule.inventory`.
+    INVENTORY_PREFETCH_PAGES = 2
+    #: Send only one evaluation per resource. Evaluations are held until the rule has finished, rather than being
+    #: sent as they are produced. See :py:class:`~awslambdahelper.coalesce.EvaluationCoalescer`.
+    COALESCE_EVALUATIONS = False
+    #: Compliance types in the order they are kept when coalescing evaluations with the same timestamp.
+    COMPLIANCE_PRECEDENCE = DEFAULT_PRECEDENCE
+    #: Where to remember the evaluations sent by scheduled rules, so unchanged evaluations are not sent again, eg
+    #: :code:`SQLiteStateStore("/tmp/state.db")`. Disabled when None. See :py:mod:`awslambdahelper.statestore`.
+    STATE_STORE = None
+    #: Resend unchanged evaluations once this many seconds have passed since they were last sent.
+    STATE_REFRESH_SECONDS = STATE_REFRESH_SECONDS
+    #: Fix or drop evaluations which AWS Config would reject, rather than letting them fail a whole chunk.
+    #: See :py:class:`~awslambdahelper.validation.EvaluationValidator`.
+    VALIDATE_EVALUATIONS = True
+    #: Reuse the evaluations of configuration change rules when the same configuration is evaluated again with the
+    #: same rule parameters, eg when a notification is redelivered. See :py:mod:`awslambdahelper.resultcache`.
+    CACHE_EVALUATIONS = False
+    #: Dotted paths of the configuration fields the rule reads, eg :code:`["configuration.ipPermissions"]`. When set,
+    #: cached evaluations are reused for configuration changes which only touch other fields. When None, cached
+    #: evaluations are only reused for the same `configurationStateId`.
+    CACHE_CONFIGURATION_FIELDS = None
+    #: Where to keep cached evaluations beyond the in-memory cache, eg :code:`SQLiteResultStore("/tmp/results.db")`.
+    PERSISTENT_EVALUATION_CACHE = None
+    #: JSON parser used to decode the event, eg "ujson". When None, the fastest one installed is used.
+    #: See :py:mod:`awslambdahelper.jsondecode`.
+    JSON_BACKEND = None
+    #: Cache of assumed role sessions used by :py:meth:`~awslambdahelper.AWSConfigRule.execution_role_client`.
+    ASSUMED_ROLE_SESSIONS = ASSUMED_ROLE_SESSIONS
+    #: Maximum number of events evaluated at once by :py:meth:`~awslambdahelper.AWSConfigRule.batch_handler`.
+    MAX_BATCH_WORKERS = 8
+    #: Where to send per-event timings and counters, eg :code:`StdoutSink()` to write CloudWatch Embedded Metric
+    #: Format lines to the log. A plain function must be wrapped in :code:`staticmethod`. Disabled when None.
+    #: See :py:mod:`awslambdahelper.metrics`.
+    METRICS_SINK = None
+    #: CloudWatch namespace of the metrics.
+    METRICS_NAMESPACE = METRICS_NAMESPACE
 
     @classmethod
     def handler(cls, event, context):
         """
-        Allow a single entrypoint without extra boilerplate code.
+        Allow a single entrypoint without extra boilerplate code. The rule instance is created on the first event,
+        and reused for every later event handled by the same container.
 
         >>> from awslambdahelper import AWSConfigRule,InsufficientDataEvaluation
         >>> class MyAwesomeRule(AWSConfigRule):
@@ -41,9 +171,85 @@ class AWSConfigRule(object):
         :type context: dict
         :return:
         """
-        rule = cls(cls.APPLICABLE_RESOURCES)
+        rule = _RULE_INSTANCES.get(cls)
+        if rule is None:
+            rule = _RULE_INSTANCES.setdefault(cls, cls(cls.APPLICABLE_RESOURCES))
         rule.lambda_handler(event, context)
 
+    @classmethod
+    def batch_handler(cls, batch, context):
+        """
+        Entrypoint for a batch of events, such as rule events buffered in an SQS queue. Events are evaluated
+        concurrently, and their evaluations are sent together for each `resultToken`.
+
+        The deadline set by :py:attr:`DEADLINE_SAFETY_MARGIN_MS` is not applied to batches.
+
+        >>> # The entrypoint for lambda would be set as "file_name.MyAwesomeRule.batch_handler"
+
+        :param batch: See :py:func:`~awslambdahelper.batch.batch_records`.
+        :type batch: Union[dict,list]
+        :param context: The Lambda context.
+        :return: The records which failed, in the SQS partial batch response format.
+        :rtype: dict
+        """
+        failed = []
+        results = OrderedDict()
+        for identifier, result in imap_unordered(cls._evaluate_record, batch_records(batch), cls.MAX_BATCH_WORKERS):
+            if result is None:
+                failed.append(identifier)
+            else:
+                results.setdefault(result[0], []).append((identifier, result))
+
+        for result_token, token_results in results.items():
+            try:
+                EvaluationSubmitter(
+                    cls.put_evaluations,
+                    result_token,
+                    max_in_flight=cls.MAX_CONCURRENT_SUBMISSIONS,
+                    chunk_size=cls.MAX_EVALUATIONS_PER_REQUEST,
+                    max_request_bytes=cls.MAX_REQUEST_BYTES
+                ).submit(evaluation for _, result in token_results for evaluation in result[1])
+            except Exception:
+                identifiers = [identifier for identifier, _ in token_results]
+                logger.exception("Could not send the evaluations of records %s for result token '%s'",
+                                 ", ".join(str(identifier) for identifier in identifiers), result_token)
+                failed.extend(identifiers)
+                continue
+
+            for _, (_, _, run) in token_results:
+                if run.delta_filter is not None:
+                    run.delta_filter.commit()
+
+        return batch_response(failed)
+
+    @classmethod
+    def _evaluate_record(cls, record):
+        """
+        Evaluate one event of a batch on an idle rule instance.
+
+        :param record: `(identifier, event)`
+        :return: The identifier, and either `(result token, payloads, run)`, or None if the event failed.
+        """
+        identifier, event = record
+        rule = cls._acquire_batch_instance()
+        try:
+            event = decode_record(event, get_decoder(cls.JSON_BACKEND))
+            result_token, evaluations, run = rule._evaluate_event(event, None)
+            return identifier, (result_token, list(evaluations), run)
+        except Exception:
+            logger.exception("Could not evaluate record %s", identifier)
+            return identifier, None
+        finally:
+            _BATCH_RULE_INSTANCES[cls].append(rule)
+
+    @classmethod
+    def _acquire_batch_instance(cls):
+        instances = _BATCH_RULE_INSTANCES.setdefault(cls, [])
+        try:
+            return instances.pop()
+        except IndexError:
+            return cls(cls.APPLICABLE_RESOURCES)
+
     def __init__(self, applicable_resources=None):
         """
         If this rule is for handling ConfigurationChange events, then the "Applicable Resources" attribute must be set.
@@ -60,11 +266,42 @@ class AWSConfigRule(object):
             self.applicable_resources = self.APPLICABLE_RESOURCES
         else:
             self.applicable_resources = applicable_resources
+        self._resource_type_table = None
+        self._resource_type_source = None
         self.call_type = None
+        self._setup_parameters = _NOT_SET_UP
+        self.resume_cursor = None
+        self.cursor = None
+        #: The `executionRoleArn` from the last event, if there was one.
+        self.execution_role_arn = None
+        #: Number of duplicate evaluations dropped by the last event, when coalescing evaluations.
+        self.duplicate_evaluations = 0
+        #: Number of evaluations not sent by the last event because they had not changed, when using a state store.
+        self.unchanged_evaluations = 0
+        #: Number of evaluations fixed by validation in the last event.
+        self.fixed_evaluations = 0
+        #: Number of invalid evaluations dropped by validation in the last event.
+        self.rejected_evaluations = 0
+
+    @property
+    def resource_type_table(self):
+        """
+        The dispatch table for :py:attr:`applicable_resources`, rebuilt if the list is replaced.
+
+        :rtype: awslambdahelper.resourcetypes.ResourceTypeTable
+        """
+        if self._resource_type_source is not self.applicable_resources:
+            self._resource_type_table = ResourceTypeTable.for_rule(type(self), self.applicable_resources)
+            self._resource_type_source = self.applicable_resources
+        return self._resource_type_table
 
     @property
     def is_config_change_call(self):
-        return self.call_type == self.CALL_TYPE_CONFIGURATION_CHANGE
+        return self.call_type in (self.CALL_TYPE_CONFIGURATION_CHANGE, self.CALL_TYPE_OVERSIZED_CONFIGURATION_CHANGE)
+
+    @property
+    def is_oversized_config_change_call(self):
+        return self.call_type == self.CALL_TYPE_OVERSIZED_CONFIGURATION_CHANGE
 
     @property
     def is_scheduled_call(self):
@@ -72,7 +309,11 @@ class AWSConfigRule(object):
 
     @staticmethod
     def put_evaluations(*args, **kwargs):
-        return boto3.client("config").put_evaluations(
+        """
+        Send evaluations to AWS Config, using a client which is shared across warm invocations.
+        See :py:func:`~awslambdahelper.clients.get_client`.
+        """
+        return get_client("config").put_evaluations(
             *args, **kwargs
         )
 
@@ -81,64 +322,340 @@ class AWSConfigRule(object):
         .. deprecated:: 1.1.4
             Use :py:meth:`~awslambdahelper.AWSConfigRule.handler`
         """
-        invoking_event = json.loads(event["invokingEvent"])
-        if 'ruleParameters' in event:
-            rule_parameters = json.loads(event["ruleParameters"])
-        else:
-            rule_parameters = {}
+        metrics = NULL_METRICS if self.METRICS_SINK is None else Metrics(self.METRICS_NAMESPACE)
+        result_token, evaluations, run = self._evaluate_event(event, context, metrics)
+
+        # Evaluations are produced lazily, so each full chunk is sent while the rule is still producing the next.
+        submitter = EvaluationSubmitter(
+            metrics.timed_call("PutEvaluations", self.put_evaluations, counter="Requests"),
+            result_token,
+            max_in_flight=self.MAX_CONCURRENT_SUBMISSIONS,
+            chunk_size=self.MAX_EVALUATIONS_PER_REQUEST,
+            max_request_bytes=self.MAX_REQUEST_BYTES,
+            deadline=run.deadline
+        )
+        submitter.submit(evaluations)
+
+        self._finish_event(event, context, run)
+
+        if metrics.enabled:
+            metrics.add("Chunks", len(submitter.results))
+            metrics.add("Retries", metrics.get("Requests") - len(submitter.results))
+            metrics.add("DuplicateEvaluations", self.duplicate_evaluations)
+            metrics.add("UnchangedEvaluations", self.unchanged_evaluations)
+            metrics.add("FixedEvaluations", self.fixed_evaluations)
+            metrics.add("RejectedEvaluations", self.rejected_evaluations)
+            metrics.flush(self.METRICS_SINK, {"Rule": type(self).__name__})
+
+    def _evaluate_event(self, event, context, metrics=NULL_METRICS):
+        """
+        Decode an event, and start evaluating it.
+
+        :param metrics: Records the time spent decoding, evaluating and serialising.
+        :type metrics: awslambdahelper.metrics.Metrics
+        :return: The result token, a lazy iterator of evaluation payloads, and the state needed by
+            :py:meth:`~awslambdahelper.AWSConfigRule._finish_event` once the payloads have been sent.
+        :rtype: Tuple[str,Iterator[dict],awslambdahelper._EventRun]
+        """
+        run = _EventRun()
+        with metrics.timer("Decode"):
+            loads = get_decoder(self.JSON_BACKEND)
+            invoking_event = loads(event["invokingEvent"])
+            raw_rule_parameters = event.get("ruleParameters")
+            rule_parameters = self.parse_rule_parameters(raw_rule_parameters, loads)
+
+        if self._setup_parameters is _NOT_SET_UP or self._setup_parameters != raw_rule_parameters:
+            self.setup(rule_parameters)
+            self._setup_parameters = raw_rule_parameters
 
         self.call_type = invoking_event['messageType']
+        self.resume_cursor = event.get(CONTINUATION_CURSOR_KEY)
+        self.execution_role_arn = event.get("executionRoleArn")
+        self.cursor = None
 
         result_token = "No token found."
         if "resultToken" in event:
             result_token = event["resultToken"]
 
-        evaluations = []
+        evaluate_compliance = metrics.timed_call("Evaluate", self.evaluate_compliance)
 
         if self.is_config_change_call:
 
-            configuration_item = invoking_event["configurationItem"]
+            recorded = True
+            if self.is_oversized_config_change_call:
+                configuration_item = invoking_event["configurationItemSummary"]
+                if not event['eventLeftScope']:
+                    recorded_item = self.get_oversized_configuration_item(configuration_item)
+                    recorded = recorded_item is not None
+                    configuration_item = recorded_item or configuration_item
+            else:
+                configuration_item = invoking_event["configurationItem"]
+
             # If the resource has been deleted.
             if event['eventLeftScope']:
                 evaluation_responses = [NotApplicableEvaluation("Resource has been deleted")]
+            elif not recorded:
+                evaluation_responses = [AWSConfigEvaluation(
+                    AWSConfigEvaluation.TYPE_NOT_APPLICABLE,
+                    "No configuration has been recorded for this resource."
+                )]
             else:
-                evaluation_responses = self.evaluate_compliance(
+                if not isinstance(configuration_item, ConfigurationItem):
+                    configuration_item = ConfigurationItem(configuration_item)
+                evaluation_responses = evaluate_compliance(
                     config=configuration_item,
                     rule_parameters=rule_parameters,
                     event=event
                 )
 
-            for evaluation_response in evaluation_responses:
-                evaluation = evaluation_response.set(
-                    ResourceType=configuration_item["resourceType"],
-                    ResourceId=configuration_item["resourceId"],
-                    OrderingTimestamp=configuration_item["configurationItemCaptureTime"]
-                ).to_dict()
-                evaluations.append(evaluation)
+            evaluations = self._payloads(
+                _timed_responses(metrics, evaluation_responses),
+                ResourceType=configuration_item["resourceType"],
+                ResourceId=configuration_item["resourceId"],
+                OrderingTimestamp=configuration_item["configurationItemCaptureTime"]
+            )
         else:
-            evaluation_responses = self.evaluate_compliance(
+            evaluation_responses = evaluate_compliance(
                 rule_parameters=rule_parameters,
                 event=event
             )
 
-            for evaluation_response in evaluation_responses:
-                evaluations.append(evaluation_response.set(
-                    OrderingTimestamp=invoking_event["notificationCreationTime"]
-                ).to_dict())
-
-        # There's a max number of evaluations we can apply to put_evaluations at once. It's 100.
-        chunk_size = 100
-        for evaluation_chunk in range(0, len(evaluations), chunk_size):
-            self.put_evaluations(
-                Evaluations=evaluations[evaluation_chunk:evaluation_chunk + chunk_size],
-                ResultToken=result_token
+            evaluations = self._payloads(
+                _timed_responses(metrics, evaluation_responses),
+                OrderingTimestamp=invoking_event["notificationCreationTime"]
             )
 
+        evaluations = metrics.timed("Serialise", evaluations, counter="Evaluations")
+
+        if self.VALIDATE_EVALUATIONS:
+            run.validator = EvaluationValidator()
+            evaluations = run.validator.filter(evaluations)
+
+        # Only a generator still has work left to do. A list is work already done, so all of it is sent.
+        run.deadline = Deadline.from_context(context, self.DEADLINE_SAFETY_MARGIN_MS)
+        if run.deadline is not None and _is_lazy(evaluation_responses):
+            evaluations = run.deadline.iterate(evaluations)
+
+        if self.COALESCE_EVALUATIONS:
+            coalescer = EvaluationCoalescer(self.COMPLIANCE_PRECEDENCE)
+            evaluations = coalescer.coalesce(evaluations)
+            self.duplicate_evaluations = coalescer.dropped
+
+        if self.STATE_STORE is not None and self.is_scheduled_call:
+            run.delta_filter = DeltaFilter(self.STATE_STORE, event.get("configRuleName"), self.STATE_REFRESH_SECONDS)
+            evaluations = run.delta_filter.filter(evaluations)
+
+        return result_token, evaluations, run
+
+    def _finish_event(self, event, context, run):
+        """
+        Record the outcome of an event once its evaluations have been sent, and continue it in a follow-up
+        invocation if the deadline was reached.
+        """
+        if run.delta_filter is not None:
+            run.delta_filter.commit()
+            self.unchanged_evaluations = run.delta_filter.skipped
+
+        if run.validator is not None:
+            self.fixed_evaluations = run.validator.fixed
+            self.rejected_evaluations = run.validator.rejected
+
+        if run.deadline is not None and run.deadline.reached:
+            if self.cursor is None:
+                logger.warning(
+                    "Deadline reached before %s called checkpoint(). Evaluations not yet produced for result token "
+                    "'%s' were dropped, and no follow-up invocation was queued.",
+                    type(self).__name__, event.get("resultToken")
+                )
+                return
+
+            continuation_event = dict(event)
+            continuation_event[CONTINUATION_CURSOR_KEY] = self.cursor
+            self.REINVOKER(continuation_event, context)
+
+    @staticmethod
+    def _payloads(evaluation_responses, **kwargs):
+        """
+        Lazily convert the evaluations returned by a rule to payloads, after applying `kwargs` to each one as in
+        :py:meth:`~awslambdahelper.evaluation.AWSConfigEvaluation.set`.
+
+        :param evaluation_responses: A list, generator or :py:class:`~awslambdahelper.evaluation.EvaluationBatch`.
+        :rtype: Iterator[dict]
+        """
+        if isinstance(evaluation_responses, EvaluationBatch):
+            return evaluation_responses.to_dicts(**kwargs)
+
+        return (
+            evaluation_response.set(**kwargs).to_dict()
+            for evaluation_response in evaluation_responses
+        )
+
+    def checkpoint(self, cursor):
+        """
+        Record how far a rule has got, so a follow-up invocation can carry on from there if the deadline is reached.
+        The follow-up invocation finds the cursor in :py:attr:`resume_cursor`.
+
+        >>> class MyScheduledRule(AWSConfigRule):
+        ...     DEADLINE_SAFETY_MARGIN_MS = 10000
+        ...     def find_violation_scheduled(self, rule_parameters, accountid):
+        ...         for page, token in list_resource_pages(start=self.resume_cursor):
+        ...             for resource in page:
+        ...                 yield evaluate(resource)
+        ...             self.checkpoint(token)
+
+        :param cursor: Where to resume from. Must be JSON serialisable.
+        """
+        self.cursor = cursor
+
+    @staticmethod
+    def parse_rule_parameters(raw_rule_parameters, loads=json.loads):
+        """
+        Decode the `ruleParameters` JSON string from the event. Rule parameters rarely change, so the parsed
+        parameters are cached in :py:data:`~awslambdahelper.RULE_PARAMETERS_CACHE` across warm invocations. Each
+        call returns a shallow copy, so a rule can add or remove parameters without affecting later invocations.
+
+        :param raw_rule_parameters: The `ruleParameters` from the event, if there are any.
+        :type raw_rule_parameters: str
+        :param loads: The JSON parser to use. See :py:func:`~awslambdahelper.jsondecode.get_decoder`.
+        :type loads: callable
+        :rtype: dict
+        """
+        if raw_rule_parameters is None:
+            return {}
+
+        rule_parameters = RULE_PARAMETERS_CACHE.get(raw_rule_parameters)
+        if rule_parameters is None:
+            rule_parameters = loads(raw_rule_parameters)
+            RULE_PARAMETERS_CACHE.put(raw_rule_parameters, rule_parameters)
+        return dict(rule_parameters)
+
+    def setup(self, rule_parameters):
+        """
+        Optional hook for expensive preparation, such as building lookup tables from the rule parameters.
+        Rule instances are reused across warm invocations by :py:meth:`~awslambdahelper.AWSConfigRule.handler`, so
+        this runs once per container, and again only if the rule parameters change.
+
+        :param rule_parameters: The parsed rule parameters.
+        :type rule_parameters: dict
+        """
+        pass
+
+    def execution_role_session(self, region_name=None):
+        """
+        A session for the `executionRoleArn` from the event, such as the role AWS Config uses in a member account of
+        an organization rule. Sessions are cached by role and region, and their credentials are refreshed shortly
+        before they expire, so the role is not assumed again on every invocation.
+
+        :param region_name: Region of the session.
+        :type region_name: str
+        :return: The session, or None if the event had no `executionRoleArn`.
+        :rtype: Union[boto3.session.Session,None]
+        """
+        if self.execution_role_arn is None:
+            return None
+        return self.ASSUMED_ROLE_SESSIONS.session(self.execution_role_arn, region_name)
+
+    def execution_role_client(self, service_name, region_name=None):
+        """
+        A cached client using the `executionRoleArn` from the event, or the function's own credentials if the
+        event had none.
+
+        >>> for bucket in self.execution_role_client("s3").list_buckets()["Buckets"]:
+        ...     yield evaluate(bucket)
+
+        :param service_name: Name of the AWS service, eg "s3".
+        :type service_name: str
+        :param region_name: Region for the client.
+        :type region_name: str
+        :return: A boto3 client
+        """
+        if self.execution_role_arn is None:
+            return get_client(service_name, region_name=region_name)
+        return self.ASSUMED_ROLE_SESSIONS.client(service_name, self.execution_role_arn, region_name=region_name)
+
+    def inventory(self, service_name, operation_name, result_key, **kwargs):
+        """
+        Iterate over every result of a paginated API call. The next
+        :py:attr:`INVENTORY_PREFETCH_PAGES` pages are fetched in the background while the current one is evaluated.
+        Fetching stops when the iteration does, even if the rule stops early.
+
+        >>> for instance in self.inventory("ec2", "describe_instances", "Reservations"):
+        ...     yield evaluate(instance)
+
+        :param service_name: Name of the AWS service, eg "ec2".
+        :type service_name: str
+        :param operation_name: Name of a paginated boto3 operation, eg "describe_instances".
+        :type operation_name: str
+        :param result_key: Key of the list of results in each page, eg "Reservations".
+        :type result_key: str
+        :param kwargs: Arguments for the operation.
+        :rtype: Iterator
+        """
+        iterator = PrefetchingIterator(
+            paginate(get_client(service_name), operation_name, result_key, **kwargs),
+            prefetch=self.INVENTORY_PREFETCH_PAGES
+        )
+        try:
+            for item in iterator:
+                yield item
+        finally:
+            iterator.close()
+
+    def discovered_resources(self, resource_type, **kwargs):
+        """
+        Iterate over the resources of a type which AWS Config has discovered, using
+        :py:meth:`~awslambdahelper.AWSConfigRule.inventory`.
+
+        :param resource_type: eg "AWS::EC2::Instance"
+        :type resource_type: str
+        :param kwargs: Other arguments for `list_discovered_resources`.
+        :return: Resource identifiers, with the `resourceType` and `resourceId` of each resource.
+        :rtype: Iterator[dict]
+        """
+        return self.inventory(
+            "config", "list_discovered_resources", "resourceIdentifiers",
+            resourceType=resource_type, **kwargs
+        )
+
+    def get_oversized_configuration_item(self, summary):
+        """
+        Fetch the full configuration item for an oversized configuration change notification. Items are cached in
+        :py:data:`~awslambdahelper.configitem.CONFIGURATION_ITEM_CACHE` across warm invocations, and so should be
+        treated as read only.
+
+        :param summary: The `configurationItemSummary` from the invoking event.
+        :type summary: dict
+        :return: The configuration item, in the same format as a `configurationItem` in a change notification, or
+            None if AWS Config has no recorded configuration for the resource.
+        :rtype: Union[dict,None]
+        """
+        cache_key = configuration_item_cache_key(summary)
+        configuration_item = CONFIGURATION_ITEM_CACHE.get(cache_key)
+
+        if configuration_item is None:
+            response = self._aws_call(lambda: get_client("config").get_resource_config_history(
+                resourceType=summary["resourceType"],
+                resourceId=summary["resourceId"],
+                laterTime=summary["configurationItemCaptureTime"],
+                limit=1
+            ))
+            if not response["configurationItems"]:
+                logger.warning("No configuration has been recorded for %s %s",
+                               summary["resourceType"], summary["resourceId"])
+                return None
+            configuration_item = convert_api_configuration_item(response["configurationItems"][0])
+            CONFIGURATION_ITEM_CACHE.put(cache_key, configuration_item)
+
+        return configuration_item
+
     def evaluate_compliance(self, rule_parameters, event, config=None):
         """
         A facade to delegate the event to either the :py:meth:`~awslambdahelper.AWSConfigRule.find_violation_config_change`, or
         :py:meth:`~awslambdahelper.AWSConfigRule.find_violation_scheduled`.
 
+        Configuration items are passed to the rule's method for their resource type instead, if it has one, eg
+        :code:`evaluate_AWS_EC2_Instance(self, rule_parameters, config)`.
+
         :param rule_parameters: A list of key/pairs which are to be provided to the rule.
         :type: dict
         :param event:
@@ -146,30 +663,87 @@ class AWSConfigRule(object):
         :return:
         """
         if self.is_config_change_call:
-            if config["resourceType"] not in self.applicable_resources:
+            handler = self.resource_type_table.handler(config["resourceType"])
+            if handler is None:
                 return [NotApplicableEvaluation(
                     ResourceType=config["resourceType"],
                 )]
 
-            violations = self.find_violation_config_change(
-                rule_parameters=rule_parameters,
-                config=config
-            )
+            if self.CACHE_EVALUATIONS:
+                violations = self._cached_find_violation_config_change(rule_parameters, config, handler)
+            else:
+                violations = getattr(self, handler)(
+                    rule_parameters=rule_parameters,
+                    config=config
+                )
         else:
-            violations = self.find_violation_scheduled(
+            shards = self.shards_scheduled(
                 rule_parameters=rule_parameters,
                 accountid=event['accountId']
             )
+            if shards is None:
+                violations = self.find_violation_scheduled(
+                    rule_parameters=rule_parameters,
+                    accountid=event['accountId']
+                )
+            else:
+                violations = self._evaluate_shards(shards, rule_parameters, event['accountId'])
+
+        return violations
+
+    def _cached_find_violation_config_change(self, rule_parameters, config, handler=DEFAULT_HANDLER):
+        """
+        Run the `handler` method, eg :py:meth:`~awslambdahelper.AWSConfigRule.find_violation_config_change`, unless
+        its evaluations for this configuration and these rule parameters are already cached.
+
+        :rtype: List[awslambdahelper.evaluation.AWSConfigEvaluation]
+        """
+        cache = EvaluationResultCache(EVALUATION_CACHE, self.PERSISTENT_EVALUATION_CACHE)
+        key = cache.key(
+            type(self).__module__ + "." + type(self).__name__,
+            config,
+            rule_parameters,
+            self.CACHE_CONFIGURATION_FIELDS
+        )
+
+        violations = cache.get(key)
+        if violations is None:
+            violations = getattr(self, handler)(
+                rule_parameters=rule_parameters,
+                config=config
+            )
+            if not isinstance(violations, EvaluationBatch):
+                violations = list(violations)
+            cache.put(key, violations)
 
         return violations
 
+    def _evaluate_shards(self, shards, rule_parameters, accountid):
+        """
+        Run :py:meth:`~awslambdahelper.AWSConfigRule.find_violation_scheduled_shard` for each shard on a pool of
+        :py:attr:`MAX_SHARD_WORKERS` threads, and yield the evaluations of each shard as soon as it finishes.
+        """
+        def evaluate_shard(shard):
+            return list(self.find_violation_scheduled_shard(
+                rule_parameters=rule_parameters,
+                accountid=accountid,
+                shard=shard
+            ))
+
+        for evaluations in imap_unordered(evaluate_shard, shards, self.MAX_SHARD_WORKERS):
+            for evaluation in evaluations:
+                yield evaluation
+
     @backoff.on_exception(backoff.expo,
                           botocore.exceptions.ClientError,
                           max_tries=MAX_BACKOFF_TRIES,
-                          jitter=backoff.full_jitter)
+                          max_time=MAX_BACKOFF_TIME_SECONDS,
+                          giveup=lambda e: not is_throttling_error(e),
+                          jitter=backoff.full_jitter,
+                          max_value=MAX_BACKOFF_SECONDS)
     def _aws_call(self, callable):
         """
-        Wrapper to ease testing.
+        Wrapper to ease testing. Throttled calls are retried, and any other error is raised straight away.
         Decorators make mocking functions that just little bit harder. For this reason, pass
         a callable into this method which can handle our AWS calls.
 
@@ -182,17 +756,57 @@ class AWSConfigRule(object):
         """
         Place holder function for configuration change rules. Needs to be overriden by super class.
 
+        May return a list of evaluations, or be a generator yielding them.
+
         :raises: NotImplementedError
         :param rule_parameters:
-        :param config:
+        :param config: The configuration item. It can be used as a dict, and also offers indexed lookups of its
+            relationships and tags.
+        :type config: awslambdahelper.configitem.ConfigurationItem
         :return: None
         """
         raise NotImplementedError(type(self).__name__ + ":find_violation_config_change() is not implemented.")
 
+    def shards_scheduled(self, rule_parameters, accountid):
+        """
+        Override to split the work of a scheduled rule into independent shards, such as resource types, regions or
+        resource id prefixes. Each shard is then passed to
+        :py:meth:`~awslambdahelper.AWSConfigRule.find_violation_scheduled_shard` on a pool of
+        :py:attr:`MAX_SHARD_WORKERS` threads, instead of calling
+        :py:meth:`~awslambdahelper.AWSConfigRule.find_violation_scheduled`.
+
+        >>> class MyShardedRule(AWSConfigRule):
+        ...     def shards_scheduled(self, rule_parameters, accountid):
+        ...         return ["us-east-1", "eu-west-1"]
+        ...     def find_violation_scheduled_shard(self, rule_parameters, accountid, shard):
+        ...         return [CompliantEvaluation(ResourceType=..., ResourceId=...)]
+
+        :param rule_parameters:
+        :param accountid:
+        :return: A list of shards, or None if this rule is not sharded.
+        """
+        return None
+
+    def find_violation_scheduled_shard(self, rule_parameters, accountid, shard):
+        """
+        Place holder function for sharded scheduled rules. Needs to be overriden by super class if
+        :py:meth:`~awslambdahelper.AWSConfigRule.shards_scheduled` is. Called from a worker thread, so any state
+        shared between shards must be thread safe.
+
+        :param rule_parameters:
+        :param accountid:
+        :param shard: One of the shards returned by :py:meth:`~awslambdahelper.AWSConfigRule.shards_scheduled`.
+        :return: None
+        """
+        raise NotImplementedError(type(self).__name__ + ":find_violation_scheduled_shard() is not implemented.")
+
     def find_violation_scheduled(self, rule_parameters, accountid):
         """
         Place holder function for configuration change rules. Needs to be overriden by super class.
 
+        May return a list of evaluations, or be a generator yielding them. Evaluations from a generator are sent to
+        AWS Config in chunks as they are produced, rather than once the whole scan has finished.
+
         :param rule_parameters:
         :param accountid:
         :return: None
@@ -200,10 +814,125 @@ class AWSConfigRule(object):
         raise NotImplementedError(type(self).__name__ + ":find_violation_scheduled() is not implemented.")
 
 
+class AsyncAWSConfigRule(AWSConfigRule):
+    """
+    A rule which fans out to many AWS API calls at once. :py:meth:`~awslambdahelper.AsyncAWSConfigRule.call_async`
+    starts a boto3 call on a thread pool and returns a :py:class:`concurrent.futures.Future`, so the
+    :code:`find_violation_*` methods can start every call they need before waiting on any of them.
+
+    >>> class MyRule(AsyncAWSConfigRule):
+    ...     SERVICE_CONCURRENCY = {"ec2": 5}
+    ...     def find_violation_config_change(self, rule_parameters, config):
+    ...         futures = [
+    ...             self.call_async("ec2", "describe_volumes", VolumeIds=[relationship["resourceId"]])
+    ...             for relationship in config["relationships"]
+    ...         ]
+    ...         return [evaluate(volumes) for volumes in self.gather(futures)]
+    """
+    #: Maximum number of AWS API calls in flight at once, across every service.
+    MAX_ASYNC_CALLS = 32
+    #: Maximum number of calls in flight for a service not listed in :py:attr:`SERVICE_CONCURRENCY`.
+    MAX_ASYNC_CALLS_PER_SERVICE = 10
+    #: Maximum number of calls in flight per service, eg :code:`{"ec2": 5, "iam": 2}`.
+    SERVICE_CONCURRENCY = {}
+
+    def __init__(self, applicable_resources=None):
+        super(AsyncAWSConfigRule, self).__init__(applicable_resources)
+        self._executor = None
+        self._services = {}
+        self._lock = threading.Lock()
+
+    def call_async(self, service_name, operation_name, **kwargs):
+        """
+        Start a boto3 call on the rule's thread pool. Calls beyond the service's concurrency limit wait in a queue
+        for that service, so they don't hold threads which calls to other services could use.
+
+        :param service_name: Name of the AWS service, eg "ec2".
+        :type service_name: str
+        :param operation_name: Name of the boto3 client method, eg "describe_volumes".
+        :type operation_name: str
+        :param kwargs: Arguments for the call.
+        :return: A future holding the response.
+        :rtype: concurrent.futures.Future
+        """
+        future = Future()
+        with self._lock:
+            service = self._services.get(service_name)
+            if service is None:
+                service = self._services[service_name] = _ServiceQueue(
+                    service_name,
+                    self.SERVICE_CONCURRENCY.get(service_name, self.MAX_ASYNC_CALLS_PER_SERVICE)
+                )
+            service.pending.append((future, operation_name, kwargs))
+        self._dispatch(service)
+        return future
+
+    @staticmethod
+    def gather(futures):
+        """
+        Wait for every future, and return their results in the same order.
+
+        :type futures: Iterable[concurrent.futures.Future]
+        :rtype: list
+        :raises: The first exception raised by any of the calls.
+        """
+        return [future.result() for future in futures]
+
+    @property
+    def executor(self):
+        """
+        The thread pool used for calls. It is created on first use, and kept across warm invocations.
+
+        :rtype: concurrent.futures.ThreadPoolExecutor
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.MAX_ASYNC_CALLS)
+        return self._executor
+
+    def _dispatch(self, service):
+        # Hand queued calls to the pool while the service has free slots.
+        calls = []
+        with self._lock:
+            while service.running < service.limit and service.pending:
+                service.running += 1
+                calls.append(service.pending.popleft())
+        for future, operation_name, kwargs in calls:
+            self.executor.submit(self._call, service, future, operation_name, kwargs)
+
+    def _call(self, service, future, operation_name, kwargs):
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = getattr(get_client(service.name), operation_name)(**kwargs)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            with self._lock:
+                service.running -= 1
+            self._dispatch(service)
+
+
+class _ServiceQueue(object):
+    """
+    Calls to one service waiting for a free slot in :py:class:`~awslambdahelper.AsyncAWSConfigRule`.
+    """
+
+    def __init__(self, name, limit):
+        self.name = name
+        self.limit = limit
+        self.running = 0
+        self.pending = deque()
+
+
 class CompliantEvaluation(AWSConfigEvaluation):
     """
     A rule is compliant if all of the resources that the rule evaluates comply with it,
     """
+    __slots__ = ()
 
     def __init__(self, Annotation="This resource is compliant with the rule.", ResourceType=None,
                  ResourceId=None,
@@ -232,6 +961,7 @@ class NonCompliantEvaluation(AWSConfigEvaluation):
     """
     A rule is noncompliant if any of these resources do not comply.
     """
+    __slots__ = ()
 
     def __init__(self, Annotation, ResourceType=None, ResourceId=None,
                  OrderingTimestamp=None):
@@ -259,6 +989,7 @@ class NotApplicableEvaluation(AWSConfigEvaluation):
     """
     This resource is not applicable for this rule.
     """
+    __slots__ = ()
 
     def __init__(self, ResourceType, ResourceId=None,
                  OrderingTimestamp=None):
@@ -285,6 +1016,7 @@ class InsufficientDataEvaluation(AWSConfigEvaluation):
     AWS Config returns the INSUFFICIENT_DATA value when no evaluation results are available for the AWS resource or
     Config rule.
     """
+    __slots__ = ()
 
     def __init__(self, Annotation, ResourceType=None, ResourceId=None,
                  OrderingTimestamp=None):
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Run a configuration change rule over a snapshot of configuration items outside of Lambda, to check how a change to
+the rule would affect its evaluations.
+
+Items are read from a JSONL file with one configuration item per line, or from a directory of `.json` files each
+holding one configuration item, a list of them, or a change notification. They are decoded and evaluated across a
+pool of processes, and nothing is sent to AWS Config. Documents are only read as the workers are ready for them, so
+snapshots larger than memory can be evaluated.
+"""
+import json
+import multiprocessing
+import os
+import threading
+import time
+from itertools import islice
+
+from awslambdahelper.configitem import ConfigurationItem
+from awslambdahelper.dispatch import load_rule_class
+from awslambdahelper.jsondecode import get_decoder
+
+#: Number of items sent to a worker process at a time.
+CHUNK_SIZE = 64
+#: Number of chunks read ahead for each worker process. No more documents are read until a chunk's results are back.
+CHUNKS_IN_FLIGHT_PER_PROCESS = 2
+
+# The rule used by this worker process, created by _init_worker.
+_WORKER = {}
+
+
+def read_documents(path):
+    """
+    Yield the undecoded JSON documents from a JSONL file, or from each `.json` file under a directory. Decoding is
+    left to the worker processes.
+
+    :param path: A JSONL file, or a directory.
+    :type path: str
+    :rtype: Iterator[str]
+    """
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file_name in sorted(files):
+                if file_name.endswith(".json"):
+                    with open(os.path.join(root, file_name)) as f:
+                        yield f.read()
+    else:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield line
+
+
+def configuration_items(document):
+    """
+    :param document: A decoded configuration item, list of configuration items, or change notification.
+    :rtype: List[dict]
+    """
+    if isinstance(document, list):
+        items = []
+        for entry in document:
+            items.extend(configuration_items(entry))
+        return items
+
+    if "invokingEvent" in document:
+        document = json.loads(document["invokingEvent"])
+    if "configurationItem" in document:
+        document = document["configurationItem"]
+    return [document]
+
+
+class BatchResult(object):
+    """
+    Counts of a batch run, and its throughput.
+    """
+
+    def __init__(self):
+        #: Number of configuration items evaluated.
+        self.items = 0
+        #: Number of evaluations produced.
+        self.evaluations = 0
+        #: `(resource id, error message)` for each item the rule raised an exception on.
+        self.errors = []
+        #: Wall clock time taken, in seconds.
+        self.seconds = 0.0
+
+    @property
+    def items_per_second(self):
+        """
+        :rtype: float
+        """
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return "{items} items, {evaluations} evaluations, {errors} errors in {seconds:.2f}s " \
+               "({rate:.0f} items/s)".format(items=self.items, evaluations=self.evaluations,
+                                             errors=len(self.errors), seconds=self.seconds,
+                                             rate=self.items_per_second)
+
+
+class BatchEvaluator(object):
+    """
+    Evaluates configuration items with
+    :py:meth:`~awslambdahelper.AWSConfigRule.evaluate_compliance`, as if each had arrived in a change notification.
+    Each worker process creates one instance of the rule, and calls its
+    :py:meth:`~awslambdahelper.AWSConfigRule.setup` hook once.
+
+    >>> evaluator = BatchEvaluator("my_rules:EncryptedVolumesRule", {"kmsKeyId": "..."}, processes=8)
+    >>> with open("evaluations.jsonl", "w") as output:
+    ...     result = evaluator.run(read_documents("snapshot.jsonl"), output)
+    >>> print(result)
+    """
+
+    def __init__(self, rule_class_path, rule_parameters=None, processes=None, chunk_size=CHUNK_SIZE):
+        """
+        :param rule_class_path: See :py:func:`~awslambdahelper.dispatch.load_rule_class`. The rule class is imported
+            by each worker process.
+        :type rule_class_path: str
+        :param rule_parameters: The parsed rule parameters.
+        :type rule_parameters: dict
+        :param processes: Number of worker processes. Defaults to the number of CPUs. When 1, items are evaluated in
+            this process.
+        :type processes: int
+        :param chunk_size: Number of documents sent to a worker at a time.
+        :type chunk_size: int
+        """
+        self.rule_class_path = rule_class_path
+        self.rule_parameters = rule_parameters or {}
+        self.processes = processes or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+
+    def evaluate(self, documents, result=None):
+        """
+        :param documents: Undecoded JSON documents, eg from :py:func:`~awslambdahelper.backtest.read_documents`.
+        :type documents: Iterable[str]
+        :param result: Updated with the counts of the run.
+        :type result: awslambdahelper.backtest.BatchResult
+        :return: Evaluation payloads, in no particular order.
+        :rtype: Iterator[dict]
+        """
+        result = BatchResult() if result is None else result
+        started = time.time()
+
+        if self.processes == 1:
+            _init_worker(self.rule_class_path, self.rule_parameters)
+            outputs = (_evaluate_document(document) for document in documents)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(self.processes, _init_worker, (self.rule_class_path, self.rule_parameters))
+            # The pool reads its whole input up front, so chunks are only handed over while there is room for them.
+            window = _Window(self.processes * CHUNKS_IN_FLIGHT_PER_PROCESS)
+            outputs = pool.imap_unordered(_evaluate_chunk, window.chunks(documents, self.chunk_size))
+
+        try:
+            for items, evaluations, errors in outputs:
+                if pool is not None:
+                    window.release()
+                result.items += items
+                result.evaluations += len(evaluations)
+                result.errors.extend(errors)
+                for evaluation in evaluations:
+                    yield evaluation
+        finally:
+            if pool is not None:
+                window.close()
+                pool.terminate()
+                pool.join()
+            result.seconds = time.time() - started
+
+    def run(self, documents, output):
+        """
+        Evaluate `documents`, and write each evaluation to `output` as a line of JSON.
+
+        :type documents: Iterable[str]
+        :param output: A writable text file.
+        :rtype: awslambdahelper.backtest.BatchResult
+        """
+        result = BatchResult()
+        for evaluation in self.evaluate(documents, result):
+            output.write(json.dumps(evaluation, sort_keys=True, default=str))
+            output.write("\n")
+        return result
+
+
+class _Window(object):
+    """
+    Limits the number of chunks handed to the pool which have not had their results read yet.
+    """
+
+    def __init__(self, size):
+        self._slots = threading.Semaphore(size)
+        self._closed = False
+
+    def chunks(self, documents, chunk_size):
+        documents = iter(documents)
+        while True:
+            self._slots.acquire()
+            if self._closed:
+                return
+            chunk = list(islice(documents, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def release(self):
+        self._slots.release()
+
+    def close(self):
+        # Wake the pool's task thread if it is waiting for a slot, so the pool can shut down.
+        self._closed = True
+        self._slots.release()
+
+
+def _init_worker(rule_class_path, rule_parameters):
+    rule_class = load_rule_class(rule_class_path)
+    rule = rule_class()
+    rule.call_type = rule_class.CALL_TYPE_CONFIGURATION_CHANGE
+    rule.setup(rule_parameters)
+    _WORKER["rule"] = rule
+    _WORKER["rule_parameters"] = rule_parameters
+
+
+def _evaluate_chunk(documents):
+    items = 0
+    evaluations = []
+    errors = []
+    for document in documents:
+        document_items, document_evaluations, document_errors = _evaluate_document(document)
+        items += document_items
+        evaluations.extend(document_evaluations)
+        errors.extend(document_errors)
+    return items, evaluations, errors
+
+
+def _evaluate_document(document):
+    rule = _WORKER["rule"]
+    items = configuration_items(get_decoder()(document))
+    evaluations = []
+    errors = []
+
+    for item in items:
+        item = ConfigurationItem(item)
+        try:
+            responses = rule.evaluate_compliance(
+                rule_parameters=_WORKER["rule_parameters"],
+                event={"accountId": item.get("awsAccountId")},
+                config=item
+            )
+            evaluations.extend(rule._payloads(
+                responses,
+                ResourceType=item["resourceType"],
+                ResourceId=item["resourceId"],
+                OrderingTimestamp=item.get("configurationItemCaptureTime")
+            ))
+        except Exception as e:
+            errors.append((item.get("resourceId"), "{0}: {1}".format(type(e).__name__, e)))
+
+    return len(items), evaluations, errors
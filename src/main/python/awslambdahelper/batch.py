@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers for :py:meth:`~awslambdahelper.AWSConfigRule.batch_handler`, which evaluates a batch of AWS Config rule events
+in one invocation, such as events buffered in an SQS queue.
+
+A batch is either an SQS event, whose record bodies are rule events or EventBridge events carrying a rule event as
+their `detail`, or a plain list of rule events. Failures are reported in the SQS partial batch response format, so
+only the failed messages are retried.
+"""
+import json
+
+
+def batch_records(batch):
+    """
+    :param batch: An SQS event, or a list of rule events.
+    :type batch: Union[dict,list]
+    :return: `(identifier, event)` pairs. The identifier is the SQS message id, or the position in the list. The
+        event may still be an undecoded JSON string, see :py:func:`~awslambdahelper.batch.decode_record`.
+    :rtype: List[tuple]
+    """
+    if isinstance(batch, dict) and "Records" in batch:
+        return [(record["messageId"], record["body"]) for record in batch["Records"]]
+    return list(enumerate(batch))
+
+
+def decode_record(event, loads=json.loads):
+    """
+    :param event: A rule event, or the JSON body of a queued message.
+    :type event: Union[dict,str]
+    :param loads: The JSON parser to use.
+    :type loads: callable
+    :return: The rule event.
+    :rtype: dict
+    """
+    if not isinstance(event, dict):
+        event = loads(event)
+    if "invokingEvent" not in event and isinstance(event.get("detail"), dict):
+        event = event["detail"]
+    return event
+
+
+def batch_response(failed_identifiers):
+    """
+    :param failed_identifiers: Identifiers of the records which could not be evaluated or sent.
+    :type failed_identifiers: Iterable
+    :return: A partial batch response.
+    :rtype: dict
+    """
+    return {"batchItemFailures": [{"itemIdentifier": identifier} for identifier in failed_identifiers]}
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+In-memory caches which live at module scope, and so survive between warm Lambda invocations.
+"""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """
+    A thread safe, size bounded mapping which evicts the least recently used entry once it is full.
+    """
+
+    def __init__(self, maxsize=128):
+        """
+        :param maxsize: Maximum number of entries to hold.
+        :type maxsize: int
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Fetch an entry, and mark it as the most recently used.
+
+        :param key: Any hashable value.
+        :param default: Returned if the key is not in the cache.
+        """
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Add or replace an entry, evicting the least recently used entry if the cache is full.
+
+        :param key: Any hashable value.
+        :param value: The value to store.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """
+        Drop every entry, and reset the hit and miss counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
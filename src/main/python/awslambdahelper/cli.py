@@ -7,6 +7,7 @@ import zipfile
 
 import argparse
 import glob
+import json
 import os
 import shutil
 import sys
@@ -14,6 +15,8 @@ import tempfile
 import pip
 from zipfile import ZipFile
 
+from awslambdahelper.backtest import BatchEvaluator, read_documents
+
 
 class BundlerArgumentParser(argparse.ArgumentParser):
     """
@@ -190,6 +193,60 @@ class LambdahelperBundler(object):
         )
 
 
+class BacktestArgumentParser(argparse.ArgumentParser):
+    """
+    Parses command line arguments for :py:class:`~awslambdahelper.cli.LambdahelperBacktest`.
+    """
+
+    def __init__(self):
+        super(BacktestArgumentParser, self).__init__()
+        self.add_argument('rule', help='Rule class to run, eg `my_rules.encryption:EncryptedVolumesRule`.')
+        self.add_argument('--input', required=True,
+                          help='JSONL file of configuration items, or a directory of JSON files.')
+        self.add_argument('--output', default='-', help='Where to write evaluations as JSONL. Defaults to stdout.')
+        self.add_argument('--rule-parameters', default='{}', type=json.loads,
+                          help='Rule parameters, as a JSON object.')
+        self.add_argument('--processes', type=int, default=None,
+                          help='Number of worker processes. Defaults to the number of CPUs.')
+        self.add_argument('--chunk-size', type=int, default=64,
+                          help='Number of items sent to a worker process at a time.')
+
+
+class LambdahelperBacktest(object):
+    """
+    Handler for the cli tool to run a rule over a snapshot of configuration items.
+    See :py:mod:`awslambdahelper.backtest`.
+    """
+
+    def run(self, args=None):
+        """
+        Entrypoint for our backtest cli tool
+
+        :param args: defaults to :py:data:`sys.argv[1:]`
+        :return: The counts of the run.
+        :rtype: awslambdahelper.backtest.BatchResult
+        """
+        cli_args = BacktestArgumentParser().parse_args(sys.argv[1:] if args is None else args)
+
+        evaluator = BatchEvaluator(
+            cli_args.rule,
+            rule_parameters=cli_args.rule_parameters,
+            processes=cli_args.processes,
+            chunk_size=cli_args.chunk_size
+        )
+
+        if cli_args.output == '-':
+            result = evaluator.run(read_documents(cli_args.input), sys.stdout)
+        else:
+            with open(cli_args.output, 'w') as output:
+                result = evaluator.run(read_documents(cli_args.input), output)
+
+        for resource_id, error in result.errors:
+            sys.stderr.write("Error evaluating {0}: {1}\n".format(resource_id, error))
+        sys.stderr.write(str(result) + "\n")
+        return result
+
+
 class SetupCfgFile(ConfigParser.ConfigParser, object):
     """
     Make sure we have a setup.cfg file with an empty install.prefix for uploading to lambda.
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Process wide cache of boto3 clients. Lambda keeps the python process alive between warm invocations, so anything
+held at module scope survives from one event to the next. Caching clients here means we only pay for client
+construction, endpoint resolution and the connection pool once per container.
+
+Rules evaluating other accounts can use sessions for an assumed role, such as the `executionRoleArn` from the event.
+These are cached too, and their credentials are refreshed shortly before they expire.
+"""
+import threading
+
+import boto3
+import botocore.config
+import botocore.credentials
+import botocore.session
+
+#: Maximum number of connections kept open in each client's connection pool.
+MAX_POOL_CONNECTIONS = 25
+#: Send TCP keep-alive probes on pooled connections, so idle connections survive between warm invocations.
+TCP_KEEPALIVE = True
+#: Lifetime requested for assumed role credentials.
+ASSUMED_ROLE_DURATION_SECONDS = 60 * 60
+#: Session name used when assuming roles, which appears in CloudTrail.
+ASSUMED_ROLE_SESSION_NAME = "awslambdahelper"
+
+
+class ClientCache(object):
+    """
+    Lazily creates boto3 clients, and hands back the same client for the same service, region and credentials.
+    """
+
+    def __init__(self, max_pool_connections=MAX_POOL_CONNECTIONS, tcp_keepalive=TCP_KEEPALIVE,
+                 connect_timeout=None, read_timeout=None):
+        """
+        :param max_pool_connections: Size of the urllib3 connection pool for each client.
+        :type max_pool_connections: int
+        :param tcp_keepalive: Enable TCP keep-alive. Ignored on versions of botocore which do not support it.
+        :type tcp_keepalive: bool
+        :param connect_timeout: Seconds to wait for a connection. Defaults to the botocore default.
+        :type connect_timeout: Union[int,float]
+        :param read_timeout: Seconds to wait for a response. Defaults to the botocore default.
+        :type read_timeout: Union[int,float]
+        """
+        self.max_pool_connections = max_pool_connections
+        self.tcp_keepalive = tcp_keepalive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def client(self, service_name, region_name=None, session=None, cache_key=None):
+        """
+        Return a cached client, creating it on first use.
+
+        :param service_name: Name of the AWS service, eg "config".
+        :type service_name: str
+        :param region_name: Region for the client. Defaults to the region of the session.
+        :type region_name: str
+        :param session: Session to create the client from. Defaults to the boto3 default session.
+        :type session: boto3.session.Session
+        :param cache_key: Identifies the credentials used by `session`, eg a role ARN. Defaults to the access key
+            of the session's credentials.
+        :type cache_key: str
+        :return: A boto3 client
+        """
+        key = (service_name, region_name, self._credentials_key(session, cache_key))
+
+        client = self._clients.get(key)
+        if client is None:
+            # boto3 clients are thread safe, but creating them from a shared session is not.
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = (session or boto3).client(
+                        service_name,
+                        region_name=region_name,
+                        config=self.botocore_config()
+                    )
+                    self._clients[key] = client
+        return client
+
+    def botocore_config(self):
+        """
+        Build the botocore configuration applied to every client in this cache.
+
+        :rtype: botocore.config.Config
+        """
+        options = {'max_pool_connections': self.max_pool_connections}
+
+        if 'tcp_keepalive' in botocore.config.Config.OPTION_DEFAULTS:
+            options['tcp_keepalive'] = self.tcp_keepalive
+
+        if self.connect_timeout is not None:
+            options['connect_timeout'] = self.connect_timeout
+
+        if self.read_timeout is not None:
+            options['read_timeout'] = self.read_timeout
+
+        return botocore.config.Config(**options)
+
+    def clear(self):
+        """
+        Drop every cached client.
+        """
+        with self._lock:
+            self._clients.clear()
+
+    def __len__(self):
+        return len(self._clients)
+
+    @staticmethod
+    def _credentials_key(session, cache_key):
+        if cache_key is not None or session is None:
+            return cache_key
+
+        credentials = session.get_credentials()
+        if credentials is None:
+            return None
+        return credentials.access_key
+
+
+#: The cache shared by every rule in this process.
+CLIENT_CACHE = ClientCache()
+
+
+class AssumedRoleSessionCache(object):
+    """
+    Creates boto3 sessions for IAM roles, and hands back the same session for the same role and region. Each role
+    is only assumed once, and botocore refreshes its credentials with another AssumeRole call shortly before they
+    expire, so sessions and their clients stay usable indefinitely.
+
+    Roles are assumed without holding up lookups for other roles.
+    """
+
+    def __init__(self, sts_client=None, client_cache=CLIENT_CACHE, session_name=ASSUMED_ROLE_SESSION_NAME,
+                 duration_seconds=ASSUMED_ROLE_DURATION_SECONDS):
+        """
+        :param sts_client: Client used to assume roles. Defaults to an STS client from `client_cache`.
+        :param client_cache: Where clients for assumed roles are cached.
+        :type client_cache: awslambdahelper.clients.ClientCache
+        :param session_name: The RoleSessionName to use.
+        :type session_name: str
+        :param duration_seconds: Requested lifetime of the credentials.
+        :type duration_seconds: int
+        """
+        self.sts_client = sts_client
+        self.client_cache = client_cache
+        self.session_name = session_name
+        self.duration_seconds = duration_seconds
+        self._credentials = {}
+        self._sessions = {}
+        self._role_locks = {}
+        self._lock = threading.Lock()
+
+    def session(self, role_arn, region_name=None):
+        """
+        :param role_arn: ARN of the role to assume.
+        :type role_arn: str
+        :param region_name: Region of the session. Defaults to the region of the default session.
+        :type region_name: str
+        :rtype: boto3.session.Session
+        """
+        key = (role_arn, region_name)
+        session = self._sessions.get(key)
+        if session is None:
+            with self._role_lock(role_arn):
+                session = self._sessions.get(key)
+                if session is None:
+                    botocore_session = botocore.session.Session()
+                    botocore_session.register_component('credential_provider', botocore.credentials.CredentialResolver(
+                        [_RoleCredentialProvider(self._role_credentials(role_arn))]
+                    ))
+                    session = boto3.session.Session(botocore_session=botocore_session, region_name=region_name)
+                    self._sessions[key] = session
+        return session
+
+    def client(self, service_name, role_arn, region_name=None):
+        """
+        :param service_name: Name of the AWS service, eg "config".
+        :type service_name: str
+        :param role_arn: ARN of the role to assume.
+        :type role_arn: str
+        :param region_name: Region for the client.
+        :type region_name: str
+        :return: A boto3 client, cached by service, region and role.
+        """
+        return self.client_cache.client(
+            service_name,
+            region_name=region_name,
+            session=self.session(role_arn, region_name),
+            cache_key=role_arn
+        )
+
+    def clear(self):
+        """
+        Drop every cached session and credential.
+        """
+        with self._lock:
+            self._sessions.clear()
+            self._credentials.clear()
+            self._role_locks.clear()
+
+    def _role_lock(self, role_arn):
+        # One lock per role, so a slow AssumeRole call only holds up lookups for the same role.
+        with self._lock:
+            return self._role_locks.setdefault(role_arn, threading.Lock())
+
+    def _role_credentials(self, role_arn):
+        # Called with the role's lock held. Credentials are shared by the sessions for every region.
+        credentials = self._credentials.get(role_arn)
+        if credentials is None:
+            credentials = botocore.credentials.RefreshableCredentials.create_from_metadata(
+                metadata=self._assume_role(role_arn),
+                refresh_using=lambda: self._assume_role(role_arn),
+                method="assume-role"
+            )
+            self._credentials[role_arn] = credentials
+        return credentials
+
+    def _assume_role(self, role_arn):
+        sts_client = self.sts_client or self.client_cache.client("sts")
+        credentials = sts_client.assume_role(
+            RoleArn=role_arn,
+            RoleSessionName=self.session_name,
+            DurationSeconds=self.duration_seconds
+        )["Credentials"]
+        return {
+            "access_key": credentials["AccessKeyId"],
+            "secret_key": credentials["SecretAccessKey"],
+            "token": credentials["SessionToken"],
+            "expiry_time": credentials["Expiration"].isoformat(),
+        }
+
+
+class _RoleCredentialProvider(botocore.credentials.CredentialProvider):
+    """
+    Hands a botocore session the refreshable credentials of an assumed role.
+    """
+
+    METHOD = "assume-role"
+    CANONICAL_NAME = "awslambdahelper-assume-role"
+
+    def __init__(self, credentials):
+        super(_RoleCredentialProvider, self).__init__()
+        self.credentials = credentials
+
+    def load(self):
+        return self.credentials
+
+
+#: The assumed role sessions shared by every rule in this process.
+ASSUMED_ROLE_SESSIONS = AssumedRoleSessionCache()
+
+
+def get_client(service_name, region_name=None, session=None, cache_key=None):
+    """
+    Fetch a client from the process wide :py:data:`~awslambdahelper.clients.CLIENT_CACHE`.
+    See :py:meth:`~awslambdahelper.clients.ClientCache.client`.
+    """
+    return CLIENT_CACHE.client(service_name, region_name=region_name, session=session, cache_key=cache_key)
+
+
+def get_assumed_role_client(service_name, role_arn, region_name=None):
+    """
+    Fetch a client for an assumed role from the process wide
+    :py:data:`~awslambdahelper.clients.ASSUMED_ROLE_SESSIONS`.
+    See :py:meth:`~awslambdahelper.clients.AssumedRoleSessionCache.client`.
+    """
+    return ASSUMED_ROLE_SESSIONS.client(service_name, role_arn, region_name=region_name)
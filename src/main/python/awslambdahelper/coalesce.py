@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Drop duplicate evaluations of the same resource before they are sent to AWS Config.
+"""
+from collections import OrderedDict
+
+from awslambdahelper.evaluation import AWSConfigEvaluation
+
+#: Which compliance type is kept when a resource has been evaluated more than once with the same timestamp. Earlier
+#: types win.
+DEFAULT_PRECEDENCE = (
+    AWSConfigEvaluation.TYPE_NON_COMPLIANT,
+    AWSConfigEvaluation.TYPE_INSUFFICIENT_DATA,
+    AWSConfigEvaluation.TYPE_COMPLIANT,
+    AWSConfigEvaluation.TYPE_NOT_APPLICABLE,
+)
+
+
+class EvaluationCoalescer(object):
+    """
+    Keeps one evaluation payload per resource. The evaluation with the latest `OrderingTimestamp` is kept, and
+    evaluations with the same timestamp are chosen between by compliance type, in the order given by `precedence`.
+    """
+
+    def __init__(self, precedence=DEFAULT_PRECEDENCE):
+        """
+        :param precedence: Compliance types, from the one most likely to be kept to the least.
+        :type precedence: Union[List[str],Tuple[str]]
+        """
+        self._ranks = dict((compliance_type, len(precedence) - rank) for rank, compliance_type in enumerate(precedence))
+        #: Number of duplicate evaluations dropped by the last call to
+        #: :py:meth:`~awslambdahelper.coalesce.EvaluationCoalescer.coalesce`.
+        self.dropped = 0
+
+    def coalesce(self, evaluations):
+        """
+        :param evaluations: Evaluation payloads.
+        :type evaluations: Iterable[dict]
+        :return: One payload per resource, in the order each resource was first seen.
+        :rtype: List[dict]
+        """
+        kept = OrderedDict()
+        self.dropped = 0
+
+        for evaluation in evaluations:
+            key = (evaluation['ComplianceResourceType'], evaluation['ComplianceResourceId'])
+            current = kept.get(key)
+            if current is None:
+                kept[key] = evaluation
+                continue
+
+            self.dropped += 1
+            if self._sort_key(evaluation) > self._sort_key(current):
+                kept[key] = evaluation
+
+        return list(kept.values())
+
+    def _sort_key(self, evaluation):
+        return evaluation['OrderingTimestamp'], self._ranks.get(evaluation['ComplianceType'], 0)
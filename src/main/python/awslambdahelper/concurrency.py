@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers for running rule work on a bounded pool of threads. Rules spend most of their time waiting on AWS APIs, so
+threads are enough to overlap that waiting.
+"""
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+def imap_unordered(function, iterable, max_workers):
+    """
+    Call `function` on each item of `iterable` using at most `max_workers` threads, and yield the results in the
+    order they complete. Items are only pulled from `iterable` as workers become free.
+
+    If `function` raises, the exception is re-raised here once its result is reached, and no further items are
+    started. If the caller stops iterating early, calls which have not started are cancelled, and calls already
+    running are left to finish in the background rather than waited for.
+
+    :param function: Called with a single item.
+    :type function: callable
+    :param iterable: Items to process.
+    :type iterable: Iterable
+    :param max_workers: Maximum number of calls to run at once.
+    :type max_workers: int
+    :rtype: Iterator
+    """
+    items = iter(iterable)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    running = set()
+    try:
+        for item in items:
+            running.add(executor.submit(function, item))
+            if len(running) >= max_workers:
+                break
+
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                for item in items:
+                    running.add(executor.submit(function, item))
+                    break
+    finally:
+        for future in running:
+            future.cancel()
+        executor.shutdown(wait=not running)
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers for AWS Config configuration items.
+
+Oversized configuration change notifications only carry a `configurationItemSummary`. The full item has to be fetched
+with `GetResourceConfigHistory
+<http://docs.aws.amazon.com/config/latest/APIReference/API_GetResourceConfigHistory.html>`_, which returns it in a
+slightly different shape to the one found in change notifications.
+
+Rules are given configuration items as :py:class:`~awslambdahelper.configitem.ConfigurationItem` objects, which
+decode stringified sub-documents on first access and index relationships and tags.
+"""
+import datetime
+
+from awslambdahelper.cache import LRUCache
+from awslambdahelper.jsondecode import get_decoder
+
+#: Fetched configuration items, keyed by resource id and configuration state id. A configuration state id identifies
+#: one immutable version of a resource's configuration, so entries never go stale.
+CONFIGURATION_ITEM_CACHE = LRUCache(maxsize=256)
+
+_STRING_TYPES = (str, type(u""))
+
+
+class _LazyDocument(dict):
+    """
+    A dict whose JSON string values are decoded when they are first read. The decoded value replaces the string, so
+    each value is decoded at most once. Only keys in :py:attr:`LAZY_KEYS` are decoded, or every key if it is None.
+    """
+    LAZY_KEYS = None
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, _STRING_TYPES) and (self.LAZY_KEYS is None or key in self.LAZY_KEYS):
+            value = self._decode(key, value)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def iteritems(self):
+        return iter(self.items())
+
+    def itervalues(self):
+        return iter(self.values())
+
+    def copy(self):
+        return type(self)(self)
+
+    def _decode(self, key, value):
+        if value[:1] in ("{", "["):
+            value = get_decoder()(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+
+class _SupplementaryConfiguration(_LazyDocument):
+    pass
+
+
+class ConfigurationItem(_LazyDocument):
+    """
+    A configuration item, which behaves like the dict from the change notification, so existing rules keep working.
+
+    * `configuration` and the entries of `supplementaryConfiguration` are decoded from JSON on first access if they
+      are strings, as they are in items fetched from the AWS Config API.
+    * Relationships are indexed by resource type, resource id and relationship name the first time one of the
+      lookup methods is called.
+
+    The indexes are not updated if the item is changed, so it should be treated as read only.
+    """
+    LAZY_KEYS = frozenset(["configuration", "supplementaryConfiguration"])
+
+    def __init__(self, *args, **kwargs):
+        super(ConfigurationItem, self).__init__(*args, **kwargs)
+        self._relationship_indexes = None
+        self._tags = None
+
+    def __getitem__(self, key):
+        value = super(ConfigurationItem, self).__getitem__(key)
+        if key == "supplementaryConfiguration" and isinstance(value, dict) and \
+                not isinstance(value, _SupplementaryConfiguration):
+            value = _SupplementaryConfiguration(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def relationships_by_type(self, resource_type):
+        """
+        :param resource_type: eg "AWS::EC2::VPC"
+        :type resource_type: str
+        :return: The relationships to resources of this type.
+        :rtype: List[dict]
+        """
+        return self._relationship_index()[0].get(resource_type, [])
+
+    def relationship_to(self, resource_id):
+        """
+        :param resource_id: eg "vpc-00000000"
+        :type resource_id: str
+        :return: The first relationship to this resource, or None.
+        :rtype: Union[dict,None]
+        """
+        relationships = self._relationship_index()[1].get(resource_id)
+        return relationships[0] if relationships else None
+
+    def relationships_named(self, name):
+        """
+        :param name: eg "Is contained in Vpc"
+        :type name: str
+        :rtype: List[dict]
+        """
+        return self._relationship_index()[2].get(name, [])
+
+    def tag(self, key, default=None):
+        """
+        Look up a tag, from either the `tags` dict of the item, or a list of `{"key": ..., "value": ...}` tags in
+        the configuration.
+
+        :param key: The tag key.
+        :type key: str
+        :param default: Returned if the tag is not set.
+        :rtype: str
+        """
+        if self._tags is None:
+            tags = {}
+            configuration = self.get("configuration")
+            configuration_tags = configuration.get("tags") if isinstance(configuration, dict) else None
+            if isinstance(configuration_tags, list):
+                for configuration_tag in configuration_tags:
+                    tags[configuration_tag.get("key", configuration_tag.get("Key"))] = \
+                        configuration_tag.get("value", configuration_tag.get("Value"))
+            tags.update(self.get("tags") or {})
+            self._tags = tags
+        return self._tags.get(key, default)
+
+    def _relationship_index(self):
+        if self._relationship_indexes is None:
+            by_type, by_id, by_name = {}, {}, {}
+            for relationship in self.get("relationships") or []:
+                by_type.setdefault(relationship.get("resourceType"), []).append(relationship)
+                by_id.setdefault(relationship.get("resourceId"), []).append(relationship)
+                by_name.setdefault(relationship.get("name", relationship.get("relationshipName")), []) \
+                    .append(relationship)
+            self._relationship_indexes = by_type, by_id, by_name
+        return self._relationship_indexes
+
+
+def configuration_item_cache_key(summary):
+    """
+    :param summary: A `configurationItemSummary`, or a full configuration item.
+    :type summary: dict
+    :rtype: tuple
+    """
+    return summary["resourceId"], summary["configurationStateId"]
+
+
+def convert_api_configuration_item(configuration_item):
+    """
+    Convert a configuration item returned by the AWS Config API to the format used in change notifications.
+
+    :param configuration_item: An item from the `configurationItems` list of a GetResourceConfigHistory response.
+    :type configuration_item: dict
+    :return: The converted item. `configuration` is left as a string until it is first read.
+    :rtype: awslambdahelper.configitem.ConfigurationItem
+    """
+    for key, value in configuration_item.items():
+        if isinstance(value, datetime.datetime):
+            configuration_item[key] = _format_timestamp(value)
+
+    configuration_item["awsAccountId"] = configuration_item.get("accountId")
+    configuration_item["ARN"] = configuration_item.get("arn")
+    configuration_item["configurationStateMd5Hash"] = configuration_item.get("configurationItemMD5Hash")
+    configuration_item["configurationItemVersion"] = configuration_item.get("version")
+
+    for relationship in configuration_item.get("relationships", []):
+        relationship["name"] = relationship.get("relationshipName")
+
+    return ConfigurationItem(configuration_item)
+
+
+def _format_timestamp(value):
+    """
+    Format a datetime in the same way as the timestamps in AWS Config notifications, eg '2016-02-17T01:36:34.043Z'.
+    """
+    if value.tzinfo is not None:
+        value = (value - value.utcoffset()).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Stop evaluating before the Lambda function times out, and carry on in a follow-up invocation.
+
+A rule records its progress with :py:meth:`~awslambdahelper.AWSConfigRule.checkpoint`. When the remaining time drops
+below the safety margin, no more evaluations are pulled from the rule, the ones already produced are sent, and the
+event is re-invoked with the last checkpoint in its :py:data:`~awslambdahelper.deadline.CONTINUATION_CURSOR_KEY`.
+Work between the last checkpoint and the deadline is evaluated again, so evaluations are delivered at least once.
+
+Only rules which yield their evaluations are cut short. Evaluations a rule returns as a list have already been
+produced, so they are all sent. If the deadline is reached before the rule has checkpointed, there is nowhere to
+resume from, so a warning is logged for the evaluations which were not produced.
+"""
+import json
+
+from awslambdahelper.clients import get_client
+
+#: Key in the event which holds the cursor a follow-up invocation resumes from.
+CONTINUATION_CURSOR_KEY = 'continuationCursor'
+
+
+class Deadline(object):
+    """
+    Tracks the time left in the current Lambda invocation.
+    """
+
+    def __init__(self, context, safety_margin_ms):
+        """
+        :param context: The Lambda context object.
+        :param safety_margin_ms: Stop pulling work once fewer than this many milliseconds remain.
+        :type safety_margin_ms: int
+        """
+        self.context = context
+        self.safety_margin_ms = safety_margin_ms
+        self.reached = False
+
+    @classmethod
+    def from_context(cls, context, safety_margin_ms):
+        """
+        :return: A deadline, or None if there is no margin set or the context cannot report its remaining time.
+        :rtype: Union[awslambdahelper.deadline.Deadline,None]
+        """
+        if safety_margin_ms is None or not hasattr(context, 'get_remaining_time_in_millis'):
+            return None
+        return cls(context, safety_margin_ms)
+
+    @property
+    def expired(self):
+        return self.context.get_remaining_time_in_millis() < self.safety_margin_ms
+
+    @property
+    def remaining_seconds(self):
+        """
+        Seconds left until the safety margin is reached, or 0 once it has been.
+
+        :rtype: float
+        """
+        return max(0, self.context.get_remaining_time_in_millis() - self.safety_margin_ms) / 1000.0
+
+    def iterate(self, iterable):
+        """
+        Yield items from `iterable` until it is exhausted, or the deadline is reached. The time is checked before
+        each item is pulled, so the rule is never asked for work it won't have time to finish.
+
+        :type iterable: Iterable
+        :rtype: Iterator
+        """
+        iterator = iter(iterable)
+        while True:
+            if self.expired:
+                self.reached = True
+                return
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            yield item
+
+
+class LambdaReinvoker(object):
+    """
+    Continues an event by asynchronously invoking the running Lambda function again.
+    """
+
+    def __call__(self, event, context):
+        """
+        :param event: The original event, with the continuation cursor added.
+        :type event: dict
+        :param context: The Lambda context of the current invocation.
+        """
+        return get_client('lambda').invoke(
+            FunctionName=context.invoked_function_arn,
+            InvocationType='Event',
+            Payload=json.dumps(event)
+        )
+
+
+class LocalReinvoker(object):
+    """
+    Stand-in for :py:class:`~awslambdahelper.deadline.LambdaReinvoker` when running outside of Lambda, or in tests.
+    Continuation events are queued, and can then be run in-process with
+    :py:meth:`~awslambdahelper.deadline.LocalReinvoker.run`.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, context):
+        self.events.append(event)
+
+    def run(self, handler, context):
+        """
+        Pass each queued event to `handler`, including any queued while doing so, until none are left.
+
+        :param handler: Usually the rule's :py:meth:`~awslambdahelper.AWSConfigRule.handler`.
+        :type handler: callable
+        :param context: Context to pass to the handler.
+        :return: Number of continuation events which were run.
+        :rtype: int
+        """
+        count = 0
+        while self.events:
+            handler(self.events.pop(0), context)
+            count += 1
+        return count
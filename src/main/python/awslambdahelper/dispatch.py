@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Host many rules in one Lambda function. A :py:class:`~awslambdahelper.dispatch.RuleDispatcher` routes each event to
+the rule class registered for its `configRuleArn` or `configRuleName`, so fewer functions need to be kept warm.
+
+Rule classes can be registered by import path, in which case their module is only imported when the first event for
+that rule arrives.
+
+>>> dispatcher = RuleDispatcher({
+...     "encrypted-volumes": "my_rules.ebs:EncryptedVolumesRule",
+...     "arn:aws:config:eu-west-1:123456789012:config-rule/config-rule-abcdef": "my_rules.iam:RootMfaRule",
+... })
+>>> # The entrypoint for lambda would be set as "file_name.dispatcher.handler"
+"""
+import importlib
+import threading
+
+
+class UnknownRuleError(LookupError):
+    """
+    Raised when an event is for a rule which has not been registered.
+    """
+
+
+def load_rule_class(path):
+    """
+    :param path: Location of the rule class, eg "my_rules.encryption:EncryptedVolumesRule", or
+        "my_rules.encryption.EncryptedVolumesRule".
+    :type path: str
+    :rtype: type
+    """
+    module_name, _, class_name = path.partition(":")
+    if not class_name:
+        module_name, _, class_name = path.rpartition(".")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class RuleDispatcher(object):
+    """
+    Routes events to registered :py:class:`~awslambdahelper.AWSConfigRule` subclasses. Each rule handles its events
+    through :py:meth:`~awslambdahelper.AWSConfigRule.handler`, so rule instances are reused across warm invocations.
+    """
+
+    def __init__(self, rules=None, default=None):
+        """
+        :param rules: Rule classes, or their import paths, keyed by config rule name or ARN.
+        :type rules: dict
+        :param default: Rule class, or its import path, for events which match no registered rule. Events which
+            match no rule raise :py:class:`~awslambdahelper.dispatch.UnknownRuleError` when None.
+        :type default: Union[type,str,None]
+        """
+        self._rules = {}
+        self._lock = threading.Lock()
+        self.default = default
+        for name, rule_class in (rules or {}).items():
+            self.register(name, rule_class)
+
+    def register(self, name, rule_class=None):
+        """
+        Register a rule class. Can also be used as a class decorator:
+
+        >>> @dispatcher.register("encrypted-volumes")
+        ... class EncryptedVolumesRule(AWSConfigRule):
+        ...     pass
+
+        :param name: The config rule name or ARN.
+        :type name: str
+        :param rule_class: The rule class, or its import path. See :py:func:`~awslambdahelper.dispatch.load_rule_class`.
+        :type rule_class: Union[type,str]
+        :return: `rule_class`, or a decorator if it is None.
+        """
+        if rule_class is None:
+            return lambda decorated: self.register(name, decorated)
+
+        with self._lock:
+            self._rules[name] = rule_class
+        return rule_class
+
+    def rule_class(self, event):
+        """
+        :param event: An AWS Config rule event.
+        :type event: dict
+        :return: The rule class for the event, importing it if needed.
+        :rtype: type
+        :raises UnknownRuleError: If no rule is registered for the event.
+        """
+        for key in (event.get("configRuleArn"), event.get("configRuleName")):
+            if key in self._rules:
+                break
+        else:
+            key = None
+
+        with self._lock:
+            rule_class = self.default if key is None else self._rules[key]
+            if rule_class is None:
+                raise UnknownRuleError(
+                    "No rule registered for {name} ({arn})".format(
+                        name=event.get("configRuleName"), arn=event.get("configRuleArn")
+                    )
+                )
+
+            if not isinstance(rule_class, type):
+                rule_class = load_rule_class(rule_class)
+                if key is None:
+                    self.default = rule_class
+                else:
+                    self._rules[key] = rule_class
+
+        return rule_class
+
+    def handler(self, event, context):
+        """
+        Lambda entrypoint. Passes the event to the handler of the matching rule.
+
+        :param event: An AWS Config rule event.
+        :type event: dict
+        :param context: The Lambda context.
+        """
+        return self.rule_class(event).handler(event, context)
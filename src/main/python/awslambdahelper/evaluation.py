@@ -4,13 +4,35 @@
 See http://docs.aws.amazon.com/config/latest/APIReference/API_Evaluation.html \
 #config-Type-Evaluation-ComplianceResourceType
 """
+import array
 import datetime
 
+from awslambdahelper.submission import MAX_EVALUATIONS_PER_REQUEST, chunk_evaluations
+
+# Shared copies of compliance and resource type strings. Large scheduled rules create many thousands of evaluations
+# with only a handful of distinct types, so there is no need for each one to hold its own copy.
+_INTERNED = {}
+
+
+def intern_string(value):
+    """
+    Return a shared copy of `value`. Unlike the :code:`intern` builtin, this also accepts unicode strings, as found
+    in decoded JSON events.
+
+    :param value: A string, or None.
+    :rtype: str
+    """
+    if value is None:
+        return None
+    return _INTERNED.setdefault(value, value)
+
 
 class AWSConfigEvaluation(object):
     """
     Represents a response payload to an evaluation event
     """
+    __slots__ = ('OrderingTimestamp', 'ComplianceResourceType', 'ComplianceResourceId', 'ComplianceType', 'Annotation')
+
     #: Define an evaluation of a resource as compliant to a rule. See `Evaluation.ComplianceType <http://docs.aws.amazon.com/config/latest/APIReference/API_Evaluation.html#config-Type-Evaluation-ComplianceType>`_. # noqa
     TYPE_COMPLIANT = 'COMPLIANT'
     #: Define an evaluation of a resource as not being compliant to a rule. See `Evaluation.ComplianceType <http://docs.aws.amazon.com/config/latest/APIReference/API_Evaluation.html#config-Type-Evaluation-ComplianceType>`_. # noqa
@@ -37,9 +59,9 @@ class AWSConfigEvaluation(object):
         :param OrderingTimestamp: The time of the event in AWS Config that triggered the evaluation.
         """
         self.OrderingTimestamp = OrderingTimestamp
-        self.ComplianceResourceType = ResourceType
+        self.ComplianceResourceType = intern_string(ResourceType)
         self.ComplianceResourceId = ResourceId
-        self.ComplianceType = Type
+        self.ComplianceType = intern_string(Type)
         self.Annotation = Annotation
 
     def set(self, ResourceType=None, ResourceId=None,
@@ -57,7 +79,7 @@ class AWSConfigEvaluation(object):
         """
 
         if ResourceType is not None:
-            self.ComplianceResourceType = ResourceType
+            self.ComplianceResourceType = intern_string(ResourceType)
 
         if ResourceId is not None:
             self.ComplianceResourceId = ResourceId
@@ -90,3 +112,132 @@ class AWSConfigEvaluation(object):
             response['OrderingTimestamp'] = self.OrderingTimestamp
 
         return response
+
+
+class EvaluationBatch(object):
+    """
+    Holds many evaluations in parallel arrays, rather than as one object each, and serialises them straight to
+    `Evaluation <http://docs.aws.amazon.com/config/latest/APIReference/API_Evaluation.html>`_ payloads. Evaluations
+    without a timestamp all share one, taken when the payloads are created.
+
+    Rules may return a batch from :code:`find_violation_scheduled(...)` or :code:`find_violation_config_change(...)`
+    in place of a list of evaluations.
+
+    >>> batch = EvaluationBatch()
+    >>> for volume in volumes:
+    ...     if volume["Encrypted"]:
+    ...         batch.add(AWSConfigEvaluation.TYPE_COMPLIANT, "Encrypted", "AWS::EC2::Volume", volume["VolumeId"])
+    ...     else:
+    ...         batch.add(AWSConfigEvaluation.TYPE_NON_COMPLIANT, "Unencrypted", "AWS::EC2::Volume", volume["VolumeId"])
+    """
+    #: Compliance types, indexed by the codes held in the batch.
+    COMPLIANCE_TYPES = (
+        AWSConfigEvaluation.TYPE_COMPLIANT,
+        AWSConfigEvaluation.TYPE_NON_COMPLIANT,
+        AWSConfigEvaluation.TYPE_NOT_APPLICABLE,
+        AWSConfigEvaluation.TYPE_INSUFFICIENT_DATA,
+    )
+    _COMPLIANCE_CODES = dict((compliance_type, code) for code, compliance_type in enumerate(COMPLIANCE_TYPES))
+
+    def __init__(self):
+        self._compliance_codes = array.array('B')
+        self._resource_type_codes = array.array('H')
+        self._resource_types = [None]
+        self._resource_type_index = {None: 0}
+        self._resource_ids = []
+        self._annotations = []
+        # Most evaluations have no timestamp of their own, so only the ones which do are stored.
+        self._timestamps = {}
+
+    def add(self, Type, Annotation, ResourceType=None, ResourceId=None, OrderingTimestamp=None):
+        """
+        Add an evaluation. Takes the same arguments as :py:class:`~awslambdahelper.evaluation.AWSConfigEvaluation`.
+        """
+        resource_type_code = self._resource_type_index.get(ResourceType)
+        if resource_type_code is None:
+            resource_type_code = len(self._resource_types)
+            self._resource_types.append(intern_string(ResourceType))
+            self._resource_type_index[ResourceType] = resource_type_code
+
+        if OrderingTimestamp is not None:
+            self._timestamps[len(self._resource_ids)] = OrderingTimestamp
+
+        self._compliance_codes.append(self._COMPLIANCE_CODES[Type])
+        self._resource_type_codes.append(resource_type_code)
+        self._resource_ids.append(ResourceId)
+        self._annotations.append(Annotation)
+
+    def append(self, evaluation):
+        """
+        :type evaluation: awslambdahelper.evaluation.AWSConfigEvaluation
+        """
+        self.add(
+            evaluation.ComplianceType,
+            evaluation.Annotation,
+            ResourceType=evaluation.ComplianceResourceType,
+            ResourceId=evaluation.ComplianceResourceId,
+            OrderingTimestamp=evaluation.OrderingTimestamp
+        )
+
+    def extend(self, evaluations):
+        """
+        :type evaluations: Iterable[awslambdahelper.evaluation.AWSConfigEvaluation]
+        """
+        for evaluation in evaluations:
+            self.append(evaluation)
+
+    def to_dicts(self, ResourceType=None, ResourceId=None, OrderingTimestamp=None):
+        """
+        Yield an `Evaluation` payload for each evaluation in the batch. Like
+        :py:meth:`~awslambdahelper.evaluation.AWSConfigEvaluation.set`, any argument which is not None replaces the
+        value held for every evaluation.
+
+        :rtype: Iterator[dict]
+        """
+        compliance_types = self.COMPLIANCE_TYPES
+        resource_types = self._resource_types
+        timestamps = self._timestamps
+        default_timestamp = OrderingTimestamp
+        if default_timestamp is None:
+            default_timestamp = datetime.datetime.utcnow().isoformat() + "Z"
+
+        for index, compliance_code in enumerate(self._compliance_codes):
+            if OrderingTimestamp is None:
+                timestamp = timestamps.get(index, default_timestamp)
+            else:
+                timestamp = OrderingTimestamp
+
+            yield {
+                'ComplianceType': compliance_types[compliance_code],
+                'Annotation': self._annotations[index],
+                'ComplianceResourceType':
+                    resource_types[self._resource_type_codes[index]] if ResourceType is None else ResourceType,
+                'ComplianceResourceId': self._resource_ids[index] if ResourceId is None else ResourceId,
+                'OrderingTimestamp': timestamp
+            }
+
+    def chunks(self, chunk_size=MAX_EVALUATIONS_PER_REQUEST, **kwargs):
+        """
+        Yield lists of at most `chunk_size` payloads, ready to send as the `Evaluations` of a put_evaluations
+        request. Keyword arguments are passed to :py:meth:`~awslambdahelper.evaluation.EvaluationBatch.to_dicts`.
+
+        :rtype: Iterator[List[dict]]
+        """
+        return chunk_evaluations(self.to_dicts(**kwargs), chunk_size)
+
+    def __iter__(self):
+        """
+        Yield each evaluation as an :py:class:`~awslambdahelper.evaluation.AWSConfigEvaluation`, so a batch can be
+        used anywhere a list of evaluations can.
+        """
+        for index, compliance_code in enumerate(self._compliance_codes):
+            yield AWSConfigEvaluation(
+                self.COMPLIANCE_TYPES[compliance_code],
+                self._annotations[index],
+                ResourceType=self._resource_types[self._resource_type_codes[index]],
+                ResourceId=self._resource_ids[index],
+                OrderingTimestamp=self._timestamps.get(index)
+            )
+
+    def __len__(self):
+        return len(self._resource_ids)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Iterate over paginated AWS API results, while the next pages are fetched in the background.
+"""
+import threading
+import weakref
+
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
+
+#: Number of pages fetched ahead of the page being evaluated.
+PREFETCH_PAGES = 2
+
+# How long the background thread waits on a full queue before checking whether the iterator has been closed or
+# garbage collected.
+_PUT_TIMEOUT = 0.1
+_END = object()
+
+
+class PrefetchingIterator(object):
+    """
+    Yields the items from an iterable of pages. A background thread pulls pages into a bounded queue, so the next
+    pages are being fetched while the current one is evaluated. Once the queue is full the thread waits, so at most
+    `prefetch` pages are held in memory ahead of the consumer.
+
+    Errors raised while fetching a page are re-raised by the iterator, at the point that page would have been
+    reached.
+
+    The thread stops once the iterator is closed, or garbage collected after being abandoned part way through.
+    """
+
+    def __init__(self, pages, prefetch=PREFETCH_PAGES):
+        """
+        :param pages: Pages of items, eg the result lists from a boto3 paginator.
+        :type pages: Iterable[Iterable]
+        :param prefetch: Maximum number of pages to fetch ahead of the consumer.
+        :type prefetch: int
+        """
+        self._queue = queue.Queue(maxsize=max(1, prefetch))
+        self._closed = threading.Event()
+        self._items = iter(())
+        self._finished = False
+        # The thread only holds a weak reference to the iterator, so it never keeps an abandoned iterator alive.
+        self._thread = threading.Thread(target=_fetch, args=(pages, self._queue, self._closed, weakref.ref(self)))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            item = next(self._items, _END)
+            if item is not _END:
+                return item
+
+            if self._finished:
+                raise StopIteration
+
+            page = self._queue.get()
+            if page is _END:
+                self._finished = True
+                raise StopIteration
+            if isinstance(page, _FetchError):
+                self._finished = True
+                raise page.error
+            self._items = iter(page)
+
+    next = __next__
+
+    def close(self):
+        """
+        Stop fetching pages. Call this when abandoning the iterator before it is exhausted.
+        """
+        self._closed.set()
+        self._finished = True
+
+
+def _fetch(pages, page_queue, closed, iterator_ref):
+    def put(page):
+        while not closed.is_set() and iterator_ref() is not None:
+            try:
+                page_queue.put(page, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    try:
+        for page in pages:
+            if not put(page):
+                return
+    except Exception as e:
+        put(_FetchError(e))
+        return
+    put(_END)
+
+
+class _FetchError(object):
+    def __init__(self, error):
+        self.error = error
+
+
+def paginate(client, operation_name, result_key, **kwargs):
+    """
+    Yield the `result_key` list from each page of a paginated boto3 operation.
+
+    :param client: A boto3 client.
+    :param operation_name: Name of a paginated operation, eg "list_discovered_resources".
+    :type operation_name: str
+    :param result_key: Key of the list of results in each page, eg "resourceIdentifiers".
+    :type result_key: str
+    :param kwargs: Arguments for the operation.
+    :rtype: Iterator[list]
+    """
+    for page in client.get_paginator(operation_name).paginate(**kwargs):
+        yield page.get(result_key, [])
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Choose the JSON parser used to decode `invokingEvent` and `ruleParameters`. Configuration items such as IAM policies
+can be several megabytes, and the C parsers in `orjson`, `ujson` and `simplejson` decode them several times faster
+than the standard library. None of them are required; the standard library :py:mod:`json` module is used when none
+are installed.
+
+Other parsers can be added with :py:func:`~awslambdahelper.jsondecode.register_decoder`.
+"""
+import importlib
+import json
+import threading
+
+#: Parsers tried, in order, when no backend is named.
+PREFERRED_BACKENDS = ("orjson", "ujson", "simplejson", "json")
+
+_DECODERS = {"json": json.loads}
+_DEFAULT = []
+_LOCK = threading.Lock()
+
+
+def register_decoder(name, loads):
+    """
+    Make a parser available to :py:func:`~awslambdahelper.jsondecode.get_decoder`.
+
+    :param name: Name to select the parser by, eg in :py:attr:`~awslambdahelper.AWSConfigRule.JSON_BACKEND`.
+    :type name: str
+    :param loads: Called with a JSON string, returning the decoded value.
+    :type loads: callable
+    """
+    with _LOCK:
+        _DECODERS[name] = loads
+
+
+def get_decoder(name=None):
+    """
+    :param name: One of :py:data:`PREFERRED_BACKENDS`, or a name given to
+        :py:func:`~awslambdahelper.jsondecode.register_decoder`. When None, the first parser in
+        :py:data:`PREFERRED_BACKENDS` which can be imported.
+    :type name: Union[str,None]
+    :return: The `loads` function of the parser.
+    :rtype: callable
+    :raises ImportError: If the named parser is not installed.
+    """
+    if name is None:
+        if not _DEFAULT:
+            _DEFAULT.append(_first_available())
+        return _DEFAULT[0]
+
+    loads = _DECODERS.get(name)
+    if loads is None:
+        loads = importlib.import_module(name).loads
+        register_decoder(name, loads)
+    return loads
+
+
+def available_backends():
+    """
+    :return: The names of the parsers in :py:data:`PREFERRED_BACKENDS` which can be imported, and of any registered
+        parsers.
+    :rtype: List[str]
+    """
+    names = []
+    for name in PREFERRED_BACKENDS:
+        try:
+            get_decoder(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names + sorted(set(_DECODERS) - set(names))
+
+
+def _first_available():
+    for name in PREFERRED_BACKENDS:
+        try:
+            return get_decoder(name)
+        except ImportError:
+            continue
+    return json.loads
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Per-event timings and counts, emitted in the CloudWatch `Embedded Metric Format
+<https://docs.aws.amazon.com/AmazonCloudWatch/latest/monitoring/CloudWatch_Embedded_Metric_Format_Specification.html>`_.
+
+Phases are timed exclusively: when one timed phase pulls from another, such as serialisation pulling evaluations from
+a rule generator, the inner phase's time is not counted again in the outer one. Metrics are disabled by default, and
+:py:data:`~awslambdahelper.metrics.NULL_METRICS` is used in their place, which leaves iterables and callables untouched
+so nothing is added to the work done for each evaluation.
+
+A sink is any callable taking the EMF record as a dict, such as :py:class:`~awslambdahelper.metrics.StdoutSink`.
+"""
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+#: CloudWatch namespace of the metrics.
+METRICS_NAMESPACE = "awslambdahelper"
+
+#: Metric unit for phase timings.
+TIME_UNIT = "Milliseconds"
+#: Metric unit for counters.
+COUNT_UNIT = "Count"
+
+
+class StdoutSink(object):
+    """
+    Writes each record as a line of JSON to stdout, where the Lambda log agent picks it up.
+    """
+
+    def __init__(self, stream=None):
+        """
+        :param stream: Where to write records. Defaults to :py:data:`sys.stdout` at the time of writing.
+        """
+        self.stream = stream
+
+    def __call__(self, record):
+        stream = self.stream or sys.stdout
+        stream.write(json.dumps(record) + "\n")
+        stream.flush()
+
+
+class Metrics(object):
+    """
+    Collects phase timings and counters for one event.
+    """
+
+    enabled = True
+
+    def __init__(self, namespace=METRICS_NAMESPACE):
+        """
+        :param namespace: CloudWatch namespace of the metrics.
+        :type namespace: str
+        """
+        self.namespace = namespace
+        self.values = OrderedDict()
+        self.units = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def timer(self, phase):
+        """
+        Context manager timing a block as part of `phase`.
+
+        :param phase: eg "Decode". Recorded as "DecodeTime".
+        :type phase: str
+        """
+        return _Timer(self, phase)
+
+    def timed(self, phase, iterable, counter=None):
+        """
+        :param phase: Time spent pulling items from `iterable` is recorded as part of this phase.
+        :type phase: str
+        :type iterable: Iterable
+        :param counter: Counter incremented for each item, if given.
+        :type counter: str
+        :rtype: Iterator
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.timer(phase):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            if counter is not None:
+                self.add(counter)
+            yield item
+
+    def timed_call(self, phase, function, counter=None):
+        """
+        :param phase: Time spent in `function` is recorded as part of this phase.
+        :type phase: str
+        :type function: callable
+        :param counter: Counter incremented on each call, if given.
+        :type counter: str
+        :return: A wrapper around `function`.
+        :rtype: callable
+        """
+        def call(*args, **kwargs):
+            if counter is not None:
+                self.add(counter)
+            with self.timer(phase):
+                return function(*args, **kwargs)
+        return call
+
+    def add(self, name, value=1, unit=COUNT_UNIT):
+        """
+        Add to a metric.
+
+        :type name: str
+        :type value: Union[int,float]
+        :type unit: str
+        """
+        with self._lock:
+            self.values[name] = self.values.get(name, 0) + value
+            self.units[name] = unit
+
+    def get(self, name):
+        """
+        :return: The current value of a metric, or 0.
+        :rtype: Union[int,float]
+        """
+        return self.values.get(name, 0)
+
+    def record(self, dimensions):
+        """
+        Build the Embedded Metric Format record.
+
+        :param dimensions: Dimension names and values, eg :code:`{"Rule": "EncryptedVolumesRule"}`.
+        :type dimensions: dict
+        :rtype: dict
+        """
+        record = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": self.namespace,
+                    "Dimensions": [sorted(dimensions)],
+                    "Metrics": [{"Name": name, "Unit": self.units[name]} for name in self.values],
+                }],
+            },
+        }
+        record.update(dimensions)
+        record.update(self.values)
+        return record
+
+    def flush(self, sink, dimensions):
+        """
+        Send the record to `sink`.
+
+        :param sink: Callable taking the record.
+        :type sink: callable
+        :type dimensions: dict
+        """
+        sink(self.record(dimensions))
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+class _Timer(object):
+    def __init__(self, metrics, phase):
+        self.metrics = metrics
+        self.phase = phase
+        self.started = None
+        self.nested = 0.0
+
+    def __enter__(self):
+        self.metrics._stack().append(self)
+        self.started = time.time()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.time() - self.started
+        stack = self.metrics._stack()
+        stack.pop()
+        if stack:
+            stack[-1].nested += elapsed
+        self.metrics.add(self.phase + "Time", (elapsed - self.nested) * 1000, TIME_UNIT)
+        return False
+
+
+class _NullTimer(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullMetrics(object):
+    """
+    Stands in for :py:class:`~awslambdahelper.metrics.Metrics` when metrics are disabled. Nothing is recorded, and
+    iterables and callables are returned as they are.
+    """
+
+    enabled = False
+    _TIMER = _NullTimer()
+
+    def timer(self, phase):
+        return self._TIMER
+
+    def timed(self, phase, iterable, counter=None):
+        return iterable
+
+    def timed_call(self, phase, function, counter=None):
+        return function
+
+    def add(self, name, value=1, unit=COUNT_UNIT):
+        pass
+
+    def get(self, name):
+        return 0
+
+    def flush(self, sink, dimensions):
+        pass
+
+
+#: Used when metrics are disabled.
+NULL_METRICS = NullMetrics()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Route configuration items to the rule method for their resource type.
+
+`APPLICABLE_RESOURCES` may contain wildcard patterns such as :code:`AWS::EC2::*`, and a rule may define a method for
+each resource type, named after the type with :code:`::` replaced by :code:`_`, eg :code:`evaluate_AWS_EC2_Instance`.
+Types without their own method are passed to :py:meth:`~awslambdahelper.AWSConfigRule.find_violation_config_change`.
+A :py:class:`~awslambdahelper.resourcetypes.ResourceTypeTable` is compiled once for each rule class and list of
+applicable resources, and the outcome for each resource type is remembered, so patterns are only matched once per
+type.
+"""
+import fnmatch
+import re
+import threading
+
+#: Prefix of the per-type rule methods.
+HANDLER_PREFIX = "evaluate_"
+#: Method used for applicable types without a method of their own.
+DEFAULT_HANDLER = "find_violation_config_change"
+
+_TABLES = {}
+_LOCK = threading.Lock()
+
+
+def handler_name(resource_type):
+    """
+    >>> handler_name("AWS::EC2::Instance")
+    'evaluate_AWS_EC2_Instance'
+
+    :param resource_type: eg "AWS::EC2::Instance"
+    :type resource_type: str
+    :rtype: str
+    """
+    return HANDLER_PREFIX + resource_type.replace("::", "_")
+
+
+class ResourceTypeTable(object):
+    """
+    Maps resource types to the name of the rule method which evaluates them.
+    """
+
+    def __init__(self, applicable_resources, handler_names=()):
+        """
+        :param applicable_resources: Resource types and wildcard patterns.
+        :type applicable_resources: Iterable[str]
+        :param handler_names: Names of the per-type methods defined by the rule.
+        :type handler_names: Iterable[str]
+        """
+        exact = set()
+        patterns = []
+        for resource_type in applicable_resources:
+            if any(character in resource_type for character in "*?["):
+                patterns.append(fnmatch.translate(resource_type))
+            else:
+                exact.add(resource_type)
+
+        self._exact = frozenset(exact)
+        self._pattern = re.compile("|".join(patterns)) if patterns else None
+        self._handler_names = frozenset(handler_names)
+        self._handlers = {}
+
+    @classmethod
+    def for_rule(cls, rule_class, applicable_resources):
+        """
+        :param rule_class: The rule class, which is searched for per-type methods.
+        :type rule_class: type
+        :param applicable_resources: Resource types and wildcard patterns.
+        :type applicable_resources: Iterable[str]
+        :return: The table for this class and list of applicable resources, shared with every instance that has them.
+        :rtype: awslambdahelper.resourcetypes.ResourceTypeTable
+        """
+        key = (rule_class, tuple(applicable_resources))
+        table = _TABLES.get(key)
+        if table is None:
+            with _LOCK:
+                table = _TABLES.get(key)
+                if table is None:
+                    handler_names = [name for name in dir(rule_class) if name.startswith(HANDLER_PREFIX)]
+                    table = _TABLES[key] = cls(applicable_resources, handler_names)
+        return table
+
+    def handler(self, resource_type):
+        """
+        :param resource_type: eg "AWS::EC2::Instance"
+        :type resource_type: str
+        :return: The name of the method for this type, or None if the type is not applicable.
+        :rtype: Union[str,None]
+        """
+        try:
+            return self._handlers[resource_type]
+        except KeyError:
+            pass
+
+        name = None
+        if resource_type in self._exact or (self._pattern is not None and self._pattern.match(resource_type)):
+            name = handler_name(resource_type)
+            if name not in self._handler_names:
+                name = DEFAULT_HANDLER
+
+        self._handlers[resource_type] = name
+        return name
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Cache the evaluations of configuration change rules, so a notification for a configuration the rule has already
+evaluated, such as a redelivery, does not run the rule again.
+
+Results are keyed by the rule, the resource, the rule parameters, and either the `configurationStateId` or a hash of
+the configuration fields the rule reads. A persistent layer is any object with the :code:`get(key)` and
+:code:`put(key, value)` methods of :py:class:`~awslambdahelper.resultcache.SQLiteResultStore`.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+
+from awslambdahelper.cache import LRUCache
+from awslambdahelper.evaluation import AWSConfigEvaluation
+
+#: Evaluations held in memory, shared by every rule in this process.
+EVALUATION_CACHE = LRUCache(maxsize=1024)
+
+_MISSING = object()
+
+
+def configuration_state_key(config, fields=None):
+    """
+    Identify the state of a configuration item.
+
+    :param config: A configuration item.
+    :type config: dict
+    :param fields: Dotted paths of the fields a rule reads, eg :code:`["configuration.ipPermissions", "tags"]`. If
+        given, configuration items which differ only in other fields share a key.
+    :type fields: Union[List[str],None]
+    :rtype: str
+    """
+    if fields is None:
+        return config["configurationStateId"]
+
+    values = []
+    for field in fields:
+        value = config
+        for name in field.split("."):
+            value = value.get(name, _MISSING) if isinstance(value, dict) else _MISSING
+            if value is _MISSING:
+                value = None
+                break
+        values.append(value)
+
+    return _digest(values)
+
+
+def parameters_key(rule_parameters):
+    """
+    :param rule_parameters: The parsed rule parameters.
+    :type rule_parameters: dict
+    :rtype: str
+    """
+    return _digest(rule_parameters)
+
+
+def dump_evaluations(evaluations):
+    """
+    Convert evaluations to JSON serialisable rows.
+
+    :type evaluations: Iterable[awslambdahelper.evaluation.AWSConfigEvaluation]
+    :rtype: List[list]
+    """
+    return [
+        [
+            evaluation.ComplianceType,
+            evaluation.Annotation,
+            evaluation.ComplianceResourceType,
+            evaluation.ComplianceResourceId,
+            evaluation.OrderingTimestamp
+        ]
+        for evaluation in evaluations
+    ]
+
+
+def load_evaluations(rows):
+    """
+    Build new evaluations from rows created by :py:func:`~awslambdahelper.resultcache.dump_evaluations`.
+
+    :type rows: List[list]
+    :rtype: List[awslambdahelper.evaluation.AWSConfigEvaluation]
+    """
+    return [
+        AWSConfigEvaluation(
+            compliance_type,
+            annotation,
+            ResourceType=resource_type,
+            ResourceId=resource_id,
+            OrderingTimestamp=ordering_timestamp
+        )
+        for compliance_type, annotation, resource_type, resource_id, ordering_timestamp in rows
+    ]
+
+
+class SQLiteResultStore(object):
+    """
+    Persistent layer for :py:class:`~awslambdahelper.resultcache.EvaluationResultCache`, kept in an SQLite
+    database. In Lambda this should live under :code:`/tmp`.
+    """
+
+    def __init__(self, path='/tmp/awslambdahelper-results.db'):
+        """
+        :param path: Location of the database file. It is created if it does not exist.
+        :type path: str
+        """
+        self.path = path
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS evaluation_results (cache_key TEXT PRIMARY KEY, evaluations TEXT)"
+            )
+        return self._connection
+
+    def get(self, key):
+        """
+        :param key: A key built by :py:meth:`~awslambdahelper.resultcache.EvaluationResultCache.key`.
+        :type key: tuple
+        :return: The stored rows, or None.
+        :rtype: Union[List[list],None]
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT evaluations FROM evaluation_results WHERE cache_key = ?", (json.dumps(key),)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, key, value):
+        """
+        :type key: tuple
+        :type value: List[list]
+        """
+        with self._lock:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO evaluation_results VALUES (?, ?)", (json.dumps(key), json.dumps(value))
+                )
+
+
+class EvaluationResultCache(object):
+    """
+    Looks evaluations up in memory, then in the optional persistent layer.
+    """
+
+    def __init__(self, memory=EVALUATION_CACHE, persistent=None):
+        """
+        :param memory: The in-memory cache.
+        :type memory: awslambdahelper.cache.LRUCache
+        :param persistent: An optional persistent layer, eg :py:class:`~awslambdahelper.resultcache.SQLiteResultStore`.
+        """
+        self.memory = memory
+        self.persistent = persistent
+
+    @staticmethod
+    def key(rule_name, config, rule_parameters, fields=None):
+        """
+        :param rule_name: Identifies the rule, so rules sharing a process don't share results.
+        :type rule_name: str
+        :param config: The configuration item being evaluated.
+        :type config: dict
+        :param rule_parameters: The parsed rule parameters.
+        :type rule_parameters: dict
+        :param fields: See :py:func:`~awslambdahelper.resultcache.configuration_state_key`.
+        :rtype: tuple
+        """
+        return (
+            rule_name,
+            config["resourceType"],
+            config["resourceId"],
+            configuration_state_key(config, fields),
+            parameters_key(rule_parameters)
+        )
+
+    def get(self, key):
+        """
+        :return: New evaluation objects built from the cached results, or None.
+        :rtype: Union[List[awslambdahelper.evaluation.AWSConfigEvaluation],None]
+        """
+        rows = self.memory.get(key)
+        if rows is None and self.persistent is not None:
+            rows = self.persistent.get(key)
+            if rows is not None:
+                self.memory.put(key, rows)
+
+        return None if rows is None else load_evaluations(rows)
+
+    def put(self, key, evaluations):
+        """
+        :type evaluations: Iterable[awslambdahelper.evaluation.AWSConfigEvaluation]
+        """
+        rows = dump_evaluations(evaluations)
+        self.memory.put(key, rows)
+        if self.persistent is not None:
+            self.persistent.put(key, rows)
+
+
+def _digest(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
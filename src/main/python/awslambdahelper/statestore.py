@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Remember the compliance last sent for each resource, so scheduled rules only send evaluations which have changed.
+
+A state store is any object with the :code:`get(key)` and :code:`put_many(items)` methods of
+:py:class:`~awslambdahelper.statestore.MemoryStateStore`. Keys are `(rule name, resource type, resource id)`
+tuples, and values are :py:class:`~awslambdahelper.statestore.ComplianceState` tuples. To share state between
+containers, implement these two methods on top of a key-value service such as DynamoDB.
+"""
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+#: Resend an evaluation once this many seconds have passed since it was last sent, even if it has not changed.
+STATE_REFRESH_SECONDS = 24 * 60 * 60
+
+#: What was last sent to AWS Config for a resource, and when.
+ComplianceState = namedtuple('ComplianceState', ['compliance_type', 'annotation', 'submitted_at'])
+
+
+class MemoryStateStore(object):
+    """
+    Keeps state in a dictionary. Useful in tests and local runs, or to keep state for the lifetime of a container.
+    """
+
+    def __init__(self):
+        self._states = {}
+
+    def get(self, key):
+        """
+        :param key: `(rule name, resource type, resource id)`
+        :type key: tuple
+        :rtype: Union[awslambdahelper.statestore.ComplianceState,None]
+        """
+        return self._states.get(key)
+
+    def put_many(self, items):
+        """
+        :param items: `(key, state)` pairs.
+        :type items: Iterable[Tuple[tuple,awslambdahelper.statestore.ComplianceState]]
+        """
+        self._states.update(items)
+
+
+class SQLiteStateStore(object):
+    """
+    Keeps state in an SQLite database. In Lambda this should live under :code:`/tmp`, and so lasts as long as the
+    container does.
+    """
+
+    def __init__(self, path='/tmp/awslambdahelper-state.db'):
+        """
+        :param path: Location of the database file. It is created if it does not exist.
+        :type path: str
+        """
+        self.path = path
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS compliance_state ("
+                "rule_name TEXT, resource_type TEXT, resource_id TEXT, "
+                "compliance_type TEXT, annotation TEXT, submitted_at REAL, "
+                "PRIMARY KEY (rule_name, resource_type, resource_id))"
+            )
+        return self._connection
+
+    def get(self, key):
+        """
+        See :py:meth:`~awslambdahelper.statestore.MemoryStateStore.get`.
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT compliance_type, annotation, submitted_at FROM compliance_state "
+                "WHERE rule_name = ? AND resource_type = ? AND resource_id = ?",
+                key
+            ).fetchone()
+        return None if row is None else ComplianceState(*row)
+
+    def put_many(self, items):
+        """
+        See :py:meth:`~awslambdahelper.statestore.MemoryStateStore.put_many`.
+        """
+        with self._lock:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO compliance_state VALUES (?, ?, ?, ?, ?, ?)",
+                    (key + tuple(state) for key, state in items)
+                )
+
+
+class DeltaFilter(object):
+    """
+    Drops evaluations which match what was last sent for the same resource, unless that was more than
+    `refresh_seconds` ago. The new state is only saved by
+    :py:meth:`~awslambdahelper.statestore.DeltaFilter.commit`, which should be called once the evaluations have been
+    sent successfully.
+    """
+
+    def __init__(self, store, rule_name, refresh_seconds=STATE_REFRESH_SECONDS):
+        """
+        :param store: Where to keep state.
+        :type store: awslambdahelper.statestore.MemoryStateStore
+        :param rule_name: Name of the AWS Config rule, to keep the state of each rule apart.
+        :type rule_name: str
+        :param refresh_seconds: Resend unchanged evaluations after this many seconds.
+        :type refresh_seconds: Union[int,float]
+        """
+        self.store = store
+        self.rule_name = rule_name
+        self.refresh_seconds = refresh_seconds
+        #: Number of evaluations dropped because they had not changed.
+        self.skipped = 0
+        self._pending = []
+
+    def filter(self, evaluations):
+        """
+        :param evaluations: Evaluation payloads.
+        :type evaluations: Iterable[dict]
+        :return: The payloads which have changed, or are due a refresh.
+        :rtype: Iterator[dict]
+        """
+        now = time.time()
+        for evaluation in evaluations:
+            key = (self.rule_name, evaluation['ComplianceResourceType'], evaluation['ComplianceResourceId'])
+            state = self.store.get(key)
+
+            unchanged = (
+                state is not None and
+                state.compliance_type == evaluation['ComplianceType'] and
+                state.annotation == evaluation['Annotation'] and
+                now - state.submitted_at < self.refresh_seconds
+            )
+            if unchanged:
+                self.skipped += 1
+                continue
+
+            self._pending.append((key, ComplianceState(evaluation['ComplianceType'], evaluation['Annotation'], now)))
+            yield evaluation
+
+    def commit(self):
+        """
+        Save the state of every evaluation passed by :py:meth:`~awslambdahelper.statestore.DeltaFilter.filter`.
+        """
+        if self._pending:
+            self.store.put_many(self._pending)
+            self._pending = []
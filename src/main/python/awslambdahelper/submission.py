@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+Sends evaluation payloads to
+`PutEvaluations <http://docs.aws.amazon.com/config/latest/APIReference/API_PutEvaluations.html>`_ in chunks, either
+one after another or on a pool of threads.
+"""
+import json
+import threading
+
+import backoff
+import botocore.exceptions
+from concurrent.futures import ThreadPoolExecutor
+
+#: There's a max number of evaluations we can apply to put_evaluations at once. It's 100.
+MAX_EVALUATIONS_PER_REQUEST = 100
+#: Conservative estimate of the largest put_evaluations request body, in bytes, which AWS Config will accept.
+MAX_REQUEST_BYTES = 256 * 1024
+# Bytes taken by the ", " between evaluations in the serialised list.
+_SEPARATOR_BYTES = 2
+#: Number of attempts made to send a chunk, when it is throttled or has evaluations listed in `FailedEvaluations`.
+MAX_SUBMISSION_TRIES = 10
+#: Longest wait, in seconds, between two attempts to send a chunk.
+MAX_SUBMISSION_BACKOFF_SECONDS = 10
+#: Give up retrying a chunk once this many seconds have passed since its first attempt.
+MAX_SUBMISSION_SECONDS = 60
+#: Error codes which mean a request was throttled, and can be retried.
+THROTTLING_ERROR_CODES = (
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'TooManyRequestsException',
+    'RequestLimitExceeded',
+    'ServiceUnavailable',
+)
+
+
+class EvaluationSubmissionError(Exception):
+    """
+    Raised once every chunk has been sent, if any of them failed.
+    """
+
+    def __init__(self, failures):
+        """
+        :param failures: The chunks which could not be sent, and the exception each one raised.
+        :type failures: List[Tuple[List[dict],Exception]]
+        """
+        super(EvaluationSubmissionError, self).__init__(
+            "{failed} put_evaluations request(s) failed: {errors}".format(
+                failed=len(failures),
+                errors="; ".join(str(error) for _, error in failures)
+            )
+        )
+        self.failures = failures
+
+
+class FailedEvaluationsError(Exception):
+    """
+    Raised when AWS Config keeps rejecting evaluations, after every retry has been used.
+    """
+
+    def __init__(self, evaluations):
+        """
+        :param evaluations: The evaluation payloads which could not be sent.
+        :type evaluations: List[dict]
+        """
+        super(FailedEvaluationsError, self).__init__(
+            "AWS Config did not accept {count} evaluation(s).".format(count=len(evaluations))
+        )
+        self.evaluations = evaluations
+
+
+def is_throttling_error(error):
+    """
+    :param error: An exception raised by a boto3 client.
+    :type error: botocore.exceptions.ClientError
+    :return: True if the request was throttled.
+    :rtype: bool
+    """
+    return error.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+
+
+def failed_evaluations(evaluations, response):
+    """
+    Find the evaluations which AWS Config listed in the `FailedEvaluations` of a put_evaluations response.
+
+    The payloads we sent are returned, rather than the copies in the response, so they are resent unchanged.
+
+    :param evaluations: The evaluation payloads which were sent.
+    :type evaluations: List[dict]
+    :param response: The put_evaluations response.
+    :type response: dict
+    :rtype: List[dict]
+    """
+    if not isinstance(response, dict) or not response.get('FailedEvaluations'):
+        return []
+
+    failed = set(
+        (evaluation.get('ComplianceResourceType'), evaluation.get('ComplianceResourceId'))
+        for evaluation in response['FailedEvaluations']
+    )
+    return [
+        evaluation for evaluation in evaluations
+        if (evaluation['ComplianceResourceType'], evaluation['ComplianceResourceId']) in failed
+    ]
+
+
+def chunk_evaluations(evaluations, chunk_size=MAX_EVALUATIONS_PER_REQUEST, max_bytes=None):
+    """
+    Split evaluations into lists of at most `chunk_size` items. If `max_bytes` is set, each list is also kept under
+    that many bytes once serialised to JSON. An evaluation which is larger than `max_bytes` on its own is put in a
+    list by itself.
+
+    :param evaluations: Evaluation payloads, as produced by
+        :py:meth:`~awslambdahelper.evaluation.AWSConfigEvaluation.to_dict`.
+    :type evaluations: Iterable[dict]
+    :param chunk_size: Maximum number of evaluations in each chunk.
+    :type chunk_size: int
+    :param max_bytes: Maximum serialised size of the evaluations in each chunk.
+    :type max_bytes: int
+    :rtype: Iterator[List[dict]]
+    """
+    chunk = []
+    chunk_bytes = 0
+    for evaluation in evaluations:
+        if max_bytes is not None:
+            evaluation_bytes = estimate_size(evaluation) + _SEPARATOR_BYTES
+            if chunk and chunk_bytes + evaluation_bytes > max_bytes:
+                yield chunk
+                chunk = []
+                chunk_bytes = 0
+            chunk_bytes += evaluation_bytes
+
+        chunk.append(evaluation)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+    if chunk:
+        yield chunk
+
+
+def estimate_size(value):
+    """
+    Estimate the number of bytes `value` takes up in a request body.
+
+    :param value: A JSON serialisable value. Timestamps may be datetimes.
+    :rtype: int
+    """
+    return len(json.dumps(value, default=str))
+
+
+class EvaluationSubmitter(object):
+    """
+    Sends chunks of evaluations for a single result token.
+
+    With `max_in_flight` set to 1 each chunk is sent as soon as it is given to
+    :py:meth:`~awslambdahelper.submission.EvaluationSubmitter.send`, and any error is raised straight away. With a
+    higher value, chunks are sent on a thread pool and failures are collected, then raised together by
+    :py:meth:`~awslambdahelper.submission.EvaluationSubmitter.wait`.
+    """
+
+    def __init__(self, put_evaluations, result_token, max_in_flight=1, chunk_size=MAX_EVALUATIONS_PER_REQUEST,
+                 max_request_bytes=MAX_REQUEST_BYTES, max_tries=MAX_SUBMISSION_TRIES, backoff_factor=1,
+                 max_backoff=MAX_SUBMISSION_BACKOFF_SECONDS, max_time=MAX_SUBMISSION_SECONDS, deadline=None):
+        """
+        :param put_evaluations: Callable taking the `Evaluations` and `ResultToken` keyword arguments.
+        :type put_evaluations: callable
+        :param result_token: The token from the AWS Config event.
+        :type result_token: str
+        :param max_in_flight: Maximum number of concurrent put_evaluations requests.
+        :type max_in_flight: int
+        :param chunk_size: Maximum number of evaluations in each request.
+        :type chunk_size: int
+        :param max_request_bytes: Maximum estimated size of each request body. Not checked when None.
+        :type max_request_bytes: int
+        :param max_tries: Number of attempts made to send a chunk, when it is throttled or only partially accepted.
+            Throttling and partial acceptance share these attempts.
+        :type max_tries: int
+        :param backoff_factor: Multiplier, in seconds, for the exponential backoff between attempts.
+        :type backoff_factor: Union[int,float]
+        :param max_backoff: Longest wait, in seconds, between two attempts.
+        :type max_backoff: Union[int,float]
+        :param max_time: Stop retrying a chunk once this many seconds have passed since its first attempt.
+        :type max_time: Union[int,float]
+        :param deadline: Also stop retrying once the deadline's safety margin is reached.
+        :type deadline: awslambdahelper.deadline.Deadline
+        """
+        self.put_evaluations = put_evaluations
+        self.result_token = result_token
+        self.max_in_flight = max(1, max_in_flight)
+        self.chunk_size = chunk_size
+        self.max_request_bytes = max_request_bytes
+        self.max_tries = max_tries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_time = max_time
+        self.deadline = deadline
+        self.results = []
+        self.failures = []
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+
+    @property
+    def is_concurrent(self):
+        return self.max_in_flight > 1
+
+    def submit(self, evaluations):
+        """
+        Chunk and send every evaluation, then wait for all of the requests to finish.
+
+        :param evaluations: Evaluation payloads.
+        :type evaluations: Iterable[dict]
+        :return: The put_evaluations responses, in the order the chunks were sent.
+        :rtype: list
+        """
+        for chunk in chunk_evaluations(evaluations, self.chunk_size, self.max_evaluation_bytes):
+            self.send(chunk)
+        return self.wait()
+
+    @property
+    def max_evaluation_bytes(self):
+        """
+        The space left for evaluations in each request, once the rest of the request body is accounted for.
+
+        :rtype: Union[int,None]
+        """
+        if self.max_request_bytes is None:
+            return None
+        return self.max_request_bytes - estimate_size({'Evaluations': [], 'ResultToken': self.result_token})
+
+    def send(self, chunk):
+        """
+        Send a single chunk of evaluations. In concurrent mode this blocks while `max_in_flight` requests are
+        already running.
+
+        :param chunk: At most `chunk_size` evaluation payloads.
+        :type chunk: List[dict]
+        """
+        index = len(self.results)
+        self.results.append(None)
+
+        if not self.is_concurrent:
+            self.results[index] = self._put(chunk)
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+
+        self._slots.acquire()
+        try:
+            self._executor.submit(self._send_concurrent, index, chunk)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def wait(self):
+        """
+        Wait for all outstanding requests.
+
+        :return: The put_evaluations responses, in the order the chunks were sent.
+        :rtype: list
+        :raises: :py:class:`~awslambdahelper.submission.EvaluationSubmissionError` if any chunk failed.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        if self.failures:
+            raise EvaluationSubmissionError(self.failures)
+
+        return self.results
+
+    def _send_concurrent(self, index, chunk):
+        try:
+            self.results[index] = self._put(chunk)
+        except Exception as e:
+            with self._lock:
+                self.failures.append((chunk, e))
+        finally:
+            self._slots.release()
+
+    def _put(self, chunk):
+        """
+        Send a chunk, backing off and retrying when throttled. If AWS Config only accepts some of the evaluations,
+        only those listed in `FailedEvaluations` are sent again.
+
+        :raises: :py:class:`~awslambdahelper.submission.FailedEvaluationsError` if evaluations are still being
+            rejected after `max_tries` attempts. The throttling error, if the last attempt was throttled.
+        """
+        state = {'pending': chunk, 'response': None, 'error': None}
+
+        max_time = self.max_time
+        if self.deadline is not None:
+            max_time = min(max_time, self.deadline.remaining_seconds)
+
+        # Throttling and partially accepted requests are both retried here, so they share one budget of attempts.
+        @backoff.on_predicate(backoff.expo,
+                              predicate=bool,
+                              max_tries=self.max_tries,
+                              max_time=max_time,
+                              jitter=backoff.full_jitter,
+                              factor=self.backoff_factor,
+                              max_value=self.max_backoff)
+        def attempt():
+            try:
+                state['response'] = self.put_evaluations(
+                    Evaluations=state['pending'],
+                    ResultToken=self.result_token
+                )
+            except botocore.exceptions.ClientError as e:
+                if not is_throttling_error(e):
+                    raise
+                state['error'] = e
+                return True
+
+            state['error'] = None
+            state['pending'] = failed_evaluations(state['pending'], state['response'])
+            return bool(state['pending'])
+
+        if attempt():
+            if state['error'] is not None:
+                raise state['error']
+            raise FailedEvaluationsError(state['pending'])
+
+        return state['response']
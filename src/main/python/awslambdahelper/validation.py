@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Check evaluation payloads against the limits of the
+`Evaluation <http://docs.aws.amazon.com/config/latest/APIReference/API_Evaluation.html>`_ type before they are sent.
+A single invalid evaluation makes AWS Config reject the whole put_evaluations request, so problems which can be fixed
+are fixed, and evaluations which can't are dropped, with a warning logged for each one.
+"""
+import datetime
+import logging
+import re
+
+from awslambdahelper.evaluation import AWSConfigEvaluation
+
+#: Maximum length of an evaluation's annotation.
+MAX_ANNOTATION_LENGTH = 256
+#: Maximum length of a resource id.
+MAX_RESOURCE_ID_LENGTH = 768
+#: Maximum length of a resource type.
+MAX_RESOURCE_TYPE_LENGTH = 256
+#: Appended to annotations which have been shortened.
+TRUNCATION_MARKER = '...'
+
+COMPLIANCE_TYPES = frozenset([
+    AWSConfigEvaluation.TYPE_COMPLIANT,
+    AWSConfigEvaluation.TYPE_NON_COMPLIANT,
+    AWSConfigEvaluation.TYPE_NOT_APPLICABLE,
+    AWSConfigEvaluation.TYPE_INSUFFICIENT_DATA,
+])
+
+logger = logging.getLogger(__name__)
+
+_TIMESTAMP = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:?\d{2})?$')
+
+
+class EvaluationValidator(object):
+    """
+    Fixes or drops evaluation payloads which AWS Config would reject, and counts how many it has changed.
+
+    * Annotations longer than :py:data:`MAX_ANNOTATION_LENGTH` are truncated.
+    * Empty annotations are removed, as the annotation is optional.
+    * Evaluations with a missing or over-long resource type or id, an unknown compliance type, or an unreadable
+      timestamp are dropped.
+    """
+
+    def __init__(self):
+        #: Number of annotations which were shortened or removed.
+        self.fixed = 0
+        #: Number of evaluations which were dropped.
+        self.rejected = 0
+
+    def filter(self, evaluations):
+        """
+        :param evaluations: Evaluation payloads.
+        :type evaluations: Iterable[dict]
+        :return: The valid payloads, including the ones which have been fixed.
+        :rtype: Iterator[dict]
+        """
+        for evaluation in evaluations:
+            if self.validate(evaluation):
+                yield evaluation
+
+    def validate(self, evaluation):
+        """
+        Fix `evaluation` in place if possible.
+
+        :param evaluation: An evaluation payload.
+        :type evaluation: dict
+        :return: False if the evaluation should be dropped.
+        :rtype: bool
+        """
+        reason = _rejection_reason(evaluation)
+        if reason is not None:
+            logger.warning("Dropped the evaluation of %s %s: %s", evaluation.get('ComplianceResourceType'),
+                           evaluation.get('ComplianceResourceId'), reason)
+            self.rejected += 1
+            return False
+
+        annotation = _text(evaluation.get('Annotation'))
+        if not annotation:
+            if 'Annotation' in evaluation:
+                del evaluation['Annotation']
+                self.fixed += 1
+        elif len(annotation) > MAX_ANNOTATION_LENGTH:
+            evaluation['Annotation'] = annotation[:MAX_ANNOTATION_LENGTH - len(TRUNCATION_MARKER)] + TRUNCATION_MARKER
+            self.fixed += 1
+
+        return True
+
+
+def _rejection_reason(evaluation):
+    if not _valid_string(evaluation.get('ComplianceResourceType'), MAX_RESOURCE_TYPE_LENGTH):
+        return "missing or over-long resource type"
+    if not _valid_string(evaluation.get('ComplianceResourceId'), MAX_RESOURCE_ID_LENGTH):
+        return "missing or over-long resource id"
+    if evaluation.get('ComplianceType') not in COMPLIANCE_TYPES:
+        return "unknown compliance type {0!r}".format(evaluation.get('ComplianceType'))
+    if not _valid_timestamp(evaluation.get('OrderingTimestamp')):
+        return "unreadable ordering timestamp {0!r}".format(evaluation.get('OrderingTimestamp'))
+    return None
+
+
+def _text(value):
+    # Limits are in characters, so byte strings are measured and truncated once decoded, or a multi-byte character
+    # could be cut in half.
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'replace')
+    return value
+
+
+def _valid_string(value, max_length):
+    return bool(value) and len(_text(value)) <= max_length
+
+
+def _valid_timestamp(value):
+    if isinstance(value, (datetime.datetime, int, float)):
+        return True
+    try:
+        return _TIMESTAMP.match(value) is not None
+    except TypeError:
+        return False
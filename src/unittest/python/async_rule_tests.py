@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+import unittest
+from mock import MagicMock, patch
+from awslambdahelper import AsyncAWSConfigRule
+
+
+class TestAsyncAWSConfigRule(unittest.TestCase):
+    @patch('awslambdahelper.get_client')
+    def test_call_async(self, mock_get_client):
+        mock_get_client.return_value.describe_volumes.side_effect = lambda **kwargs: kwargs['VolumeIds']
+
+        rule = AsyncAWSConfigRule()
+        futures = [rule.call_async("ec2", "describe_volumes", VolumeIds=["vol-%d" % i]) for i in range(5)]
+
+        self.assertEqual(rule.gather(futures), [["vol-%d" % i] for i in range(5)])
+        mock_get_client.assert_called_with("ec2")
+
+    @patch('awslambdahelper.get_client')
+    def test_service_concurrency(self, mock_get_client):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def describe(**kwargs):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.pop()
+
+        mock_get_client.return_value.describe_instances.side_effect = describe
+
+        class MockRule(AsyncAWSConfigRule):
+            SERVICE_CONCURRENCY = {"ec2": 2}
+
+        rule = MockRule()
+        rule.gather([rule.call_async("ec2", "describe_instances") for _ in range(10)])
+
+        self.assertEqual(max(peak), 2)
+
+    @patch('awslambdahelper.get_client')
+    def test_throttled_service_does_not_block_others(self, mock_get_client):
+        iam_released = threading.Event()
+
+        def get_client(service_name):
+            client = MagicMock()
+            client.list_roles.side_effect = lambda: iam_released.wait(5)
+            client.describe_instances.return_value = "instances"
+            return client
+
+        mock_get_client.side_effect = get_client
+
+        class MockRule(AsyncAWSConfigRule):
+            MAX_ASYNC_CALLS = 4
+            SERVICE_CONCURRENCY = {"iam": 2}
+
+        rule = MockRule()
+        iam_futures = [rule.call_async("iam", "list_roles") for _ in range(64)]
+
+        try:
+            self.assertEqual(rule.call_async("ec2", "describe_instances").result(timeout=1), "instances")
+        finally:
+            iam_released.set()
+        rule.gather(iam_futures)
+
+    @patch('awslambdahelper.get_client')
+    def test_gather_raises(self, mock_get_client):
+        mock_get_client.return_value.describe_instances.side_effect = ValueError("failed")
+
+        rule = AsyncAWSConfigRule()
+
+        with self.assertRaises(ValueError):
+            rule.gather([rule.call_async("ec2", "describe_instances")])
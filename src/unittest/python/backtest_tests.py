@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from mock import patch
+from awslambdahelper import AWSConfigRule, CompliantEvaluation, NonCompliantEvaluation
+from awslambdahelper.backtest import BatchEvaluator, BatchResult, configuration_items, load_rule_class, read_documents
+from awslambdahelper.cli import LambdahelperBacktest
+
+
+class EncryptedVolumesRule(AWSConfigRule):
+    APPLICABLE_RESOURCES = ["AWS::EC2::Volume"]
+
+    def setup(self, rule_parameters):
+        self.annotation = rule_parameters.get("annotation", "Not encrypted")
+
+    def find_violation_config_change(self, rule_parameters, config):
+        if config["configuration"]["encrypted"] is None:
+            raise ValueError("unknown")
+        if config["configuration"]["encrypted"]:
+            return [CompliantEvaluation()]
+        return [NonCompliantEvaluation(self.annotation)]
+
+
+def volume(resource_id, encrypted):
+    return {
+        "resourceType": "AWS::EC2::Volume",
+        "resourceId": resource_id,
+        "configurationItemCaptureTime": "2016-07-13T21:50:00.373Z",
+        "configuration": {"encrypted": encrypted}
+    }
+
+
+class TestReadDocuments(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_jsonl(self):
+        path = os.path.join(self.directory, 'items.jsonl')
+        with open(path, 'w') as f:
+            f.write(json.dumps(volume('vol-1', True)) + '\n\n' + json.dumps(volume('vol-2', False)) + '\n')
+
+        self.assertEqual([json.loads(document)['resourceId'] for document in read_documents(path)], ['vol-1', 'vol-2'])
+
+    def test_directory(self):
+        os.mkdir(os.path.join(self.directory, 'b'))
+        with open(os.path.join(self.directory, 'a.json'), 'w') as f:
+            json.dump([volume('vol-1', True), volume('vol-2', True)], f)
+        with open(os.path.join(self.directory, 'b', 'c.json'), 'w') as f:
+            json.dump({"invokingEvent": json.dumps({"configurationItem": volume('vol-3', True)})}, f)
+        with open(os.path.join(self.directory, 'ignored.txt'), 'w') as f:
+            f.write('not json')
+
+        items = []
+        for document in read_documents(self.directory):
+            items.extend(configuration_items(json.loads(document)))
+
+        self.assertEqual([item['resourceId'] for item in items], ['vol-1', 'vol-2', 'vol-3'])
+
+
+class TestBatchEvaluator(unittest.TestCase):
+    def documents(self):
+        return [
+            json.dumps(volume('vol-1', True)),
+            json.dumps(volume('vol-2', False)),
+            json.dumps(volume('vol-3', None)),
+            json.dumps([volume('vol-4', False), volume('vol-5', True)])
+        ]
+
+    def assert_evaluations(self, evaluator):
+        result = BatchResult()
+        evaluations = sorted(evaluator.evaluate(self.documents(), result), key=lambda e: e['ComplianceResourceId'])
+
+        self.assertEqual(
+            [(e['ComplianceResourceId'], e['ComplianceType']) for e in evaluations],
+            [('vol-1', 'COMPLIANT'), ('vol-2', 'NON_COMPLIANT'), ('vol-4', 'NON_COMPLIANT'), ('vol-5', 'COMPLIANT')]
+        )
+        self.assertEqual(evaluations[1]['Annotation'], 'Unencrypted')
+        self.assertEqual(evaluations[1]['OrderingTimestamp'], '2016-07-13T21:50:00.373Z')
+        self.assertEqual(result.items, 5)
+        self.assertEqual(result.evaluations, 4)
+        self.assertEqual(result.errors, [('vol-3', 'ValueError: unknown')])
+
+    def test_in_process(self):
+        self.assert_evaluations(
+            BatchEvaluator('backtest_tests:EncryptedVolumesRule', {'annotation': 'Unencrypted'}, processes=1)
+        )
+
+    def test_process_pool(self):
+        self.assert_evaluations(
+            BatchEvaluator('backtest_tests:EncryptedVolumesRule', {'annotation': 'Unencrypted'}, processes=2,
+                           chunk_size=1)
+        )
+
+    def test_process_pool_streams_documents(self):
+        read = []
+
+        def documents():
+            for i in range(10000):
+                read.append(i)
+                yield json.dumps(volume('vol-%d' % i, True))
+
+        evaluator = BatchEvaluator('backtest_tests:EncryptedVolumesRule', processes=2, chunk_size=5)
+        evaluations = evaluator.evaluate(documents())
+        next(evaluations)
+        evaluations.close()
+
+        # At most two chunks per process are read ahead, besides the one whose results were read.
+        self.assertLessEqual(len(read), 5 * (2 * 2 + 1))
+
+    def test_load_rule_class(self):
+        self.assertIs(load_rule_class('backtest_tests.EncryptedVolumesRule'), EncryptedVolumesRule)
+
+
+class TestLambdahelperBacktest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_run(self):
+        input_path = os.path.join(self.directory, 'items.jsonl')
+        output_path = os.path.join(self.directory, 'evaluations.jsonl')
+        with open(input_path, 'w') as f:
+            f.write(json.dumps(volume('vol-1', False)) + '\n')
+
+        with patch('sys.stderr'):
+            result = LambdahelperBacktest().run([
+                'backtest_tests:EncryptedVolumesRule',
+                '--input', input_path,
+                '--output', output_path,
+                '--processes', '1'
+            ])
+
+        with open(output_path) as f:
+            evaluations = [json.loads(line) for line in f]
+        self.assertEqual(result.items, 1)
+        self.assertEqual(evaluations[0]['ComplianceType'], 'NON_COMPLIANT')
+        self.assertEqual(evaluations[0]['Annotation'], 'Not encrypted')
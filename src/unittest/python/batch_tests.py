@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+from mock import MagicMock, patch
+from awslambdahelper import AWSConfigRule, CompliantEvaluation, NonCompliantEvaluation
+from awslambdahelper.batch import batch_records, decode_record
+
+
+def rule_event(resource_id, result_token):
+    return {
+        "invokingEvent": json.dumps({
+            "configurationItem": {
+                "resourceType": "AWS::EC2::Instance",
+                "resourceId": resource_id,
+                "configurationItemCaptureTime": "2016-07-13T21:50:00.373Z",
+                "configuration": {}
+            },
+            "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+            "messageType": "ConfigurationItemChangeNotification"
+        }),
+        "resultToken": result_token,
+        "eventLeftScope": False,
+        "accountId": "123456789012"
+    }
+
+
+def sqs_event(*events):
+    return {"Records": [
+        {"messageId": "message-%d" % i, "body": json.dumps(event)} for i, event in enumerate(events)
+    ]}
+
+
+class BatchRule(AWSConfigRule):
+    APPLICABLE_RESOURCES = ["AWS::EC2::Instance"]
+
+    def find_violation_config_change(self, rule_parameters, config):
+        if config["resourceId"] == "i-broken":
+            raise ValueError("broken")
+        if config["resourceId"].startswith("i-bad"):
+            return [NonCompliantEvaluation("bad")]
+        return [CompliantEvaluation()]
+
+
+class TestBatchRecords(unittest.TestCase):
+    def test_sqs(self):
+        records = batch_records(sqs_event(rule_event("i-1", "token")))
+
+        self.assertEqual(records[0][0], "message-0")
+        self.assertEqual(decode_record(records[0][1])["resultToken"], "token")
+
+    def test_list(self):
+        self.assertEqual(batch_records([rule_event("i-1", "token")])[0][0], 0)
+
+    def test_eventbridge_detail(self):
+        body = json.dumps({"detail-type": "Config Rule Event", "detail": rule_event("i-1", "token")})
+
+        self.assertEqual(decode_record(body)["resultToken"], "token")
+
+
+class TestBatchHandler(unittest.TestCase):
+    def setUp(self):
+        self.put_evaluations = MagicMock()
+        BatchRule.put_evaluations = self.put_evaluations
+
+    def tearDown(self):
+        del BatchRule.put_evaluations
+
+    def test_grouped_by_result_token(self):
+        response = BatchRule.batch_handler(sqs_event(
+            rule_event("i-1", "token-a"),
+            rule_event("i-bad-2", "token-b"),
+            rule_event("i-3", "token-a"),
+        ), None)
+
+        self.assertEqual(response, {"batchItemFailures": []})
+        self.assertEqual(self.put_evaluations.call_count, 2)
+
+        sent = dict(
+            (kwargs["ResultToken"], sorted(e["ComplianceResourceId"] for e in kwargs["Evaluations"]))
+            for _, kwargs in self.put_evaluations.call_args_list
+        )
+        self.assertEqual(sent, {"token-a": ["i-1", "i-3"], "token-b": ["i-bad-2"]})
+
+    def test_partial_failures(self):
+        def put_evaluations(Evaluations, ResultToken):
+            if ResultToken == "token-rejected":
+                raise ValueError("rejected")
+            return {"FailedEvaluations": []}
+
+        self.put_evaluations.side_effect = put_evaluations
+
+        with patch('awslambdahelper.logger') as mock_logger:
+            response = BatchRule.batch_handler(sqs_event(
+                rule_event("i-1", "token-a"),
+                rule_event("i-broken", "token-a"),
+                rule_event("i-2", "token-rejected"),
+            ), None)
+
+        self.assertEqual(
+            sorted(failure["itemIdentifier"] for failure in response["batchItemFailures"]),
+            ["message-1", "message-2"]
+        )
+        logged = sorted(" ".join(str(arg) for arg in args) for args, _ in mock_logger.exception.call_args_list)
+        self.assertEqual(len(logged), 2)
+        self.assertIn("message-1", logged[0])
+        self.assertIn("message-2", logged[1])
+
+    def test_undecodable_record(self):
+        response = BatchRule.batch_handler({"Records": [{"messageId": "message-0", "body": "not json"}]}, None)
+
+        self.assertEqual(response, {"batchItemFailures": [{"itemIdentifier": "message-0"}]})
+        self.put_evaluations.assert_not_called()
@@ -13,7 +13,7 @@ class TestArgParserTests(unittest.TestCase):
     def setUp(self):
         self.original = dict()
         self.original['os.path.exists'] = os.path.exists
-        self.original['os.path.isdir'] = os.path.exists
+        self.original['os.path.isdir'] = os.path.isdir
         self.original['os.path.expanduser'] = os.path.expanduser
         self.original['os.path.abspath'] = os.path.abspath
 
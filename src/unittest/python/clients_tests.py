@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+import datetime
+import threading
+import time
+import unittest
+import botocore.session
+from botocore.stub import Stubber
+from dateutil.tz import tzutc
+from mock import MagicMock, patch
+from awslambdahelper import AWSConfigRule
+from awslambdahelper.clients import AssumedRoleSessionCache, ClientCache
+
+
+class TestClientCache(unittest.TestCase):
+    @patch('awslambdahelper.clients.boto3')
+    def test_client_reused(self, mock_boto3):
+        cache = ClientCache()
+
+        first = cache.client('config')
+        second = cache.client('config')
+
+        self.assertIs(first, second)
+        self.assertEqual(mock_boto3.client.call_count, 1)
+
+    @patch('awslambdahelper.clients.boto3')
+    def test_client_keyed_by_region(self, mock_boto3):
+        mock_boto3.client.side_effect = lambda *args, **kwargs: MagicMock()
+        cache = ClientCache()
+
+        cache.client('config', region_name='eu-west-1')
+        cache.client('config', region_name='us-east-1')
+        cache.client('config', region_name='eu-west-1')
+
+        self.assertEqual(mock_boto3.client.call_count, 2)
+        self.assertEqual(len(cache), 2)
+
+    def test_client_keyed_by_credentials(self):
+        first_session = MagicMock()
+        first_session.get_credentials.return_value.access_key = 'AKIAFIRST0000000'
+        second_session = MagicMock()
+        second_session.get_credentials.return_value.access_key = 'AKIASECOND000000'
+        cache = ClientCache()
+
+        self.assertIs(
+            cache.client('config', session=first_session),
+            first_session.client.return_value
+        )
+        self.assertIs(
+            cache.client('config', session=second_session),
+            second_session.client.return_value
+        )
+        self.assertIs(
+            cache.client('config', session=first_session),
+            first_session.client.return_value
+        )
+        first_session.client.assert_called_once()
+
+    def test_botocore_config(self):
+        config = ClientCache(max_pool_connections=7, connect_timeout=2).botocore_config()
+
+        self.assertEqual(config.max_pool_connections, 7)
+        self.assertEqual(config.connect_timeout, 2)
+
+    @patch('awslambdahelper.clients.boto3')
+    def test_clear(self, mock_boto3):
+        cache = ClientCache()
+        cache.client('config')
+        cache.clear()
+        cache.client('config')
+
+        self.assertEqual(mock_boto3.client.call_count, 2)
+
+    @patch('awslambdahelper.get_client')
+    def test_put_evaluations_uses_cache(self, mock_get_client):
+        AWSConfigRule.put_evaluations(Evaluations=[], ResultToken='token')
+
+        mock_get_client.assert_called_once_with('config')
+        mock_get_client.return_value.put_evaluations.assert_called_once_with(
+            Evaluations=[], ResultToken='token'
+        )
+
+
+ROLE_ARN = 'arn:aws:iam::210987654321:role/config-rule'
+
+
+def assume_role_response(access_key, expires_in):
+    return {
+        'Credentials': {
+            'AccessKeyId': access_key,
+            'SecretAccessKey': 'secret',
+            'SessionToken': 'token',
+            'Expiration': datetime.datetime.now(tzutc()) + datetime.timedelta(seconds=expires_in)
+        }
+    }
+
+
+class TestAssumedRoleSessionCache(unittest.TestCase):
+    def setUp(self):
+        self.sts = botocore.session.get_session().create_client(
+            'sts', region_name='us-east-1', aws_access_key_id='AKIAFUNCTION', aws_secret_access_key='secret'
+        )
+        self.stubber = Stubber(self.sts)
+        self.expected_params = {
+            'RoleArn': ROLE_ARN,
+            'RoleSessionName': 'awslambdahelper',
+            'DurationSeconds': 3600
+        }
+
+    def tearDown(self):
+        self.stubber.deactivate()
+
+    def test_session_reused(self):
+        self.stubber.add_response('assume_role', assume_role_response('AKIAROLE00000000', 3600), self.expected_params)
+        self.stubber.activate()
+        cache = AssumedRoleSessionCache(self.sts, client_cache=ClientCache())
+
+        session = cache.session(ROLE_ARN, 'eu-west-1')
+
+        self.assertIs(cache.session(ROLE_ARN, 'eu-west-1'), session)
+        self.assertEqual(session.region_name, 'eu-west-1')
+        self.assertEqual(session.get_credentials().get_frozen_credentials().access_key, 'AKIAROLE00000000')
+        self.assertEqual(
+            cache.session(ROLE_ARN, 'us-east-1').get_credentials().get_frozen_credentials().access_key,
+            'AKIAROLE00000000'
+        )
+        self.assertIs(cache.client('config', ROLE_ARN, 'eu-west-1'), cache.client('config', ROLE_ARN, 'eu-west-1'))
+        self.stubber.assert_no_pending_responses()
+
+    def test_refreshed_before_expiry(self):
+        self.stubber.add_response('assume_role', assume_role_response('AKIAFIRST0000000', 120), self.expected_params)
+        self.stubber.add_response('assume_role', assume_role_response('AKIASECOND000000', 3600), self.expected_params)
+        self.stubber.activate()
+        cache = AssumedRoleSessionCache(self.sts, client_cache=ClientCache())
+
+        credentials = cache.session(ROLE_ARN).get_credentials()
+
+        self.assertEqual(credentials.get_frozen_credentials().access_key, 'AKIASECOND000000')
+        self.assertEqual(credentials.get_frozen_credentials().access_key, 'AKIASECOND000000')
+        self.stubber.assert_no_pending_responses()
+
+    def test_slow_role_does_not_block_others(self):
+        released = threading.Event()
+
+        def assume_role(RoleArn, RoleSessionName, DurationSeconds):
+            if RoleArn == ROLE_ARN:
+                released.wait(5)
+            return assume_role_response('AKIAROLE00000000', 3600)
+
+        sts = MagicMock()
+        sts.assume_role.side_effect = assume_role
+        cache = AssumedRoleSessionCache(sts, client_cache=ClientCache())
+
+        slow = threading.Thread(target=cache.session, args=(ROLE_ARN,))
+        slow.start()
+        try:
+            started = time.time()
+            cache.session('arn:aws:iam::210987654321:role/other')
+            self.assertLess(time.time() - started, 1)
+        finally:
+            released.set()
+            slow.join()
+
+
+class TestExecutionRoleClient(unittest.TestCase):
+    def test_without_role(self):
+        rule = AWSConfigRule()
+
+        with patch('awslambdahelper.get_client') as mock_get_client:
+            self.assertIs(rule.execution_role_client('s3'), mock_get_client.return_value)
+        self.assertIsNone(rule.execution_role_session())
+
+    def test_with_role(self):
+        rule = AWSConfigRule()
+        rule.ASSUMED_ROLE_SESSIONS = MagicMock()
+        rule.execution_role_arn = ROLE_ARN
+
+        client = rule.execution_role_client('s3', 'eu-west-1')
+
+        rule.ASSUMED_ROLE_SESSIONS.client.assert_called_once_with('s3', ROLE_ARN, region_name='eu-west-1')
+        self.assertIs(client, rule.ASSUMED_ROLE_SESSIONS.client.return_value)
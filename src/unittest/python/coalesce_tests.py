@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+from mock import MagicMock
+from awslambdahelper import AWSConfigRule, CompliantEvaluation, NonCompliantEvaluation
+from awslambdahelper.coalesce import EvaluationCoalescer
+
+
+def payload(resource_id, compliance_type, timestamp='2016-07-13T21:50:00.373Z'):
+    return {
+        'ComplianceResourceType': 'AWS::EC2::SecurityGroup',
+        'ComplianceResourceId': resource_id,
+        'ComplianceType': compliance_type,
+        'Annotation': 'Open to the world' if compliance_type == 'NON_COMPLIANT' else 'ok',
+        'OrderingTimestamp': timestamp
+    }
+
+
+class TestEvaluationCoalescer(unittest.TestCase):
+    def test_precedence(self):
+        coalescer = EvaluationCoalescer()
+
+        kept = coalescer.coalesce([
+            payload('sg-1', 'COMPLIANT'),
+            payload('sg-2', 'COMPLIANT'),
+            payload('sg-1', 'NON_COMPLIANT'),
+            payload('sg-1', 'COMPLIANT'),
+        ])
+
+        self.assertEqual(kept, [payload('sg-1', 'NON_COMPLIANT'), payload('sg-2', 'COMPLIANT')])
+        self.assertEqual(coalescer.dropped, 2)
+
+    def test_latest_timestamp_wins(self):
+        kept = EvaluationCoalescer().coalesce([
+            payload('sg-1', 'NON_COMPLIANT', '2016-07-13T21:50:00.373Z'),
+            payload('sg-1', 'COMPLIANT', '2016-07-13T22:50:00.373Z'),
+        ])
+
+        self.assertEqual(kept, [payload('sg-1', 'COMPLIANT', '2016-07-13T22:50:00.373Z')])
+
+    def test_custom_precedence(self):
+        kept = EvaluationCoalescer(precedence=('COMPLIANT', 'NON_COMPLIANT')).coalesce([
+            payload('sg-1', 'NON_COMPLIANT'),
+            payload('sg-1', 'COMPLIANT'),
+        ])
+
+        self.assertEqual(kept, [payload('sg-1', 'COMPLIANT')])
+
+
+class TestCoalescingRule(unittest.TestCase):
+    def test_lambda_handler(self):
+        class MockRelationshipRule(AWSConfigRule):
+            COALESCE_EVALUATIONS = True
+
+            def find_violation_scheduled(self, rule_parameters, accountid):
+                for instance in range(3):
+                    yield CompliantEvaluation(ResourceType="AWS::EC2::SecurityGroup", ResourceId="sg-shared")
+                yield NonCompliantEvaluation("Open to the world", ResourceType="AWS::EC2::SecurityGroup",
+                                             ResourceId="sg-shared")
+
+        rule = MockRelationshipRule()
+        rule.put_evaluations = MagicMock()
+        rule.lambda_handler({
+            "invokingEvent": json.dumps({
+                "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                "messageType": "ScheduledNotification"
+            }),
+            "resultToken": "myResultToken",
+            "accountId": "123456789012"
+        }, None)
+
+        rule.put_evaluations.assert_called_once_with(
+            Evaluations=[payload('sg-shared', 'NON_COMPLIANT')],
+            ResultToken="myResultToken"
+        )
+        self.assertEqual(rule.duplicate_evaluations, 3)
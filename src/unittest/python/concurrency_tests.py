@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+import unittest
+from awslambdahelper.concurrency import imap_unordered
+
+
+class TestImapUnordered(unittest.TestCase):
+    def test_results(self):
+        results = imap_unordered(lambda item: item * 2, range(20), 4)
+
+        self.assertEqual(sorted(results), [item * 2 for item in range(20)])
+
+    def test_bounded(self):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def work(item):
+            with lock:
+                running.append(item)
+                peak.append(len(running))
+            time.sleep(0.005)
+            with lock:
+                running.remove(item)
+            return item
+
+        self.assertEqual(len(list(imap_unordered(work, range(12), 3))), 12)
+        self.assertLessEqual(max(peak), 3)
+
+    def test_error_raised(self):
+        def work(item):
+            if item == 3:
+                raise ValueError(item)
+            return item
+
+        with self.assertRaises(ValueError):
+            list(imap_unordered(work, range(10), 2))
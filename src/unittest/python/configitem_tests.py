@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+import datetime
+import json
+import unittest
+import botocore.exceptions
+from dateutil.tz import tzutc
+from mock import MagicMock, patch
+from awslambdahelper import AWSConfigRule, CompliantEvaluation
+from awslambdahelper.configitem import CONFIGURATION_ITEM_CACHE, ConfigurationItem, convert_api_configuration_item
+
+
+def api_configuration_item():
+    return {
+        "version": "1.3",
+        "accountId": "123456789012",
+        "configurationItemCaptureTime": datetime.datetime(2016, 2, 17, 1, 36, 34, 43000, tzinfo=tzutc()),
+        "configurationItemStatus": "OK",
+        "configurationStateId": "1455672994043",
+        "configurationItemMD5Hash": "",
+        "arn": "arn:aws:ec2:us-east-1:123456789012:security-group/sg-00000000",
+        "resourceType": "AWS::EC2::SecurityGroup",
+        "resourceId": "sg-00000000",
+        "awsRegion": "us-east-1",
+        "tags": {},
+        "relationships": [{
+            "resourceType": "AWS::EC2::VPC",
+            "resourceId": "vpc-00000000",
+            "relationshipName": "Is contained in Vpc"
+        }],
+        "configuration": json.dumps({"groupId": "sg-00000000"})
+    }
+
+
+class TestConvertApiConfigurationItem(unittest.TestCase):
+    def test_convert(self):
+        item = convert_api_configuration_item(api_configuration_item())
+
+        self.assertEqual(item["configurationItemCaptureTime"], "2016-02-17T01:36:34.043Z")
+        self.assertEqual(item["awsAccountId"], "123456789012")
+        self.assertEqual(item["ARN"], "arn:aws:ec2:us-east-1:123456789012:security-group/sg-00000000")
+        self.assertEqual(item["configurationItemVersion"], "1.3")
+        self.assertEqual(item["configuration"], {"groupId": "sg-00000000"})
+        self.assertEqual(item["relationships"][0]["name"], "Is contained in Vpc")
+
+
+class TestOversizedConfigChangeRule(unittest.TestCase):
+    def setUp(self):
+        CONFIGURATION_ITEM_CACHE.clear()
+        self.event = {
+            "invokingEvent": json.dumps({
+                "configurationItemSummary": {
+                    "changeType": "UPDATE",
+                    "configurationItemVersion": "1.2",
+                    "configurationItemCaptureTime": "2016-02-17T01:36:34.043Z",
+                    "configurationStateId": "1455672994043",
+                    "awsAccountId": "123456789012",
+                    "configurationItemStatus": "OK",
+                    "resourceType": "AWS::EC2::SecurityGroup",
+                    "resourceId": "sg-00000000",
+                    "ARN": "arn:aws:ec2:us-east-1:123456789012:security-group/sg-00000000",
+                    "awsRegion": "us-east-1"
+                },
+                "messageType": "OversizedConfigurationItemChangeNotification",
+                "notificationCreationTime": "2016-02-17T01:37:00.000Z",
+                "recordVersion": "1.0"
+            }),
+            "resultToken": "myResultToken",
+            "eventLeftScope": False,
+            "accountId": "123456789012"
+        }
+
+    @patch('awslambdahelper.get_client')
+    def test_oversized_event(self, mock_get_client):
+        seen = []
+
+        class MockConfigRule(AWSConfigRule):
+            APPLICABLE_RESOURCES = ["AWS::EC2::SecurityGroup"]
+
+            def find_violation_config_change(self, config, rule_parameters):
+                seen.append(config)
+                return [CompliantEvaluation()]
+
+        mock_get_client.return_value.get_resource_config_history.return_value = {
+            "configurationItems": [api_configuration_item()]
+        }
+
+        rule = MockConfigRule()
+        rule.put_evaluations = MagicMock()
+        rule.lambda_handler(self.event, None)
+        rule.lambda_handler(self.event, None)
+
+        mock_get_client.return_value.get_resource_config_history.assert_called_once_with(
+            resourceType="AWS::EC2::SecurityGroup",
+            resourceId="sg-00000000",
+            laterTime="2016-02-17T01:36:34.043Z",
+            limit=1
+        )
+        self.assertEqual(seen[0]["configuration"], {"groupId": "sg-00000000"})
+        rule.put_evaluations.assert_called_with(
+            Evaluations=[{
+                "OrderingTimestamp": "2016-02-17T01:36:34.043Z",
+                "ComplianceResourceId": "sg-00000000",
+                "ComplianceResourceType": "AWS::EC2::SecurityGroup",
+                "Annotation": "This resource is compliant with the rule.",
+                "ComplianceType": "COMPLIANT"
+            }],
+            ResultToken="myResultToken"
+        )
+
+    @patch('awslambdahelper.get_client')
+    def test_oversized_event_not_recorded(self, mock_get_client):
+        class MockConfigRule(AWSConfigRule):
+            APPLICABLE_RESOURCES = ["AWS::EC2::SecurityGroup"]
+
+            def find_violation_config_change(self, config, rule_parameters):
+                raise AssertionError("not called")
+
+        mock_get_client.return_value.get_resource_config_history.return_value = {"configurationItems": []}
+
+        rule = MockConfigRule()
+        rule.put_evaluations = MagicMock()
+        with patch('awslambdahelper.logger') as mock_logger:
+            rule.lambda_handler(self.event, None)
+
+        evaluation = rule.put_evaluations.call_args[1]["Evaluations"][0]
+        self.assertEqual(evaluation["ComplianceType"], "NOT_APPLICABLE")
+        self.assertEqual(evaluation["ComplianceResourceId"], "sg-00000000")
+        self.assertEqual(mock_logger.warning.call_count, 1)
+
+    @patch('awslambdahelper.get_client')
+    def test_access_denied_not_retried(self, mock_get_client):
+        mock_get_client.return_value.get_resource_config_history.side_effect = botocore.exceptions.ClientError(
+            {'Error': {'Code': 'AccessDeniedException', 'Message': 'denied'}}, 'GetResourceConfigHistory'
+        )
+
+        rule = AWSConfigRule(["AWS::EC2::SecurityGroup"])
+        rule.put_evaluations = MagicMock()
+
+        with self.assertRaises(botocore.exceptions.ClientError):
+            rule.lambda_handler(self.event, None)
+        self.assertEqual(mock_get_client.return_value.get_resource_config_history.call_count, 1)
+
+
+class TestConfigurationItem(unittest.TestCase):
+    def item(self):
+        return ConfigurationItem({
+            "resourceType": "AWS::EC2::Instance",
+            "resourceId": "i-00000000",
+            "tags": {"Name": "web"},
+            "relationships": [
+                {"resourceType": "AWS::EC2::VPC", "resourceId": "vpc-00000000", "name": "Is contained in Vpc"},
+                {"resourceType": "AWS::EC2::Volume", "resourceId": "vol-00000001", "name": "Is attached to Volume"},
+                {"resourceType": "AWS::EC2::Volume", "resourceId": "vol-00000002", "name": "Is attached to Volume"},
+            ],
+            "configuration": json.dumps({"tags": [{"key": "Owner", "value": "ops"}]}),
+            "supplementaryConfiguration": {"BucketPolicy": json.dumps({"policyText": None}), "Other": "plain"}
+        })
+
+    def test_dict_compatible(self):
+        item = self.item()
+
+        self.assertIsInstance(item, dict)
+        self.assertEqual(item["resourceId"], "i-00000000")
+        self.assertEqual(item.get("missing", "default"), "default")
+        self.assertEqual(dict(item.items())["configuration"], {"tags": [{"key": "Owner", "value": "ops"}]})
+
+    def test_lazy_decoding(self):
+        item = self.item()
+        loads = MagicMock(side_effect=json.loads)
+
+        with patch('awslambdahelper.configitem.get_decoder', return_value=loads):
+            item["resourceId"]
+            loads.assert_not_called()
+
+            self.assertEqual(item["configuration"]["tags"][0]["value"], "ops")
+            self.assertEqual(item.get("configuration")["tags"][0]["key"], "Owner")
+            self.assertEqual(loads.call_count, 1)
+
+            self.assertEqual(item["supplementaryConfiguration"]["BucketPolicy"], {"policyText": None})
+            self.assertEqual(item["supplementaryConfiguration"]["Other"], "plain")
+            self.assertEqual(loads.call_count, 2)
+
+    def test_relationships(self):
+        item = self.item()
+
+        self.assertEqual(
+            [relationship["resourceId"] for relationship in item.relationships_by_type("AWS::EC2::Volume")],
+            ["vol-00000001", "vol-00000002"]
+        )
+        self.assertEqual(item.relationships_by_type("AWS::S3::Bucket"), [])
+        self.assertEqual(item.relationship_to("vpc-00000000")["resourceType"], "AWS::EC2::VPC")
+        self.assertIsNone(item.relationship_to("vpc-11111111"))
+        self.assertEqual(len(item.relationships_named("Is attached to Volume")), 2)
+
+    def test_tags(self):
+        item = self.item()
+
+        self.assertEqual(item.tag("Name"), "web")
+        self.assertEqual(item.tag("Owner"), "ops")
+        self.assertEqual(item.tag("Missing", "none"), "none")
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import json
 import unittest
 from mock import MagicMock
 from awslambdahelper import AWSConfigRule
@@ -56,4 +57,69 @@ class ConfigRuleTests(unittest.TestCase):
         self.assertEqual(
             rule._aws_call(callable_payload),
             'TestResponse'
-        )
\ No newline at end of file
+        )
+
+
+class WarmStartTests(unittest.TestCase):
+    def setUp(self):
+        self.event = {
+            "invokingEvent": json.dumps({
+                "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                "messageType": "ScheduledNotification"
+            }),
+            "ruleParameters": json.dumps({"maxAge": "90"}),
+            "resultToken": "myResultToken",
+            "accountId": "123456789012"
+        }
+
+    def test_handler_reuses_instance(self):
+        instances = []
+
+        class MockWarmRule(AWSConfigRule):
+            def find_violation_scheduled(self, rule_parameters, accountid):
+                instances.append(self)
+                return []
+
+        MockWarmRule.handler(self.event, None)
+        MockWarmRule.handler(self.event, None)
+
+        self.assertIs(instances[0], instances[1])
+
+    def test_setup_runs_once_per_parameters(self):
+        setups = []
+
+        class MockSetupRule(AWSConfigRule):
+            def setup(self, rule_parameters):
+                setups.append(rule_parameters)
+                self.max_age = int(rule_parameters["maxAge"])
+
+            def find_violation_scheduled(self, rule_parameters, accountid):
+                return []
+
+        rule = MockSetupRule()
+        rule.lambda_handler(self.event, None)
+        rule.lambda_handler(self.event, None)
+        self.assertEqual(setups, [{"maxAge": "90"}])
+        self.assertEqual(rule.max_age, 90)
+
+        rule.lambda_handler(dict(self.event, ruleParameters=json.dumps({"maxAge": "30"})), None)
+        self.assertEqual(len(setups), 2)
+        self.assertEqual(rule.max_age, 30)
+
+    def test_parse_rule_parameters_cached(self):
+        raw = json.dumps({"cached": "parameters"})
+        loads = MagicMock(side_effect=json.loads)
+
+        self.assertEqual(AWSConfigRule.parse_rule_parameters(raw, loads), {"cached": "parameters"})
+        self.assertEqual(AWSConfigRule.parse_rule_parameters(raw, loads), {"cached": "parameters"})
+        self.assertEqual(loads.call_count, 1)
+        self.assertEqual(AWSConfigRule.parse_rule_parameters(None), {})
+
+    def test_parse_rule_parameters_copied(self):
+        raw = json.dumps({"maxAge": "90"})
+
+        rule_parameters = AWSConfigRule.parse_rule_parameters(raw)
+        rule_parameters.pop("maxAge")
+        rule_parameters.setdefault("filled", "default")
+
+        self.assertEqual(AWSConfigRule.parse_rule_parameters(raw), {"maxAge": "90"})
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import time
+import unittest
+from mock import MagicMock, patch
+from awslambdahelper import AWSConfigRule, CompliantEvaluation, LocalReinvoker
+from awslambdahelper.deadline import Deadline, LambdaReinvoker
+
+
+class CountdownContext(object):
+    """
+    Lambda context whose remaining time drops by `step` milliseconds every time it is checked.
+    """
+
+    invoked_function_arn = 'arn:aws:lambda:us-east-1:123456789012:function:my-rule'
+
+    def __init__(self, remaining, step):
+        self.remaining = remaining
+        self.step = step
+
+    def get_remaining_time_in_millis(self):
+        self.remaining -= self.step
+        return self.remaining
+
+
+class TestDeadline(unittest.TestCase):
+    def test_disabled(self):
+        self.assertIsNone(Deadline.from_context(CountdownContext(1000, 1), None))
+        self.assertIsNone(Deadline.from_context(None, 1000))
+
+    def test_iterate_stops_at_margin(self):
+        deadline = Deadline(CountdownContext(1000, 100), 500)
+
+        self.assertEqual(list(deadline.iterate(range(10))), [0, 1, 2, 3, 4])
+        self.assertTrue(deadline.reached)
+
+    def test_iterate_exhausted(self):
+        deadline = Deadline(CountdownContext(100000, 1), 500)
+
+        self.assertEqual(list(deadline.iterate(range(10))), list(range(10)))
+        self.assertFalse(deadline.reached)
+
+    @patch('awslambdahelper.deadline.get_client')
+    def test_lambda_reinvoker(self, mock_get_client):
+        LambdaReinvoker()({'continuationCursor': 3}, CountdownContext(0, 0))
+
+        mock_get_client.return_value.invoke.assert_called_once_with(
+            FunctionName='arn:aws:lambda:us-east-1:123456789012:function:my-rule',
+            InvocationType='Event',
+            Payload=json.dumps({'continuationCursor': 3})
+        )
+
+
+class TestDeadlineRule(unittest.TestCase):
+    def test_continuation(self):
+        reinvoker = LocalReinvoker()
+        sent = []
+
+        class MockPagedRule(AWSConfigRule):
+            DEADLINE_SAFETY_MARGIN_MS = 500
+            REINVOKER = reinvoker
+
+            def find_violation_scheduled(self, rule_parameters, accountid):
+                for page in range(self.resume_cursor or 0, 10):
+                    for i in range(10):
+                        yield CompliantEvaluation(
+                            ResourceType="AWS::EC2::Instance",
+                            ResourceId="i-%d-%d" % (page, i)
+                        )
+                    self.checkpoint(page + 1)
+
+        rule = MockPagedRule()
+        rule.put_evaluations = MagicMock(side_effect=lambda **kwargs: sent.extend(kwargs['Evaluations']))
+        event = {
+            "invokingEvent": json.dumps({
+                "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                "messageType": "ScheduledNotification"
+            }),
+            "resultToken": "myResultToken",
+            "accountId": "123456789012"
+        }
+
+        # Enough time for 35 evaluations per invocation.
+        rule.lambda_handler(event, CountdownContext(4000, 100))
+        self.assertEqual(len(sent), 35)
+        self.assertEqual(reinvoker.events[0]['continuationCursor'], 3)
+
+        invocations = reinvoker.run(rule.lambda_handler, None)
+
+        self.assertEqual(invocations, 1)
+        self.assertEqual(
+            set(evaluation['ComplianceResourceId'] for evaluation in sent),
+            set("i-%d-%d" % (page, i) for page in range(10) for i in range(10))
+        )
+
+    def scheduled_event(self):
+        return {
+            "invokingEvent": json.dumps({
+                "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                "messageType": "ScheduledNotification"
+            }),
+            "resultToken": "myResultToken",
+            "accountId": "123456789012"
+        }
+
+    def test_no_checkpoint_warns(self):
+        reinvoker = LocalReinvoker()
+
+        class MockGeneratorRule(AWSConfigRule):
+            DEADLINE_SAFETY_MARGIN_MS = 500
+            REINVOKER = reinvoker
+
+            def find_violation_scheduled(self, rule_parameters, accountid):
+                for i in range(100):
+                    yield CompliantEvaluation(ResourceType="AWS::EC2::Instance", ResourceId="i-%d" % i)
+
+        rule = MockGeneratorRule()
+        rule.put_evaluations = MagicMock()
+
+        with patch('awslambdahelper.logger') as mock_logger:
+            rule.lambda_handler(self.scheduled_event(), CountdownContext(4000, 100))
+
+        self.assertEqual(len(rule.put_evaluations.call_args[1]['Evaluations']), 35)
+        self.assertEqual(reinvoker.events, [])
+        self.assertEqual(mock_logger.warning.call_count, 1)
+
+    def test_list_is_sent_in_full(self):
+        reinvoker = LocalReinvoker()
+
+        class MockListRule(AWSConfigRule):
+            DEADLINE_SAFETY_MARGIN_MS = 500
+            REINVOKER = reinvoker
+
+            def find_violation_scheduled(self, rule_parameters, accountid):
+                evaluations = []
+                for page in range(3):
+                    for i in range(100):
+                        evaluations.append(CompliantEvaluation(
+                            ResourceType="AWS::EC2::Instance",
+                            ResourceId="i-%d-%d" % (page, i)
+                        ))
+                    self.checkpoint(page + 1)
+                return evaluations
+
+        rule = MockListRule()
+        rule.put_evaluations = MagicMock()
+
+        rule.lambda_handler(self.scheduled_event(), CountdownContext(4000, 100))
+
+        sent = [
+            evaluation for _, kwargs in rule.put_evaluations.call_args_list for evaluation in kwargs['Evaluations']
+        ]
+        self.assertEqual(len(sent), 300)
+        self.assertEqual(reinvoker.events, [])
+
+    def test_sharded_rule_returns_at_deadline(self):
+        released = threading.Event()
+
+        class MockShardedRule(AWSConfigRule):
+            DEADLINE_SAFETY_MARGIN_MS = 500
+            REINVOKER = LocalReinvoker()
+            MAX_SHARD_WORKERS = 2
+
+            def shards_scheduled(self, rule_parameters, accountid):
+                return [0, 1]
+
+            def find_violation_scheduled_shard(self, rule_parameters, accountid, shard):
+                if shard == 1:
+                    released.wait(5)
+                return [
+                    CompliantEvaluation(ResourceType="AWS::EC2::Instance", ResourceId="i-%d-%d" % (shard, i))
+                    for i in range(10)
+                ]
+
+        rule = MockShardedRule()
+        rule.put_evaluations = MagicMock()
+
+        started = time.time()
+        try:
+            with patch('awslambdahelper.logger'):
+                rule.lambda_handler(self.scheduled_event(), CountdownContext(1000, 100))
+            elapsed = time.time() - started
+        finally:
+            released.set()
+
+        # Shard 1 is still running when the deadline is reached, and is not waited for.
+        self.assertLess(elapsed, 1)
+        self.assertLess(len(rule.put_evaluations.call_args[1]['Evaluations']), 10)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import sys
+import unittest
+from awslambdahelper import AWSConfigRule, RuleDispatcher, UnknownRuleError
+from awslambdahelper.dispatch import load_rule_class
+
+HANDLED = []
+
+
+class RecordingRule(AWSConfigRule):
+    def lambda_handler(self, event, context):
+        HANDLED.append((type(self).__name__, event["configRuleName"]))
+
+
+class VolumesRule(RecordingRule):
+    pass
+
+
+class BucketsRule(RecordingRule):
+    pass
+
+
+def event(name, arn=None):
+    return {
+        "configRuleName": name,
+        "configRuleArn": arn or "arn:aws:config:eu-west-1:123456789012:config-rule/config-rule-" + name,
+    }
+
+
+class TestRuleDispatcher(unittest.TestCase):
+    def setUp(self):
+        del HANDLED[:]
+
+    def test_routes_by_name_and_arn(self):
+        dispatcher = RuleDispatcher({
+            "volumes": VolumesRule,
+            "arn:aws:config:eu-west-1:123456789012:config-rule/config-rule-abc": BucketsRule,
+        })
+
+        dispatcher.handler(event("volumes"), None)
+        dispatcher.handler(event("renamed", "arn:aws:config:eu-west-1:123456789012:config-rule/config-rule-abc"), None)
+
+        self.assertEqual(HANDLED, [("VolumesRule", "volumes"), ("BucketsRule", "renamed")])
+
+    def test_lazy_import(self):
+        dispatcher = RuleDispatcher({"volumes": "dispatch_tests:VolumesRule"})
+
+        self.assertIs(dispatcher.rule_class(event("volumes")), VolumesRule)
+        self.assertIs(dispatcher._rules["volumes"], VolumesRule)
+
+    def test_not_imported_until_used(self):
+        dispatcher = RuleDispatcher({"missing": "not_a_rule_module:MissingRule", "volumes": VolumesRule})
+
+        dispatcher.handler(event("volumes"), None)
+
+        self.assertNotIn("not_a_rule_module", sys.modules)
+        self.assertRaises(ImportError, dispatcher.handler, event("missing"), None)
+
+    def test_decorator(self):
+        dispatcher = RuleDispatcher()
+
+        @dispatcher.register("decorated")
+        class DecoratedRule(RecordingRule):
+            pass
+
+        dispatcher.handler(event("decorated"), None)
+
+        self.assertEqual(HANDLED, [("DecoratedRule", "decorated")])
+
+    def test_unknown_rule(self):
+        self.assertRaises(UnknownRuleError, RuleDispatcher({"volumes": VolumesRule}).handler, event("other"), None)
+
+    def test_default(self):
+        RuleDispatcher({"volumes": VolumesRule}, default="dispatch_tests.BucketsRule").handler(event("other"), None)
+
+        self.assertEqual(HANDLED, [("BucketsRule", "other")])
+
+    def test_load_rule_class(self):
+        self.assertIs(load_rule_class("dispatch_tests:VolumesRule"), VolumesRule)
+        self.assertIs(load_rule_class("dispatch_tests.VolumesRule"), VolumesRule)
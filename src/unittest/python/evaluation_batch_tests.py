@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+from mock import MagicMock
+from awslambdahelper import AWSConfigEvaluation, AWSConfigRule, EvaluationBatch, NonCompliantEvaluation
+
+
+class TestEvaluationBatch(unittest.TestCase):
+    def test_to_dicts(self):
+        batch = EvaluationBatch()
+        batch.add(AWSConfigEvaluation.TYPE_COMPLIANT, 'ok', 'AWS::EC2::Volume', 'vol-1')
+        batch.append(NonCompliantEvaluation('bad', ResourceType='AWS::S3::Bucket', ResourceId='my-bucket',
+                                            OrderingTimestamp='own-timestamp'))
+
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(list(batch.to_dicts(OrderingTimestamp='shared-timestamp')), [{
+            'ComplianceType': 'COMPLIANT',
+            'Annotation': 'ok',
+            'ComplianceResourceType': 'AWS::EC2::Volume',
+            'ComplianceResourceId': 'vol-1',
+            'OrderingTimestamp': 'shared-timestamp'
+        }, {
+            'ComplianceType': 'NON_COMPLIANT',
+            'Annotation': 'bad',
+            'ComplianceResourceType': 'AWS::S3::Bucket',
+            'ComplianceResourceId': 'my-bucket',
+            'OrderingTimestamp': 'shared-timestamp'
+        }])
+
+    def test_shared_timestamp(self):
+        batch = EvaluationBatch()
+        batch.add(AWSConfigEvaluation.TYPE_COMPLIANT, 'ok', 'AWS::EC2::Volume', 'vol-1')
+        batch.add(AWSConfigEvaluation.TYPE_COMPLIANT, 'ok', 'AWS::EC2::Volume', 'vol-2')
+        batch.add(AWSConfigEvaluation.TYPE_COMPLIANT, 'ok', 'AWS::EC2::Volume', 'vol-3', OrderingTimestamp='own')
+
+        timestamps = [payload['OrderingTimestamp'] for payload in batch.to_dicts()]
+
+        self.assertEqual(timestamps[0], timestamps[1])
+        self.assertRegexpMatches(timestamps[0], r"\d{4}-\d{2}-\d{2}T\d{2}\:\d{2}\:\d{2}\.\d+Z")
+        self.assertEqual(timestamps[2], 'own')
+
+    def test_chunks(self):
+        batch = EvaluationBatch()
+        for i in range(250):
+            batch.add(AWSConfigEvaluation.TYPE_COMPLIANT, 'ok', 'AWS::EC2::Volume', 'vol-%d' % i)
+
+        self.assertEqual([len(chunk) for chunk in batch.chunks()], [100, 100, 50])
+
+    def test_iter(self):
+        batch = EvaluationBatch()
+        batch.add(AWSConfigEvaluation.TYPE_NOT_APPLICABLE, 'n/a', 'AWS::EC2::Volume', 'vol-1')
+
+        evaluation = list(batch)[0]
+
+        self.assertIsInstance(evaluation, AWSConfigEvaluation)
+        self.assertEqual(evaluation.ComplianceType, AWSConfigEvaluation.TYPE_NOT_APPLICABLE)
+        self.assertEqual(evaluation.ComplianceResourceId, 'vol-1')
+
+    def test_rule_returns_batch(self):
+        class MockBatchRule(AWSConfigRule):
+            def find_violation_scheduled(self, rule_parameters, accountid):
+                batch = EvaluationBatch()
+                for i in range(150):
+                    batch.add(AWSConfigEvaluation.TYPE_COMPLIANT, 'ok', 'AWS::EC2::Volume', 'vol-%d' % i)
+                return batch
+
+        rule = MockBatchRule()
+        rule.put_evaluations = MagicMock()
+        rule.lambda_handler({
+            "invokingEvent": json.dumps({
+                "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                "messageType": "ScheduledNotification"
+            }),
+            "resultToken": "myResultToken",
+            "accountId": "123456789012"
+        }, None)
+
+        self.assertEqual(rule.put_evaluations.call_count, 2)
+        self.assertEqual(
+            rule.put_evaluations.call_args_list[0][1]['Evaluations'][0]['OrderingTimestamp'],
+            "2016-07-13T21:50:00.373Z"
+        )
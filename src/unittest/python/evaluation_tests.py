@@ -55,3 +55,16 @@ class TestEvaluations(unittest.TestCase):
             'ComplianceType': 'NON_COMPLIANT',
             'OrderingTimestamp': 'my-timestamp'
         })
+
+    def test_slots(self):
+        evaluation = NonCompliantEvaluation(Annotation='debug')
+
+        self.assertFalse(hasattr(evaluation, '__dict__'))
+        with self.assertRaises(AttributeError):
+            evaluation.Unknown = 'value'
+
+    def test_interned_resource_type(self):
+        first = NonCompliantEvaluation(Annotation='debug', ResourceType=u''.join([u'AWS::EC2::', u'Volume']))
+        second = NonCompliantEvaluation(Annotation='debug').set(ResourceType=u''.join([u'AWS::EC2::', u'Volume']))
+
+        self.assertIs(first.ComplianceResourceType, second.ComplianceResourceType)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import gc
+import time
+import unittest
+from mock import MagicMock, patch
+from awslambdahelper import AWSConfigRule
+from awslambdahelper.inventory import PrefetchingIterator, paginate
+
+
+class TestPrefetchingIterator(unittest.TestCase):
+    def test_items(self):
+        pages = [[1, 2], [], [3], [4, 5, 6]]
+
+        self.assertEqual(list(PrefetchingIterator(pages)), [1, 2, 3, 4, 5, 6])
+
+    def test_backpressure(self):
+        fetched = []
+
+        def pages():
+            for page in range(10):
+                fetched.append(page)
+                yield [page]
+
+        iterator = PrefetchingIterator(pages(), prefetch=2)
+        self.assertEqual(next(iterator), 0)
+        time.sleep(0.2)
+
+        # One page consumed, two queued, and one more waiting to be queued.
+        self.assertLessEqual(len(fetched), 4)
+        iterator.close()
+
+    def test_abandoned_iterator_stops_fetching(self):
+        def pages():
+            while True:
+                yield [1]
+
+        iterator = PrefetchingIterator(pages())
+        thread = iterator._thread
+        self.assertEqual(next(iterator), 1)
+
+        del iterator
+        gc.collect()
+        thread.join(1)
+
+        self.assertFalse(thread.is_alive())
+
+    def test_error_raised(self):
+        def pages():
+            yield [1]
+            raise ValueError("page fetch failed")
+
+        iterator = PrefetchingIterator(pages())
+
+        self.assertEqual(next(iterator), 1)
+        with self.assertRaises(ValueError):
+            next(iterator)
+
+    def test_paginate(self):
+        client = MagicMock()
+        client.get_paginator.return_value.paginate.return_value = [
+            {'resourceIdentifiers': [{'resourceId': 'i-1'}]},
+            {}
+        ]
+
+        pages = list(paginate(client, 'list_discovered_resources', 'resourceIdentifiers', resourceType='x'))
+
+        self.assertEqual(pages, [[{'resourceId': 'i-1'}], []])
+        client.get_paginator.assert_called_once_with('list_discovered_resources')
+        client.get_paginator.return_value.paginate.assert_called_once_with(resourceType='x')
+
+
+class TestRuleInventory(unittest.TestCase):
+    @patch('awslambdahelper.get_client')
+    def test_discovered_resources(self, mock_get_client):
+        mock_get_client.return_value.get_paginator.return_value.paginate.return_value = [
+            {'resourceIdentifiers': [{'resourceId': 'i-1'}, {'resourceId': 'i-2'}]},
+            {'resourceIdentifiers': [{'resourceId': 'i-3'}]}
+        ]
+
+        resources = AWSConfigRule().discovered_resources("AWS::EC2::Instance")
+
+        self.assertEqual([resource['resourceId'] for resource in resources], ['i-1', 'i-2', 'i-3'])
+        mock_get_client.assert_called_once_with("config")
+        mock_get_client.return_value.get_paginator.return_value.paginate.assert_called_once_with(
+            resourceType="AWS::EC2::Instance"
+        )
+
+    @patch('awslambdahelper.get_client')
+    def test_inventory_closed_when_abandoned(self, mock_get_client):
+        mock_get_client.return_value.get_paginator.return_value.paginate.return_value = (
+            {'Reservations': [i]} for i in range(1000)
+        )
+
+        with patch('awslambdahelper.PrefetchingIterator.close') as mock_close:
+            inventory = AWSConfigRule().inventory("ec2", "describe_instances", "Reservations")
+            self.assertEqual(next(inventory), 0)
+            inventory.close()
+
+        mock_close.assert_called_once_with()
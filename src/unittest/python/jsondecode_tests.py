@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+from mock import MagicMock, patch
+from awslambdahelper import AWSConfigRule, CompliantEvaluation
+from awslambdahelper.jsondecode import available_backends, get_decoder, register_decoder
+
+
+class TestGetDecoder(unittest.TestCase):
+    def test_stdlib(self):
+        self.assertIs(get_decoder("json"), json.loads)
+        self.assertIn("json", available_backends())
+
+    def test_missing(self):
+        self.assertRaises(ImportError, get_decoder, "not_a_json_module")
+
+    def test_default_preference(self):
+        with patch('awslambdahelper.jsondecode.PREFERRED_BACKENDS', ("not_a_json_module", "json")), \
+                patch('awslambdahelper.jsondecode._DEFAULT', []):
+            self.assertIs(get_decoder(), json.loads)
+
+    def test_default_decodes(self):
+        self.assertEqual(get_decoder()('{"a": [1, "b"]}'), {"a": [1, "b"]})
+
+    def test_registered(self):
+        loads = MagicMock(return_value={})
+        register_decoder("mock_json", loads)
+
+        self.assertIs(get_decoder("mock_json"), loads)
+        self.assertIn("mock_json", available_backends())
+
+
+class TestRuleJSONBackend(unittest.TestCase):
+    def test_lambda_handler(self):
+        loads = MagicMock(side_effect=json.loads)
+        register_decoder("counting_json", loads)
+
+        class MockRule(AWSConfigRule):
+            JSON_BACKEND = "counting_json"
+
+            def find_violation_scheduled(self, rule_parameters, accountid):
+                return [CompliantEvaluation(ResourceType="AWS::::Account", ResourceId=accountid)]
+
+        rule = MockRule()
+        rule.put_evaluations = MagicMock()
+        rule.lambda_handler({
+            "invokingEvent": json.dumps({
+                "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                "messageType": "ScheduledNotification"
+            }),
+            "ruleParameters": json.dumps({"jsonBackendTest": True}),
+            "resultToken": "myResultToken",
+            "accountId": "123456789012"
+        }, None)
+
+        self.assertEqual(loads.call_count, 2)
+        rule.put_evaluations.assert_called_once()
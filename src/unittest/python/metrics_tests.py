@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+from mock import MagicMock, patch
+from awslambdahelper import AWSConfigRule, CompliantEvaluation, NonCompliantEvaluation
+from awslambdahelper.metrics import NULL_METRICS, Metrics
+
+
+class TestMetrics(unittest.TestCase):
+    @patch("awslambdahelper.metrics.time.time")
+    def test_nested_timers_are_exclusive(self, mock_time):
+        mock_time.side_effect = [0.0, 1.0, 3.0, 4.0]
+        metrics = Metrics()
+
+        with metrics.timer("Serialise"):
+            with metrics.timer("Evaluate"):
+                pass
+
+        self.assertEqual(metrics.get("EvaluateTime"), 2000)
+        self.assertEqual(metrics.get("SerialiseTime"), 2000)
+
+    def test_timed_counts_items(self):
+        metrics = Metrics()
+
+        self.assertEqual(list(metrics.timed("Evaluate", [1, 2, 3], counter="Evaluations")), [1, 2, 3])
+        self.assertEqual(metrics.get("Evaluations"), 3)
+
+    def test_record(self):
+        metrics = Metrics("MyNamespace")
+        metrics.add("Chunks", 2)
+
+        record = metrics.record({"Rule": "MyRule"})
+
+        self.assertEqual(record["Rule"], "MyRule")
+        self.assertEqual(record["Chunks"], 2)
+        self.assertEqual(record["_aws"]["CloudWatchMetrics"], [{
+            "Namespace": "MyNamespace",
+            "Dimensions": [["Rule"]],
+            "Metrics": [{"Name": "Chunks", "Unit": "Count"}]
+        }])
+
+    def test_null_metrics(self):
+        items = [1, 2]
+        function = MagicMock()
+
+        self.assertIs(NULL_METRICS.timed("Evaluate", items), items)
+        self.assertIs(NULL_METRICS.timed_call("PutEvaluations", function), function)
+
+
+class MetricsRule(AWSConfigRule):
+    APPLICABLE_RESOURCES = ["AWS::EC2::Instance"]
+    METRICS_SINK = MagicMock()
+
+    def find_violation_config_change(self, rule_parameters, config):
+        yield CompliantEvaluation()
+        yield NonCompliantEvaluation("bad")
+
+
+class TestRuleMetrics(unittest.TestCase):
+    def test_lambda_handler(self):
+        rule = MetricsRule()
+        rule.put_evaluations = MagicMock()
+
+        rule.lambda_handler({
+            "invokingEvent": json.dumps({
+                "configurationItem": {
+                    "resourceType": "AWS::EC2::Instance",
+                    "resourceId": "i-1",
+                    "configurationItemCaptureTime": "2016-07-13T21:50:00.373Z"
+                },
+                "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                "messageType": "ConfigurationItemChangeNotification"
+            }),
+            "resultToken": "myResultToken",
+            "eventLeftScope": False,
+            "accountId": "123456789012"
+        }, None)
+
+        record = MetricsRule.METRICS_SINK.call_args[0][0]
+
+        self.assertEqual(rule.put_evaluations.call_count, 1)
+        self.assertEqual(record["Rule"], "MetricsRule")
+        self.assertEqual(record["Evaluations"], 2)
+        self.assertEqual(record["Chunks"], 1)
+        self.assertEqual(record["Retries"], 0)
+        for name in ("DecodeTime", "EvaluateTime", "SerialiseTime", "PutEvaluationsTime"):
+            self.assertIn(name, record)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+from mock import MagicMock
+from awslambdahelper import AWSConfigRule, CompliantEvaluation, NonCompliantEvaluation
+from awslambdahelper.resourcetypes import ResourceTypeTable, handler_name
+
+
+class TestResourceTypeTable(unittest.TestCase):
+    def test_handler_name(self):
+        self.assertEqual(handler_name("AWS::EC2::Instance"), "evaluate_AWS_EC2_Instance")
+
+    def test_exact_and_wildcard(self):
+        table = ResourceTypeTable(["AWS::S3::Bucket", "AWS::EC2::*"], ["evaluate_AWS_EC2_Instance"])
+
+        self.assertEqual(table.handler("AWS::EC2::Instance"), "evaluate_AWS_EC2_Instance")
+        self.assertEqual(table.handler("AWS::EC2::Volume"), "find_violation_config_change")
+        self.assertEqual(table.handler("AWS::S3::Bucket"), "find_violation_config_change")
+        self.assertIsNone(table.handler("AWS::IAM::Role"))
+        self.assertIsNone(table.handler("AWS::EC2"))
+
+    def test_for_rule(self):
+        class MockRule(AWSConfigRule):
+            def evaluate_AWS_EC2_Instance(self, rule_parameters, config):
+                pass
+
+        table = ResourceTypeTable.for_rule(MockRule, ["AWS::EC2::*"])
+
+        self.assertIs(ResourceTypeTable.for_rule(MockRule, ["AWS::EC2::*"]), table)
+        self.assertIsNot(ResourceTypeTable.for_rule(MockRule, ["AWS::EC2::Instance"]), table)
+        self.assertEqual(table.handler("AWS::EC2::Instance"), "evaluate_AWS_EC2_Instance")
+
+
+class TestPerTypeRule(unittest.TestCase):
+    def test_lambda_handler(self):
+        class MockPerTypeRule(AWSConfigRule):
+            APPLICABLE_RESOURCES = ["AWS::EC2::*"]
+
+            def evaluate_AWS_EC2_Instance(self, rule_parameters, config):
+                return [NonCompliantEvaluation("instance")]
+
+            def find_violation_config_change(self, rule_parameters, config):
+                return [CompliantEvaluation()]
+
+        def event(resource_type):
+            return {
+                "invokingEvent": json.dumps({
+                    "configurationItem": {
+                        "resourceType": resource_type,
+                        "resourceId": "id-1",
+                        "configurationItemCaptureTime": "2016-07-13T21:50:00.373Z"
+                    },
+                    "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                    "messageType": "ConfigurationItemChangeNotification"
+                }),
+                "resultToken": "myResultToken",
+                "eventLeftScope": False,
+                "accountId": "123456789012"
+            }
+
+        rule = MockPerTypeRule()
+        rule.put_evaluations = MagicMock()
+
+        compliance = []
+        for resource_type in ("AWS::EC2::Instance", "AWS::EC2::Volume", "AWS::S3::Bucket"):
+            rule.lambda_handler(event(resource_type), None)
+            compliance.append(rule.put_evaluations.call_args[1]['Evaluations'][0]['ComplianceType'])
+
+        self.assertEqual(compliance, ['NON_COMPLIANT', 'COMPLIANT', 'NOT_APPLICABLE'])
+
+    def test_replaced_applicable_resources(self):
+        rule = AWSConfigRule(["AWS::EC2::Instance"])
+        self.assertIsNone(rule.resource_type_table.handler("AWS::S3::Bucket"))
+
+        rule.applicable_resources = ["AWS::S3::Bucket"]
+        self.assertEqual(rule.resource_type_table.handler("AWS::S3::Bucket"), "find_violation_config_change")
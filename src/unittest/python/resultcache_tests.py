@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from mock import MagicMock, patch
+from awslambdahelper import AWSConfigRule, CompliantEvaluation, NonCompliantEvaluation
+from awslambdahelper.cache import LRUCache
+from awslambdahelper.resultcache import EvaluationResultCache, SQLiteResultStore, configuration_state_key
+
+
+def configuration_item(state_id='1', ip_permissions=None, tags=None):
+    return {
+        "resourceType": "AWS::EC2::SecurityGroup",
+        "resourceId": "sg-1",
+        "configurationStateId": state_id,
+        "configurationItemCaptureTime": "2016-07-13T21:50:00.373Z",
+        "configuration": {"ipPermissions": ip_permissions or []},
+        "tags": tags or {}
+    }
+
+
+class TestConfigurationStateKey(unittest.TestCase):
+    def test_state_id(self):
+        self.assertEqual(configuration_state_key(configuration_item('7')), '7')
+
+    def test_fields(self):
+        fields = ["configuration.ipPermissions", "configuration.missing.deeper"]
+
+        self.assertEqual(
+            configuration_state_key(configuration_item('1', tags={'a': 'b'}), fields),
+            configuration_state_key(configuration_item('2'), fields)
+        )
+        self.assertNotEqual(
+            configuration_state_key(configuration_item('1'), fields),
+            configuration_state_key(configuration_item('1', ip_permissions=[{'fromPort': 22}]), fields)
+        )
+
+
+class TestEvaluationResultCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_persistent(self):
+        path = os.path.join(self.directory, 'results.db')
+        key = EvaluationResultCache.key('my-rule', configuration_item(), {'port': 22})
+        EvaluationResultCache(LRUCache(4), SQLiteResultStore(path)).put(
+            key, [NonCompliantEvaluation("open", ResourceType="AWS::EC2::SecurityGroup", ResourceId="sg-1")]
+        )
+
+        memory = LRUCache(4)
+        evaluations = EvaluationResultCache(memory, SQLiteResultStore(path)).get(key)
+
+        self.assertEqual(len(evaluations), 1)
+        self.assertEqual(evaluations[0].ComplianceType, 'NON_COMPLIANT')
+        self.assertEqual(evaluations[0].Annotation, 'open')
+        self.assertEqual(evaluations[0].ComplianceResourceId, 'sg-1')
+        self.assertIn(key, memory)
+
+    def test_parameters_in_key(self):
+        self.assertNotEqual(
+            EvaluationResultCache.key('my-rule', configuration_item(), {'port': 22}),
+            EvaluationResultCache.key('my-rule', configuration_item(), {'port': 80})
+        )
+
+
+class TestCachedRule(unittest.TestCase):
+    @patch('awslambdahelper.EVALUATION_CACHE', LRUCache(16))
+    def test_lambda_handler(self):
+        calls = []
+
+        class MockCachedRule(AWSConfigRule):
+            APPLICABLE_RESOURCES = ["AWS::EC2::SecurityGroup"]
+            CACHE_EVALUATIONS = True
+            CACHE_CONFIGURATION_FIELDS = ["configuration.ipPermissions"]
+
+            def find_violation_config_change(self, rule_parameters, config):
+                calls.append(config["configurationStateId"])
+                yield CompliantEvaluation()
+
+        def event(item):
+            return {
+                "invokingEvent": json.dumps({
+                    "configurationItem": item,
+                    "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                    "messageType": "ConfigurationItemChangeNotification"
+                }),
+                "ruleParameters": json.dumps({"port": "22"}),
+                "resultToken": "myResultToken",
+                "eventLeftScope": False,
+                "accountId": "123456789012"
+            }
+
+        rule = MockCachedRule()
+        rule.put_evaluations = MagicMock()
+
+        rule.lambda_handler(event(configuration_item('1')), None)
+        rule.lambda_handler(event(configuration_item('2', tags={'a': 'b'})), None)
+        rule.lambda_handler(event(configuration_item('3', ip_permissions=[{'fromPort': 22}])), None)
+
+        self.assertEqual(calls, ['1', '3'])
+        self.assertEqual(rule.put_evaluations.call_count, 3)
+        self.assertEqual(
+            rule.put_evaluations.call_args_list[1][1]['Evaluations'],
+            [{
+                'ComplianceResourceType': 'AWS::EC2::SecurityGroup',
+                'ComplianceResourceId': 'sg-1',
+                'ComplianceType': 'COMPLIANT',
+                'Annotation': 'This resource is compliant with the rule.',
+                'OrderingTimestamp': '2016-07-13T21:50:00.373Z'
+            }]
+        )
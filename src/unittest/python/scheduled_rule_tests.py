@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-import json, unittest
+import json, threading, unittest
 from mock import MagicMock
 from awslambdahelper import AWSConfigRule
 from awslambdahelper import CompliantEvaluation
@@ -90,3 +90,76 @@ class TestScheduledRuleTsts(unittest.TestCase):
             )
 
             mock_rule.put_evaluations.assert_called_once_with(**put_evaluations_response)
+
+
+class TestScheduledRuleGenerator(unittest.TestCase):
+    def test_generator_flushes_each_chunk(self):
+        produced = []
+        sent_after = []
+
+        class MockGeneratorRule(AWSConfigRule):
+            def find_violation_scheduled(self, rule_parameters, accountid):
+                for i in range(250):
+                    produced.append(i)
+                    yield CompliantEvaluation(
+                        ResourceType="AWS::EC2::Instance",
+                        ResourceId="i-%08d" % i
+                    )
+
+        def put_evaluations(Evaluations, ResultToken):
+            sent_after.append(len(produced))
+
+        mock_rule = MockGeneratorRule()
+        mock_rule.put_evaluations = put_evaluations
+        mock_rule.lambda_handler(
+            event={
+                "invokingEvent": json.dumps({
+                    "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                    "messageType": "ScheduledNotification"
+                }),
+                "resultToken": "myResultToken",
+                "accountId": "123456789012"
+            },
+            context=None
+        )
+
+        # Each chunk is sent as soon as it is full, before the rule has produced the next evaluation.
+        self.assertEqual(sent_after, [100, 200, 250])
+
+
+class TestShardedScheduledRule(unittest.TestCase):
+    def test_shards(self):
+        threads = set()
+
+        class MockShardedRule(AWSConfigRule):
+            MAX_SHARD_WORKERS = 3
+
+            def shards_scheduled(self, rule_parameters, accountid):
+                return ["AWS::EC2::Instance", "AWS::EC2::Volume", "AWS::S3::Bucket"]
+
+            def find_violation_scheduled_shard(self, rule_parameters, accountid, shard):
+                threads.add(threading.current_thread().name)
+                return [CompliantEvaluation(ResourceType=shard, ResourceId="%s-%d" % (shard, i)) for i in range(70)]
+
+        sent = []
+        mock_rule = MockShardedRule()
+        mock_rule.put_evaluations = MagicMock(side_effect=lambda **kwargs: sent.extend(kwargs['Evaluations']))
+        mock_rule.lambda_handler(
+            event={
+                "invokingEvent": json.dumps({
+                    "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                    "messageType": "ScheduledNotification"
+                }),
+                "resultToken": "myResultToken",
+                "accountId": "123456789012"
+            },
+            context=None
+        )
+
+        self.assertEqual(mock_rule.put_evaluations.call_count, 3)
+        self.assertEqual(len(set(evaluation['ComplianceResourceId'] for evaluation in sent)), 210)
+        self.assertNotIn(threading.current_thread().name, threads)
+
+    def test_unimplemented_shard(self):
+        with self.assertRaises(NotImplementedError):
+            AWSConfigRule().find_violation_scheduled_shard(rule_parameters=None, accountid=None, shard=None)
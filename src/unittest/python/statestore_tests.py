@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from mock import MagicMock
+from awslambdahelper import AWSConfigRule, CompliantEvaluation, NonCompliantEvaluation
+from awslambdahelper.statestore import ComplianceState, DeltaFilter, MemoryStateStore, SQLiteStateStore
+
+
+def payload(resource_id, compliance_type='COMPLIANT', annotation='ok'):
+    return {
+        'ComplianceResourceType': 'AWS::EC2::Instance',
+        'ComplianceResourceId': resource_id,
+        'ComplianceType': compliance_type,
+        'Annotation': annotation,
+        'OrderingTimestamp': '2016-07-13T21:50:00.373Z'
+    }
+
+
+class TestSQLiteStateStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_put(self):
+        store = SQLiteStateStore(os.path.join(self.directory, 'state.db'))
+        key = ('my-rule', 'AWS::EC2::Instance', 'i-1')
+
+        self.assertIsNone(store.get(key))
+
+        store.put_many([(key, ComplianceState('COMPLIANT', 'ok', 100.0))])
+        store.put_many([(key, ComplianceState('NON_COMPLIANT', 'bad', 200.0))])
+
+        reopened = SQLiteStateStore(os.path.join(self.directory, 'state.db'))
+        self.assertEqual(reopened.get(key), ComplianceState('NON_COMPLIANT', 'bad', 200.0))
+
+
+class TestDeltaFilter(unittest.TestCase):
+    def test_unchanged_skipped(self):
+        store = MemoryStateStore()
+
+        first = DeltaFilter(store, 'my-rule')
+        self.assertEqual(len(list(first.filter([payload('i-1'), payload('i-2')]))), 2)
+        first.commit()
+
+        second = DeltaFilter(store, 'my-rule')
+        sent = list(second.filter([payload('i-1'), payload('i-2', 'NON_COMPLIANT', 'bad')]))
+
+        self.assertEqual(sent, [payload('i-2', 'NON_COMPLIANT', 'bad')])
+        self.assertEqual(second.skipped, 1)
+
+    def test_uncommitted_not_saved(self):
+        store = MemoryStateStore()
+        list(DeltaFilter(store, 'my-rule').filter([payload('i-1')]))
+
+        self.assertEqual(len(list(DeltaFilter(store, 'my-rule').filter([payload('i-1')]))), 1)
+
+    def test_refresh(self):
+        store = MemoryStateStore()
+        key = ('my-rule', 'AWS::EC2::Instance', 'i-1')
+        store.put_many([(key, ComplianceState('COMPLIANT', 'ok', time.time() - 60))])
+
+        self.assertEqual(len(list(DeltaFilter(store, 'my-rule', refresh_seconds=3600).filter([payload('i-1')]))), 0)
+        self.assertEqual(len(list(DeltaFilter(store, 'my-rule', refresh_seconds=30).filter([payload('i-1')]))), 1)
+
+    def test_rules_kept_apart(self):
+        store = MemoryStateStore()
+        delta_filter = DeltaFilter(store, 'my-rule')
+        list(delta_filter.filter([payload('i-1')]))
+        delta_filter.commit()
+
+        self.assertEqual(len(list(DeltaFilter(store, 'other-rule').filter([payload('i-1')]))), 1)
+
+
+class TestDeltaRule(unittest.TestCase):
+    def test_lambda_handler(self):
+        results = {'i-1': CompliantEvaluation, 'i-2': CompliantEvaluation}
+
+        class MockDeltaRule(AWSConfigRule):
+            STATE_STORE = MemoryStateStore()
+
+            def find_violation_scheduled(self, rule_parameters, accountid):
+                for resource_id, evaluation in sorted(results.items()):
+                    if evaluation is CompliantEvaluation:
+                        yield CompliantEvaluation(ResourceType="AWS::EC2::Instance", ResourceId=resource_id)
+                    else:
+                        yield NonCompliantEvaluation("bad", ResourceType="AWS::EC2::Instance", ResourceId=resource_id)
+
+        event = {
+            "invokingEvent": json.dumps({
+                "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                "messageType": "ScheduledNotification"
+            }),
+            "resultToken": "myResultToken",
+            "configRuleName": "periodic-config-rule",
+            "accountId": "123456789012"
+        }
+        rule = MockDeltaRule()
+        rule.put_evaluations = MagicMock()
+
+        rule.lambda_handler(event, None)
+        self.assertEqual(len(rule.put_evaluations.call_args[1]['Evaluations']), 2)
+
+        rule.put_evaluations.reset_mock()
+        rule.lambda_handler(event, None)
+        rule.put_evaluations.assert_not_called()
+        self.assertEqual(rule.unchanged_evaluations, 2)
+
+        results['i-2'] = NonCompliantEvaluation
+        rule.lambda_handler(event, None)
+        self.assertEqual(
+            [evaluation['ComplianceResourceId'] for evaluation in rule.put_evaluations.call_args[1]['Evaluations']],
+            ['i-2']
+        )
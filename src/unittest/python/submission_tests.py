@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import time
+import unittest
+import botocore.exceptions
+from mock import MagicMock, patch
+from awslambdahelper import AWSConfigRule, CompliantEvaluation, EvaluationSubmissionError, FailedEvaluationsError
+from awslambdahelper.submission import EvaluationSubmitter, chunk_evaluations, estimate_size
+
+
+def make_evaluations(count):
+    return [{
+        'ComplianceResourceType': 'AWS::EC2::Instance',
+        'ComplianceResourceId': 'i-{0:08d}'.format(i)
+    } for i in range(count)]
+
+
+def client_error(code):
+    return botocore.exceptions.ClientError({'Error': {'Code': code, 'Message': code}}, 'PutEvaluations')
+
+
+class TestChunkEvaluations(unittest.TestCase):
+    def test_chunk_sizes(self):
+        chunks = list(chunk_evaluations(make_evaluations(250)))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [100, 100, 50])
+
+    def test_empty(self):
+        self.assertEqual(list(chunk_evaluations([])), [])
+
+    def test_max_bytes(self):
+        evaluations = make_evaluations(10)
+        evaluation_bytes = estimate_size(evaluations[0]) + 2
+
+        chunks = list(chunk_evaluations(evaluations, max_bytes=evaluation_bytes * 4))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2])
+
+    def test_oversized_evaluation_sent_alone(self):
+        evaluations = make_evaluations(3)
+        evaluations[1]['Annotation'] = 'x' * 1000
+
+        chunks = list(chunk_evaluations(evaluations, max_bytes=500))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [1, 1, 1])
+
+    def test_maximal_annotations(self):
+        def maximal(i, character):
+            return {
+                'ComplianceResourceType': 'AWS::EC2::Instance',
+                'ComplianceResourceId': ('i-%d-' % i).ljust(768, 'x'),
+                'ComplianceType': 'NON_COMPLIANT',
+                'Annotation': character * 256,
+                'OrderingTimestamp': '2016-07-13T21:50:00.373Z'
+            }
+
+        # 100 maximal ASCII evaluations fit in a single request.
+        submitter = EvaluationSubmitter(MagicMock(), 'token')
+        ascii_chunks = list(chunk_evaluations([maximal(i, u'x') for i in range(100)], 100,
+                                              submitter.max_evaluation_bytes))
+        self.assertEqual([len(chunk) for chunk in ascii_chunks], [100])
+
+        # With a smaller limit they are spread across several requests, each one within the limit.
+        submitter = EvaluationSubmitter(MagicMock(), 'token', max_request_bytes=64 * 1024)
+        small_chunks = list(chunk_evaluations([maximal(i, u'x') for i in range(100)], 100,
+                                              submitter.max_evaluation_bytes))
+        self.assertEqual(sum(len(chunk) for chunk in small_chunks), 100)
+        self.assertEqual(len(small_chunks), 2)
+        for chunk in small_chunks:
+            self.assertLessEqual(estimate_size({'Evaluations': chunk, 'ResultToken': 'token'}), 64 * 1024)
+
+    def test_estimate_size_escaped(self):
+        # Non-ASCII characters are escaped in the request body, so take six bytes each.
+        self.assertEqual(estimate_size(u'\u00e9' * 256), 256 * 6 + 2)
+
+    def test_count_and_size_limits(self):
+        put_evaluations = MagicMock()
+
+        EvaluationSubmitter(put_evaluations, 'token', chunk_size=3, max_request_bytes=None).submit(
+            make_evaluations(7)
+        )
+
+        self.assertEqual([len(call[1]['Evaluations']) for call in put_evaluations.call_args_list], [3, 3, 1])
+
+
+class TestEvaluationSubmitter(unittest.TestCase):
+    def test_serial_submission(self):
+        put_evaluations = MagicMock(side_effect=lambda **kwargs: len(kwargs['Evaluations']))
+
+        results = EvaluationSubmitter(put_evaluations, 'token').submit(make_evaluations(201))
+
+        self.assertEqual(results, [100, 100, 1])
+        self.assertEqual(put_evaluations.call_count, 3)
+
+    def test_serial_failure_raises_immediately(self):
+        put_evaluations = MagicMock(side_effect=ValueError('boom'))
+
+        with self.assertRaises(ValueError):
+            EvaluationSubmitter(put_evaluations, 'token').submit(make_evaluations(201))
+
+        self.assertEqual(put_evaluations.call_count, 1)
+
+    def test_concurrent_submission(self):
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def put_evaluations(Evaluations, ResultToken):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.pop()
+            return Evaluations[0]['ComplianceResourceId']
+
+        results = EvaluationSubmitter(put_evaluations, 'token', max_in_flight=3).submit(make_evaluations(1000))
+
+        self.assertEqual(results, ['i-{0:08d}'.format(i) for i in range(0, 1000, 100)])
+        self.assertLessEqual(max(peak), 3)
+
+    def test_concurrent_failures_collected(self):
+        def put_evaluations(Evaluations, ResultToken):
+            if Evaluations[0]['ComplianceResourceId'] in ('i-00000100', 'i-00000300'):
+                raise ValueError(Evaluations[0]['ComplianceResourceId'])
+
+        submitter = EvaluationSubmitter(put_evaluations, 'token', max_in_flight=4)
+
+        with self.assertRaises(EvaluationSubmissionError) as raised:
+            submitter.submit(make_evaluations(500))
+
+        self.assertEqual(
+            sorted(chunk[0]['ComplianceResourceId'] for chunk, _ in raised.exception.failures),
+            ['i-00000100', 'i-00000300']
+        )
+
+
+class TestEvaluationSubmitterRetries(unittest.TestCase):
+    def test_throttled_chunk_retried(self):
+        put_evaluations = MagicMock(side_effect=[client_error('ThrottlingException'), {'FailedEvaluations': []}])
+
+        results = EvaluationSubmitter(put_evaluations, 'token', backoff_factor=0).submit(make_evaluations(10))
+
+        self.assertEqual(results, [{'FailedEvaluations': []}])
+        self.assertEqual(put_evaluations.call_count, 2)
+
+    def test_other_errors_not_retried(self):
+        put_evaluations = MagicMock(side_effect=client_error('InvalidResultTokenException'))
+
+        with self.assertRaises(botocore.exceptions.ClientError):
+            EvaluationSubmitter(put_evaluations, 'token', backoff_factor=0).submit(make_evaluations(10))
+
+        self.assertEqual(put_evaluations.call_count, 1)
+
+    def test_only_failed_items_resent(self):
+        evaluations = make_evaluations(100)
+        put_evaluations = MagicMock(side_effect=[
+            {'FailedEvaluations': [dict(evaluations[42], OrderingTimestamp='parsed-by-boto3')]},
+            {'FailedEvaluations': []}
+        ])
+
+        EvaluationSubmitter(put_evaluations, 'token', backoff_factor=0).submit(evaluations)
+
+        self.assertEqual(put_evaluations.call_count, 2)
+        self.assertEqual(put_evaluations.call_args[1]['Evaluations'], [evaluations[42]])
+
+    def test_failed_items_give_up(self):
+        evaluations = make_evaluations(3)
+        put_evaluations = MagicMock(return_value={'FailedEvaluations': evaluations[:1]})
+
+        with self.assertRaises(FailedEvaluationsError) as raised:
+            EvaluationSubmitter(put_evaluations, 'token', max_tries=3, backoff_factor=0).submit(evaluations)
+
+        self.assertEqual(raised.exception.evaluations, evaluations[:1])
+        self.assertEqual(put_evaluations.call_count, 3)
+
+    def test_shared_attempt_budget(self):
+        evaluations = make_evaluations(3)
+        put_evaluations = MagicMock(side_effect=[
+            client_error('ThrottlingException'),
+            {'FailedEvaluations': evaluations[:1]},
+            client_error('ThrottlingException'),
+            {'FailedEvaluations': evaluations[:1]},
+        ])
+
+        with self.assertRaises(FailedEvaluationsError):
+            EvaluationSubmitter(put_evaluations, 'token', max_tries=4, backoff_factor=0).submit(evaluations)
+
+        self.assertEqual(put_evaluations.call_count, 4)
+
+    def test_throttled_gives_up(self):
+        put_evaluations = MagicMock(side_effect=client_error('ThrottlingException'))
+
+        with self.assertRaises(botocore.exceptions.ClientError):
+            EvaluationSubmitter(put_evaluations, 'token', max_tries=3, backoff_factor=0).submit(make_evaluations(10))
+
+        self.assertEqual(put_evaluations.call_count, 3)
+
+    def test_stops_at_deadline(self):
+        deadline = MagicMock(remaining_seconds=0)
+        put_evaluations = MagicMock(side_effect=client_error('ThrottlingException'))
+
+        with self.assertRaises(botocore.exceptions.ClientError):
+            EvaluationSubmitter(put_evaluations, 'token', deadline=deadline).submit(make_evaluations(10))
+
+        self.assertEqual(put_evaluations.call_count, 1)
+
+
+class TestConcurrentRule(unittest.TestCase):
+    def test_lambda_handler(self):
+        class MockScheduleRule(AWSConfigRule):
+            MAX_CONCURRENT_SUBMISSIONS = 4
+
+            def find_violation_scheduled(self, rule_parameters, accountid):
+                return [CompliantEvaluation(ResourceType="AWS::EC2::Instance", ResourceId="i-%d" % i)
+                        for i in range(450)]
+
+        rule = MockScheduleRule()
+        rule.put_evaluations = MagicMock()
+        with patch('awslambdahelper.submission.estimate_size') as mock_estimate_size:
+            rule.lambda_handler({
+                "invokingEvent": json.dumps({
+                    "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                    "messageType": "ScheduledNotification",
+                }),
+                "resultToken": "myResultToken",
+                "accountId": "123456789012",
+            }, None)
+
+        # Request sizes are only estimated when MAX_REQUEST_BYTES is set.
+        mock_estimate_size.assert_not_called()
+        self.assertEqual(rule.put_evaluations.call_count, 5)
+        self.assertEqual(
+            sum(len(call[1]['Evaluations']) for call in rule.put_evaluations.call_args_list),
+            450
+        )
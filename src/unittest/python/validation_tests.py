@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import datetime
+import json
+import unittest
+from mock import MagicMock, patch
+from awslambdahelper import AWSConfigRule, CompliantEvaluation, NonCompliantEvaluation
+from awslambdahelper.validation import MAX_ANNOTATION_LENGTH, EvaluationValidator
+
+
+def payload(**kwargs):
+    evaluation = {
+        'ComplianceResourceType': 'AWS::EC2::Instance',
+        'ComplianceResourceId': 'i-00000000',
+        'ComplianceType': 'COMPLIANT',
+        'Annotation': 'ok',
+        'OrderingTimestamp': '2016-07-13T21:50:00.373Z'
+    }
+    evaluation.update(kwargs)
+    return evaluation
+
+
+class TestEvaluationValidator(unittest.TestCase):
+    def test_valid(self):
+        validator = EvaluationValidator()
+
+        self.assertTrue(validator.validate(payload()))
+        self.assertTrue(validator.validate(payload(OrderingTimestamp=datetime.datetime.utcnow())))
+        self.assertTrue(validator.validate(payload(OrderingTimestamp='2016-07-13T21:50:00.373000Z')))
+        self.assertEqual((validator.fixed, validator.rejected), (0, 0))
+
+    def test_long_annotation_truncated(self):
+        evaluation = payload(Annotation='x' * 1000)
+        validator = EvaluationValidator()
+
+        self.assertTrue(validator.validate(evaluation))
+        self.assertEqual(len(evaluation['Annotation']), MAX_ANNOTATION_LENGTH)
+        self.assertTrue(evaluation['Annotation'].endswith('...'))
+        self.assertEqual(validator.fixed, 1)
+
+    def test_non_ascii_annotation_measured_in_characters(self):
+        evaluation = payload(Annotation=u'\xe9'.encode('utf-8') * 200)
+        validator = EvaluationValidator()
+
+        self.assertTrue(validator.validate(evaluation))
+        self.assertEqual(evaluation['Annotation'], u'\xe9'.encode('utf-8') * 200)
+        self.assertEqual(validator.fixed, 0)
+        json.dumps(evaluation)
+
+    def test_long_non_ascii_annotation_truncated(self):
+        evaluation = payload(Annotation=u'\xe9'.encode('utf-8') * 300)
+
+        self.assertTrue(EvaluationValidator().validate(evaluation))
+        self.assertEqual(evaluation['Annotation'], u'\xe9' * (MAX_ANNOTATION_LENGTH - 3) + u'...')
+        json.dumps(evaluation)
+
+    def test_empty_annotation_removed(self):
+        evaluation = payload(Annotation=None)
+
+        self.assertTrue(EvaluationValidator().validate(evaluation))
+        self.assertNotIn('Annotation', evaluation)
+
+    def test_rejected(self):
+        validator = EvaluationValidator()
+
+        with patch('awslambdahelper.validation.logger') as mock_logger:
+            valid = list(validator.filter([
+                payload(ComplianceResourceId=None),
+                payload(ComplianceResourceId='i' * 769),
+                payload(ComplianceResourceType=''),
+                payload(ComplianceType='MOSTLY_COMPLIANT'),
+                payload(OrderingTimestamp='yesterday'),
+                payload(OrderingTimestamp=None),
+                payload(),
+            ]))
+
+        self.assertEqual(valid, [payload()])
+        self.assertEqual(validator.rejected, 6)
+        self.assertEqual(mock_logger.warning.call_count, 6)
+        self.assertEqual(
+            mock_logger.warning.call_args_list[0][0][1:],
+            ('AWS::EC2::Instance', None, 'missing or over-long resource id')
+        )
+
+
+class TestValidatingRule(unittest.TestCase):
+    def test_lambda_handler(self):
+        class MockScheduleRule(AWSConfigRule):
+            def find_violation_scheduled(self, rule_parameters, accountid):
+                return [
+                    CompliantEvaluation(ResourceType="AWS::EC2::Instance", ResourceId="i-00000000"),
+                    NonCompliantEvaluation("x" * 300, ResourceType="AWS::EC2::Instance", ResourceId="i-00000001"),
+                    CompliantEvaluation(ResourceType="AWS::EC2::Instance"),
+                ]
+
+        rule = MockScheduleRule()
+        rule.put_evaluations = MagicMock()
+        rule.lambda_handler({
+            "invokingEvent": json.dumps({
+                "notificationCreationTime": "2016-07-13T21:50:00.373Z",
+                "messageType": "ScheduledNotification"
+            }),
+            "resultToken": "myResultToken",
+            "accountId": "123456789012"
+        }, None)
+
+        evaluations = rule.put_evaluations.call_args[1]['Evaluations']
+        self.assertEqual(
+            [evaluation['ComplianceResourceId'] for evaluation in evaluations],
+            ['i-00000000', 'i-00000001']
+        )
+        self.assertEqual(len(evaluations[1]['Annotation']), MAX_ANNOTATION_LENGTH)
+        self.assertEqual((rule.fixed_evaluations, rule.rejected_evaluations), (1, 1))